@@ -0,0 +1,75 @@
+"""Replay a keystroke stream through /guess autocomplete, old vs new.
+
+Simulated players type Pokémon names one key at a time, with the odd
+typo and backspace, and Discord fires autocomplete on every keystroke.
+
+Run from the repo root:  python -m benchmarks.bench_autocomplete
+"""
+import random
+import string
+import time
+
+from src.autocomplete import AutocompleteEngine
+from src.game_logic import POKEMON_DATA
+
+
+def autocomplete_linear(current):
+    """The original per-keystroke scan over POKEMON_DATA."""
+    query = (current or "").strip().lower()
+    matches = []
+    if not query:
+        for p in POKEMON_DATA[:10]:
+            matches.append((p["name"].title(), p["name"]))
+        return matches
+    for p in POKEMON_DATA:
+        name = p["name"]
+        if query in name.lower():
+            matches.append((name.title(), name))
+            if len(matches) >= 25:
+                break
+    return matches
+
+
+def keystroke_stream(rng, players=500):
+    """Yield the `current` value Discord sends for each keystroke."""
+    # Popular Pokémon get typed far more often than the long tail
+    weights = [1.0 / (1 + i % 151) for i in range(len(POKEMON_DATA))]
+    for p in rng.choices(POKEMON_DATA, weights=weights, k=players):
+        typed = ""
+        for ch in p["name"].replace("-", " "):
+            if rng.random() < 0.05:
+                yield typed + rng.choice(string.ascii_lowercase)
+            typed += ch
+            yield typed
+            # Most players pick from the list after a few letters
+            if len(typed) >= 4 and rng.random() < 0.4:
+                break
+
+
+def run(fn, stream):
+    start = time.perf_counter()
+    for current in stream:
+        fn(current)
+    return time.perf_counter() - start
+
+
+def main():
+    stream = list(keystroke_stream(random.Random(0)))
+
+    start = time.perf_counter()
+    engine = AutocompleteEngine(POKEMON_DATA)
+    build = time.perf_counter() - start
+
+    linear = run(autocomplete_linear, stream)
+    indexed = run(engine.complete, stream)
+    info = engine.search.cache_info()
+
+    print(f"{len(stream)} keystrokes, engine built in {build * 1e3:.1f} ms")
+    print(f"linear scan : {linear / len(stream) * 1e6:8.2f} µs/keystroke")
+    print(f"engine      : {indexed / len(stream) * 1e6:8.2f} µs/keystroke "
+          f"(LRU hits {info.hits}, misses {info.misses})")
+    print(f"speedup     : {linear / indexed:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
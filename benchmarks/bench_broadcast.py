@@ -0,0 +1,216 @@
+"""A rollover announcement broadcast against a fake Discord with its rate limits.
+
+FakeDiscordAPI enforces the global limit (requests per second) and the
+per-channel limit (5 messages per 5 s), answers 429 with Retry-After
+beyond them, fails 2% of requests with a 500, and 404s a few deleted
+channels.  Limits and rates are scaled up SCALE times, so a broadcast
+that would take minutes against Discord takes seconds here.
+
+Compared:
+  * naive: every message POSTed at once with no limiting and no retries
+    (what looping over the channels with create_task would do);
+  * Broadcaster: bounded concurrency, token buckets, Retry-After;
+  * processes: SHARD_PROCESSES Broadcasters at once, as the workers
+    of a sharded bot, each with its share of the global rate;
+  * outage: Discord answering 503 to everything for OUTAGE seconds,
+    longer than the per-message retries last; nothing may be dropped;
+  * crash: the Broadcaster killed halfway without its final flush, so
+    the last outbox deletes are lost, and a new process reloading the
+    outbox from the database and finishing the broadcast; messages it
+    sends again must be dropped by their nonce.
+
+Most guilds get one message; a few "busy" channels get several, as when
+guilds share a channel, to exercise the per-channel buckets.  Event loop
+lag is sampled throughout.
+
+Run from the repo root:  python -m benchmarks.bench_broadcast
+"""
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from src.broadcast import GLOBAL_BURST, GLOBAL_RATE, ROUTE_RATE, Broadcaster, make_client
+from src.storage import SQLiteGameStore
+
+from benchmarks.fake_discord import FakeDiscordAPI
+
+SCALE = 10
+DISCORD_GLOBAL = 50 * SCALE
+DISCORD_ROUTE_PERIOD = 5.0 / SCALE
+BUSY_CHANNELS = 10
+BUSY_MESSAGES = 12   # messages to each busy channel
+OUTAGE = 2.0         # seconds
+SHARD_PROCESSES = 4  # sharded workers sharing the bot token's global limit
+
+
+def workload(guilds):
+    """[(guild_id, key, channel_id, payload)]: one recap per guild, busy channels shared."""
+    messages = []
+    for guild_id in range(1, guilds + 1):
+        channel_id = 10_000 + guild_id
+        messages.append((guild_id, "2026-10-17", channel_id, {"content": f"recap for {guild_id}"}))
+    for channel in range(BUSY_CHANNELS):
+        for n in range(BUSY_MESSAGES):
+            guild_id = 1_000_000 + channel * BUSY_MESSAGES + n
+            messages.append((guild_id, "2026-10-17", 90_000 + channel, {"content": f"recap for {guild_id}"}))
+    return messages
+
+
+def fake_api(guilds, missing=20):
+    return FakeDiscordAPI(global_rate=DISCORD_GLOBAL, route_period=DISCORD_ROUTE_PERIOD, latency=0.01,
+                          error_rate=0.02, missing_channels=range(10_001, 10_001 + missing))
+
+
+def make_broadcaster(store, failed, share=1):
+    """A Broadcaster as the bot builds it, for a process running `share` of the shards."""
+    return Broadcaster(store, global_rate=GLOBAL_RATE * SCALE * share, global_burst=GLOBAL_BURST * SCALE * share,
+                       route_rate=ROUTE_RATE * SCALE, backoff=0.01,
+                       on_failed=lambda guild_id, channel_id, status: failed.append(status))
+
+
+async def sample_lag(samples, interval=0.005):
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(loop.time() - start - interval)
+
+
+async def naive(messages, api):
+    async with make_client("token", transport=api.transport(), concurrency=len(messages)) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client.post(f"/channels/{channel_id}/messages", json=payload)
+                               for _, _, channel_id, payload in messages))
+        return time.perf_counter() - start
+
+
+async def broadcast(messages, api, db, crash_after=None):
+    """Post through a Broadcaster; with crash_after, kill it once that many got through."""
+    store = SQLiteGameStore(db, flush_interval=0.05)
+    failed, lag = [], []
+    broadcaster = make_broadcaster(store, failed)
+    for guild_id, key, channel_id, payload in messages:
+        broadcaster.post(guild_id, key, channel_id, payload)
+    flusher = asyncio.create_task(store.run())
+    sampler = asyncio.create_task(sample_lag(lag))
+    start = time.perf_counter()
+    async with make_client("token", transport=api.transport()) as client:
+        runner = asyncio.create_task(broadcaster.run(client))
+        if crash_after is None:
+            await broadcaster.drain()
+        else:
+            while api.statuses[200] < crash_after:
+                await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+    for task in (flusher, sampler):
+        task.cancel()
+    await asyncio.gather(flusher, sampler, return_exceptions=True)
+    if crash_after is None:
+        store.flush()   # what the bot does on shutdown; a crash loses up to a flush interval of writes
+    return elapsed, failed, max(lag, default=0.0)
+
+
+async def sharded(messages, api, tmp, processes):
+    """`processes` Broadcasters, one per worker process, each posting its own guilds' messages."""
+    failed = []
+    broadcasters = []
+    for worker in range(processes):
+        broadcaster = make_broadcaster(SQLiteGameStore(str(Path(tmp) / f"worker{worker}.db")), failed,
+                                       share=1 / processes)
+        for guild_id, key, channel_id, payload in messages:
+            if channel_id % processes == worker:   # a channel's guild belongs to one process
+                broadcaster.post(guild_id, key, channel_id, payload)
+        broadcasters.append(broadcaster)
+    start = time.perf_counter()
+    async with make_client("token", transport=api.transport()) as client:
+        runners = [asyncio.create_task(b.run(client)) for b in broadcasters]
+        await asyncio.gather(*(b.drain() for b in broadcasters))
+        elapsed = time.perf_counter() - start
+        for runner in runners:
+            runner.cancel()
+        await asyncio.gather(*runners, return_exceptions=True)
+    return elapsed, failed
+
+
+async def resume(api, db):
+    """A restarted process: reload the outbox and finish the broadcast."""
+    store = SQLiteGameStore(db, flush_interval=0.05)
+    failed = []
+    broadcaster = make_broadcaster(store, failed)
+    pending = store.load_outbox()
+    broadcaster.resume(pending)
+    flusher = asyncio.create_task(store.run())
+    async with make_client("token", transport=api.transport()) as client:
+        runner = asyncio.create_task(broadcaster.run(client))
+        await broadcaster.drain()
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+    flusher.cancel()
+    await asyncio.gather(flusher, return_exceptions=True)
+    store.flush()
+    return len(pending), failed, len(store.load_outbox())
+
+
+def check_delivered(api, messages):
+    """Every message to a live channel was posted exactly once."""
+    expected = {}
+    for _, _, channel_id, payload in messages:
+        if channel_id not in api.missing_channels:
+            expected.setdefault(channel_id, []).append(payload["content"])
+    posted = {channel_id: [p["content"] for p in payloads] for channel_id, payloads in api.messages.items()}
+    assert {c: sorted(v) for c, v in posted.items()} == {c: sorted(v) for c, v in expected.items()}
+    return sum(map(len, posted.values()))
+
+
+def main(guilds=2000):
+    messages = workload(guilds)
+    print(f"{len(messages):,} announcements to {guilds + BUSY_CHANNELS:,} channels; "
+          f"fake Discord limits x{SCALE}: {DISCORD_GLOBAL}/s global, 5 per {DISCORD_ROUTE_PERIOD:g} s per channel")
+
+    api = fake_api(guilds)
+    elapsed = asyncio.run(naive(messages, api))
+    posted = sum(map(len, api.messages.values()))
+    print(f"  naive:       {elapsed:5.2f} s, {posted:,} posted, {api.statuses[429]:,} answered 429, "
+          f"{api.statuses[500]} 500s lost")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        api = fake_api(guilds)
+        elapsed, failed, lag = asyncio.run(broadcast(messages, api, str(Path(tmp) / "bench.db")))
+        posted = check_delivered(api, messages)
+        print(f"  Broadcaster: {elapsed:5.2f} s, {posted:,} posted exactly once ({posted / elapsed:,.0f}/s), "
+              f"{api.statuses[429]} answered 429, {api.statuses[500]} 500s retried, {len(failed)} dropped "
+              f"({', '.join(map(str, sorted(set(failed))))}); max event loop lag {lag * 1e3:.1f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        api = fake_api(guilds)
+        elapsed, failed = asyncio.run(sharded(messages, api, tmp, SHARD_PROCESSES))
+        posted = check_delivered(api, messages)
+        print(f"  {SHARD_PROCESSES} processes: {elapsed:5.2f} s, {posted:,} posted exactly once "
+              f"({posted / elapsed:,.0f}/s), {api.statuses[429]} answered 429, {len(failed)} dropped")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        api = fake_api(guilds)
+        api.down_until = time.monotonic() + OUTAGE
+        elapsed, failed, _ = asyncio.run(broadcast(messages, api, str(Path(tmp) / "bench.db")))
+        posted = check_delivered(api, messages)
+        left = len(SQLiteGameStore(str(Path(tmp) / "bench.db")).load_outbox())
+        print(f"  outage:      {elapsed:5.2f} s with the first {OUTAGE:g} s down ({api.statuses[503]:,} answered 503), "
+              f"{posted:,} posted exactly once, {len(failed)} dropped, {left} left in the outbox")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = str(Path(tmp) / "bench.db")
+        api = fake_api(guilds)
+        asyncio.run(broadcast(messages, api, db, crash_after=len(messages) // 2))
+        before = api.statuses[200]
+        pending, failed, left = asyncio.run(resume(api, db))
+        posted = check_delivered(api, messages)
+        print(f"  crash:       killed after {before:,} posted, resumed {pending:,} from the outbox, "
+              f"{posted:,} posted exactly once; {api.deduplicated} in-flight resends dropped by nonce, "
+              f"{left} left in the outbox")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Simulated players driving the slash command handlers, fully offline.
+
+Builds the bot with create_bot() on a temporary database (no gateway, no
+token) and replays `players` users spread over `guild_count` guilds,
+interleaved on one event loop the way interactions arrive.  Each player
+opens /daily and guesses until solved or out of tries, typing a few
+keystrokes of /guess autocomplete before every guess, checks
+/leaderboard and /stats, then plays a /start personal game the same way
+and checks /stats again.  The store's write-behind flush loop runs
+alongside, as in the bot.
+
+Reports throughput, p50/p99 latency per handler, and memory growth: RSS
+over the timed run, and Python allocations still held afterwards,
+traced on a second run with a fresh bot.  Every interaction must have
+been answered.  First checks that a personal game whose secret a hot
+reload dropped is ended with a notice instead of crashing the commands.
+
+Run from the repo root:  python -m benchmarks.bench_commands
+"""
+import asyncio
+import contextlib
+import copy
+import io
+import random
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+from src import bot as app
+from src import game_logic
+from src.game_logic import get_game_data
+from src.pokedex import PokedexIndex
+from src.metrics import process_rss
+from src.sessions import MAX_TRIES
+
+from benchmarks.fake_discord import FakeInteraction, FakeUser, invoke
+
+SOLVE_RATE = 0.15           # chance a guess is the secret, so some games are won
+KEYSTROKES = (1, 3, 5)      # autocomplete calls typed ahead of each guess
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+class Player:
+    def __init__(self, user_id, guild_id, rng, timings):
+        self.user = FakeUser(user_id)
+        self.guild_id = guild_id
+        self.rng = rng
+        self.timings = timings   # handler label -> [seconds]
+
+    async def command(self, command, label=None, **options):
+        start = time.perf_counter()
+        interaction = await invoke(command, self.user, self.guild_id, **options)
+        self.timings[label or command.name].append(time.perf_counter() - start)
+        assert interaction.response.is_done(), f"/{command.name} sent no response"
+        await asyncio.sleep(0)   # the next interaction may be someone else's
+
+    async def type_ahead(self, name):
+        for length in KEYSTROKES:
+            start = time.perf_counter()
+            await app.pokemon_autocomplete(FakeInteraction(self.user, self.guild_id), name[:length])
+            self.timings["autocomplete"].append(time.perf_counter() - start)
+        await asyncio.sleep(0)
+
+    async def guess(self, secret, label):
+        names = get_game_data().entries
+        name = secret["name"] if self.rng.random() < SOLVE_RATE else self.rng.choice(names)["name"]
+        await self.type_ahead(name)
+        await self.command(app.guess, label, name=name)
+
+    def daily_over(self):
+        daily_game = app.current_daily_game(self.guild_id)
+        return (self.user.id in daily_game["completions"]
+                or len(daily_game["attempts"].get(self.user.id, [])) >= MAX_TRIES)
+
+    async def play(self):
+        await self.command(app.daily)
+        while not self.daily_over():
+            await self.guess(app.current_daily_game(self.guild_id)["pokemon"], "guess (daily)")
+        await self.command(app.leaderboard)
+        await self.command(app.stats)
+
+        await self.command(app.start)
+        while (game := app.active_games.get(self.user.id)) is not None:
+            await self.guess(game.secret, "guess (personal)")
+        await self.command(app.stats)
+
+
+async def replay(players, guild_count, seed):
+    """Play every player to the end; returns (handler timings, seconds)."""
+    rng = random.Random(seed)
+    timings = defaultdict(list)
+    guild_ids = [(i + 1) << 22 for i in range(guild_count)]
+    flusher = asyncio.create_task(app.store.run())
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):   # guild initialisation logs
+        await asyncio.gather(*(Player(user_id, rng.choice(guild_ids), random.Random(rng.random()), timings).play()
+                               for user_id in range(1, players + 1)))
+    elapsed = time.perf_counter() - start
+    flusher.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await flusher
+    app.store.flush()
+    return timings, elapsed
+
+
+async def check_dropped_secret():
+    """A reload that drops a personal game's secret ends the game with a notice in every command."""
+    user = FakeUser(1)
+    await invoke(app.start, user, 1 << 22)
+    game = app.active_games.get(user.id)
+    await invoke(app.guess, user, 1 << 22, name=next(p["name"] for p in get_game_data().entries
+                                                    if p["pokedex"] != game.secret_dex))
+    data = get_game_data()
+    reloaded = copy.copy(data)   # the Pokédex without the secret, as a hot reload could leave it
+    reloaded.index = PokedexIndex([p for p in data.entries if p["pokedex"] != game.secret_dex])
+    game_logic._game_data = reloaded
+    try:
+        for command in (app.status, app.stats, app.hint, app.solve):
+            sent = (await invoke(command, user, 1 << 22)).sent
+            text = [m["content"] or "" for m in sent] + [
+                value for m in sent for e in m["embeds"]
+                for value in [e.get("description", "")] + [f["value"] for f in e.get("fields", [])]]
+            assert any(app.POKEDEX_UPDATED in t for t in text), (command.name, sent)
+        sent = (await invoke(app.guess, user, 1 << 22, name="pikachu")).sent
+        assert sent[0]["content"] == app.POKEDEX_UPDATED, sent
+        assert app.active_games.get(user.id) is None
+        await invoke(app.start, user, 1 << 22)
+        assert app.active_games.get(user.id).secret is not None
+    finally:
+        game_logic._game_data = data
+
+
+def warm_up():
+    """Load the dataset and build its indexes, which the bot does once per process."""
+    get_game_data().autocomplete.complete("pi")
+
+
+def main(players=1000, guild_count=20, seed=0):
+    warm_up()
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        app.create_bot(db_path=str(Path(tmp) / "check.db"), shards=(None, None))
+        asyncio.run(check_dropped_secret())
+    print("dropped secret: /status, /stats, /hint and /solve explain it, /guess ends the game, /start replaces it")
+    with tempfile.TemporaryDirectory() as tmp:
+        app.create_bot(db_path=str(Path(tmp) / "bench.db"), shards=(None, None))
+        rss_before = process_rss()
+        timings, elapsed = asyncio.run(replay(players, guild_count, seed))
+        rss_growth = process_rss() - rss_before
+
+    calls = sum(len(samples) for samples in timings.values())
+    print(f"{players} players in {guild_count} guilds: {calls:,} handler calls in {elapsed:.2f} s "
+          f"({calls / elapsed:,.0f}/s)")
+    for label, samples in sorted(timings.items()):
+        print(f"  {label:<17} {len(samples):>7,} calls   p50 {percentile(samples, 0.5) * 1e6:7.1f} µs   "
+              f"p99 {percentile(samples, 0.99) * 1e6:7.1f} µs")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app.create_bot(db_path=str(Path(tmp) / "bench.db"), shards=(None, None))
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        asyncio.run(replay(players, guild_count, seed))
+        held = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+    print(f"memory: RSS +{rss_growth / 2**20:.1f} MiB over the run; "
+          f"{held / 2**10:,.0f} KiB of Python objects still held ({held / players:,.0f} B per player)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Hint rendering: per-call comparisons vs packed codes and a prerendered table.
+
+For random (guess, secret) pairs, times the old comparison that built
+every hint line from scratch against rendering from the code stored with
+the guess, and checks both say the same thing.
+
+Run from the repo root:  python -m benchmarks.bench_feedback
+"""
+import random
+import time
+
+from src.feedback import feedback_code, hint_lines
+from src.game_logic import get_game_data
+
+
+def compare_and_build_message(guess, secret):
+    """The /guess and /stats hint builder before feedback codes."""
+    results = []
+    if guess["generation"] == secret["generation"]:
+        results.append("Generation: ✅ same generation")
+    elif guess["generation"] > secret["generation"]:
+        results.append("Generation: 🔽 earlier gen")
+    else:
+        results.append("Generation: 🔼 later gen")
+    type_overlap = set(guess["types"]) & set(secret["types"])
+    if type_overlap:
+        results.append(f"Type: ✅ shared {', '.join(type_overlap)}")
+    else:
+        results.append("Type: ❌ no shared types")
+    if guess["height_m"] > secret["height_m"]:
+        results.append("Height: 🔽 secret is shorter")
+    elif guess["height_m"] < secret["height_m"]:
+        results.append("Height: 🔼 secret is taller")
+    else:
+        results.append("Height: ✅ same height")
+    if guess["weight_kg"] > secret["weight_kg"]:
+        results.append("Weight: 🔽 secret is lighter")
+    elif guess["weight_kg"] < secret["weight_kg"]:
+        results.append("Weight: 🔼 secret is heavier")
+    else:
+        results.append("Weight: ✅ same weight")
+    return results
+
+
+def same_type_line(old, new):
+    """Type lines may list shared types in a different order."""
+    if old == new:
+        return True
+    prefix = "Type: ✅ shared "
+    return (old.startswith(prefix) and new.startswith(prefix)
+            and set(old[len(prefix):].split(", ")) == set(new[len(prefix):].split(", ")))
+
+
+def main(pairs=200_000):
+    entries = get_game_data().entries
+    rng = random.Random(0)
+    sample = [(rng.choice(entries), rng.choice(entries)) for _ in range(pairs)]
+
+    start = time.perf_counter()
+    old = [compare_and_build_message(guess, secret) for guess, secret in sample]
+    old_s = (time.perf_counter() - start) / pairs
+
+    start = time.perf_counter()
+    codes = [feedback_code(guess, secret) for guess, secret in sample]
+    code_s = (time.perf_counter() - start) / pairs
+
+    start = time.perf_counter()
+    new = [hint_lines(code, guess["types"]) for code, (guess, _) in zip(codes, sample)]
+    render_s = (time.perf_counter() - start) / pairs
+
+    for before, after in zip(old, new):
+        assert before[0] == after[0] and before[2:] == after[2:], (before, after)
+        assert same_type_line(before[1], after[1]), (before, after)
+
+    print(f"{pairs:,} random (guess, secret) pairs")
+    print(f"compare + build lines : {old_s * 1e6:6.2f} µs")
+    print(f"feedback_code (once)  : {code_s * 1e6:6.2f} µs")
+    print(f"render from code      : {render_s * 1e6:6.2f} µs ({old_s / render_s:.1f}x faster, /stats and /status)")
+    print("rendered hints match the old builder")
+
+
+if __name__ == "__main__":
+    main()
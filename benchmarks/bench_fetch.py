@@ -0,0 +1,72 @@
+"""Offline run of the PokéAPI fetch pipeline against FakePokeAPI.
+
+Compares one request at a time with the default concurrency, with
+simulated latency, random 429/503s and one permanently broken ID, and
+checks the fetched entries match the source data.  Then times a delta
+refresh through the on-disk HTTP cache after a couple of entries change.
+
+Run from the repo root:  python -m benchmarks.bench_fetch
+"""
+import asyncio
+import copy
+import tempfile
+import time
+
+from benchmarks.fake_pokeapi import FakePokeAPI
+from src.dataset import load_json
+from src.fetch_pokemon import CONCURRENCY, Fetcher, HttpCache, describe_delta, fetch_dataset, make_client
+
+
+async def run(entries, concurrency, broken):
+    api = FakePokeAPI(entries, latency=0.005, flaky_rate=0.05, broken_ids=[broken])
+    async with make_client(concurrency, api.transport()) as client:
+        fetcher = Fetcher(client, concurrency=concurrency, backoff=0.01)
+        start = time.perf_counter()
+        fetched, failed = await fetch_dataset(fetcher, progress=False)
+        elapsed = time.perf_counter() - start
+
+    expected = [p for p in entries if p["pokedex"] != broken]
+    assert fetched == expected, "fetched entries differ from the source data"
+    assert failed == [broken], failed
+    return elapsed, sum(api.requests.values())
+
+
+async def run_delta(entries):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = HttpCache(cache_dir)
+        api = FakePokeAPI(entries, latency=0.005)
+        async with make_client(CONCURRENCY, api.transport()) as client:
+            full, _ = await fetch_dataset(Fetcher(client, cache=cache), progress=False)
+        full_requests = sum(api.requests.values())
+
+        # PokéAPI updates two Pokémon and adds one
+        updated = copy.deepcopy(entries)
+        updated[3]["weight_kg"] += 1.0
+        updated[10]["types"] = ["fairy"]
+        updated.append(dict(updated[-1], name="newmon", pokedex=updated[-1]["pokedex"] + 1))
+        api = FakePokeAPI(updated, latency=0.005)
+        previous = {e["pokedex"]: e for e in full}
+        async with make_client(CONCURRENCY, api.transport()) as client:
+            start = time.perf_counter()
+            delta, _ = await fetch_dataset(Fetcher(client, cache=cache), previous, progress=False)
+            elapsed = time.perf_counter() - start
+
+    assert delta == updated, "delta refresh differs from the updated source data"
+    species = sum(n for path, n in api.requests.items() if "species" in path)
+    print(f"delta refresh  : {elapsed:6.2f}s, {describe_delta(previous, delta)}; "
+          f"{api.not_modified} of {sum(api.requests.values())} requests answered 304 "
+          f"(full run made {full_requests}), {species} species fetched")
+
+
+def main(count=200):
+    entries = load_json()[:count]
+    broken = entries[len(entries) // 2]["pokedex"]
+    for concurrency in (1, CONCURRENCY):
+        elapsed, requests = asyncio.run(run(entries, concurrency, broken))
+        print(f"concurrency {concurrency:3d}: {elapsed:6.2f}s for {count} Pokémon "
+              f"({requests} requests incl. retries), failed IDs reported: [{broken}]")
+    asyncio.run(run_delta(entries))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Per-lookup latency of find_pokemon: linear scan vs PokedexIndex.
+
+Run from the repo root:  python -m benchmarks.bench_find_pokemon
+"""
+import random
+import timeit
+
+from src.game_logic import POKEMON_DATA, find_pokemon
+
+
+def find_pokemon_linear(name):
+    """The original O(N) implementation, kept here as the baseline."""
+    name = name.lower().strip()
+    for p in POKEMON_DATA:
+        if p["name"] == name:
+            return p
+    return None
+
+
+def bench(fn, names, repeat=5):
+    number = len(names)
+    best = min(timeit.repeat(lambda: [fn(n) for n in names], number=1, repeat=repeat))
+    return best / number * 1e6
+
+
+def main():
+    rng = random.Random(0)
+    names = [p["name"] for p in rng.choices(POKEMON_DATA, k=2000)]
+    names += ["missingno"] * 200  # misses walk the whole list
+
+    linear = bench(find_pokemon_linear, names)
+    indexed = bench(find_pokemon, names)
+
+    print(f"{len(POKEMON_DATA)} Pokémon, {len(names)} lookups")
+    print(f"linear scan : {linear:8.2f} µs/lookup")
+    print(f"index       : {indexed:8.2f} µs/lookup")
+    print(f"speedup     : {linear / indexed:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Memory of per-guild daily state, with and without evicting idle guilds.
+
+G guilds each get a day of daily play from P players, done with the same
+partition and store calls as /daily and /guess.  Then, as after a
+restart, every guild is loaded back from SQLite and checked against what
+was played, and all but the last A go idle and are swept.  Last, checks
+that a sweep never drops a guild when the store only keeps it in memory.
+
+Run from the repo root:  python -m benchmarks.bench_guilds
+"""
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+from src.feedback import feedback_code
+from src.game_logic import get_game_data
+from src.guilds import GuildPartitions, timezone_names
+from src.storage import GameStore, SQLiteGameStore
+
+
+def play_day(guilds, store, guild_id, players, rng):
+    data = get_game_data()
+    daily_game = guilds.get(guild_id).daily_game
+    secret = daily_game["pokemon"]
+    for user_id in range(players):
+        attempts = daily_game["attempts"].setdefault(user_id, [])
+        while len(attempts) < 9:
+            guess = secret if rng.random() < 0.2 else rng.choice(data.entries)
+            attempts.append(guess)
+            code = feedback_code(guess, secret)
+            daily_game["codes"].setdefault(user_id, []).append(code)
+            daily_game["candidates"][user_id] = data.candidates.narrow_code(
+                daily_game["candidates"].get(user_id, data.candidates.all), guess["pokedex"], code
+            )
+            store.save_daily_attempts(daily_game, user_id, attempts)
+            if guess is secret:
+                entry = {"user_id": user_id, "username": f"trainer{user_id}", "attempts": len(attempts),
+                         "completion_time": datetime.now(timezone.utc)}
+                daily_game["completions"][user_id] = entry["completion_time"]
+                daily_game["leaderboard"].add(entry)
+                store.save_completion(daily_game, entry)
+                break
+
+
+def main(guild_count=2000, players=20, active=100):
+    rng = random.Random(0)
+    get_game_data().candidates  # load the dataset before measuring
+    zones = timezone_names()
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteGameStore(Path(tmp) / "bench.db")
+        guilds = GuildPartitions(store)
+        expected = {}
+        for guild_id in range(1, guild_count + 1):
+            guilds.set_timezone(guild_id, rng.choice(zones))
+            play_day(guilds, store, guild_id, players, rng)
+            game = guilds.get(guild_id).daily_game
+            expected[guild_id] = (
+                game["date"], game["pokemon"]["pokedex"],
+                {u: [p["pokedex"] for p in a] for u, a in game["attempts"].items()},
+                dict(game["candidates"]), dict(game["codes"]),
+                [(e["user_id"], e["attempts"], e["completion_time"]) for e in game["leaderboard"]],
+            )
+        store.flush()
+        del guilds, game
+
+        # A restarted bot: every guild comes back once, then most go quiet
+        now = [0.0]
+        guilds = GuildPartitions(store, idle=60, clock=lambda: now[0])
+        tracemalloc.start()
+        start = time.perf_counter()
+        for guild_id in range(1, guild_count + 1):
+            if guild_id == guild_count - active + 1:
+                now[0] += 120  # every guild so far goes idle
+            guilds.get(guild_id)
+        reload_s = (time.perf_counter() - start) / guild_count
+        all_loaded, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        evicted = guilds.sweep()
+        sweep_s = time.perf_counter() - start
+        resident, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{guild_count:,} guilds x {players} players: {all_loaded / 2**20:6.2f} MiB with every guild loaded "
+              f"({all_loaded / guild_count / 1024:.1f} KiB/guild)")
+        print(f"after sweep: {evicted:,} unloaded in {sweep_s * 1e3:.1f} ms, "
+              f"{len(guilds)} active guilds hold {resident / 2**20:6.2f} MiB")
+        print(f"load: {reload_s * 1e3:.2f} ms per guild from SQLite")
+
+        for guild_id, (day, secret, attempts, candidates, codes, board) in expected.items():
+            game = guilds.get(guild_id).daily_game
+            assert (game["date"], game["pokemon"]["pokedex"]) == (day, secret), guild_id
+            assert {u: [p["pokedex"] for p in a] for u, a in game["attempts"].items()} == attempts, guild_id
+            assert game["candidates"] == candidates, guild_id
+            assert game["codes"] == codes, guild_id
+            assert [(e["user_id"], e["attempts"], e["completion_time"]) for e in game["leaderboard"]] == board
+        print(f"all {len(expected):,} guilds reload exactly as played")
+
+    check_memory_only_sweep(rng)
+
+
+def check_memory_only_sweep(rng):
+    """With the no-op store (SQUIRDLE_DB=""), a sweep must not drop a guild's day: it's the only copy."""
+    now = [0.0]
+    guilds = GuildPartitions(GameStore(), idle=60, clock=lambda: now[0])
+    play_day(guilds, GameStore(), 42, 5, rng)
+    played = guilds.get(42).daily_game
+    board = [(e["user_id"], e["attempts"]) for e in played["leaderboard"]]
+    now[0] += 3600
+    assert guilds.sweep() == 0
+    game = guilds.get(42).daily_game
+    assert game is played and [(e["user_id"], e["attempts"]) for e in game["leaderboard"]] == board
+    assert game["completions"].keys() == played["completions"].keys() and game["attempts"]
+    print(f"memory-only store: sweep kept the idle guild's day ({len(board)} on the board)")
+
+
+if __name__ == "__main__":
+    main()
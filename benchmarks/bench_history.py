@@ -0,0 +1,98 @@
+"""All-time stats from incremental rollups vs rescanning every archived day.
+
+Plays D simulated days of P daily players, archiving each day into a
+History (and a SQLite store, reloaded at the end), then times a /stats
+lookup both ways and checks the rollups against the rescan.
+
+Run from the repo root:  python -m benchmarks.bench_history
+"""
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from src.history import History, previous_day
+from src.leaderboard import Leaderboard
+from src.storage import SQLiteGameStore
+
+
+def simulate(days, players, seed=0):
+    rng = random.Random(seed)
+    start = date(2026, 1, 1)
+    for d in range(days):
+        day = (start + timedelta(days=d)).isoformat()
+        game = {"guild_id": 1, "date": day, "attempts": {}, "leaderboard": Leaderboard()}
+        for user_id in rng.sample(range(players * 2), players):
+            tries = rng.randint(1, 9)
+            game["attempts"][user_id] = [None] * tries
+            if rng.random() < 0.8:
+                game["leaderboard"].add({
+                    "user_id": user_id, "username": f"trainer{user_id}", "attempts": tries,
+                    "completion_time": datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=user_id),
+                })
+        yield game
+
+
+def rescan(archive, user_id):
+    """What /stats would cost without rollups: walk every archived day."""
+    played = wins = streak = best = 0
+    distribution = [0] * 9
+    last_win = None
+    for game in archive:
+        guesses = game["attempts"].get(user_id)
+        if guesses is None:
+            continue
+        played += 1
+        if user_id in game["leaderboard"]:
+            wins += 1
+            distribution[len(guesses) - 1] += 1
+            streak = streak + 1 if last_win == previous_day(game["date"]) else 1
+            best = max(best, streak)
+            last_win = game["date"]
+        else:
+            streak = 0
+    return played, wins, distribution, streak, best
+
+
+def main(days=60, players=5000):
+    archive = []
+    history = History()
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteGameStore(Path(tmp) / "bench.db")
+        rollover = 0.0
+        for game in simulate(days, players):
+            archive.append(game)
+            start = time.perf_counter()
+            user_ids = history.archive_day(game)
+            rollover += time.perf_counter() - start
+            store.save_history(history, game, user_ids)
+            store.flush()
+        reloaded = store.load_history(1)
+
+    users = random.Random(1).sample(sorted(history.users), 200)
+    start = time.perf_counter()
+    expected = {user_id: rescan(archive, user_id) for user_id in users}
+    rescan_s = (time.perf_counter() - start) / len(users)
+    start = time.perf_counter()
+    for user_id in users:
+        history.stats(user_id)
+    rollup_s = (time.perf_counter() - start) / len(users)
+
+    for h in (history, reloaded):
+        for user_id, (played, wins, distribution, streak, best) in expected.items():
+            stats = h.stats(user_id)
+            assert (stats.played, stats.wins, stats.distribution, stats.streak, stats.best_streak) == \
+                (played, wins, distribution, streak, best), user_id
+    assert reloaded.all_time.ranked == history.all_time.ranked
+    assert reloaded.week.ranked == history.week.ranked
+
+    print(f"{days} days x {players:,} players, {len(history.users):,} users")
+    print(f"rollover    : {rollover / days * 1e3:8.2f} ms per day archived")
+    print(f"/stats read : rescan {rescan_s * 1e6:9.1f} µs, rollup {rollup_s * 1e6:6.2f} µs "
+          f"({rescan_s / rollup_s:,.0f}x)")
+    print("rollups match a full rescan, before and after reloading from SQLite")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Health endpoint cost: Flask in a thread vs aiohttp on the bot's loop.
+
+Each sample runs in a fresh interpreter that has already imported
+discord (the bot always does, and it brings aiohttp along).  From there
+it times bringing up a server that answers GET / and reports the RSS and
+threads it added.  The Flask side needs Flask installed, which the bot
+no longer requires; it is skipped otherwise.
+
+Run from the repo root:  python -m benchmarks.bench_keepalive
+"""
+import importlib.util
+import json
+import statistics
+import subprocess
+import sys
+
+PRELUDE = """
+import json, os, threading, time, urllib.request
+import discord
+
+def rss():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+def get(url):
+    while True:
+        try:
+            with urllib.request.urlopen(url) as r:
+                return r.status
+        except OSError:
+            time.sleep(0.001)
+
+base, threads = rss(), threading.active_count()
+start = time.perf_counter()
+"""
+
+FLASK = PRELUDE + """
+from flask import Flask
+app = Flask('')
+app.add_url_rule('/', 'home', lambda: "I'm alive!")
+threading.Thread(target=lambda: app.run(host="127.0.0.1", port={port}), daemon=True).start()
+assert get("http://127.0.0.1:{port}/") == 200
+print(json.dumps({{"ms": (time.perf_counter() - start) * 1e3, "rss": rss() - base,
+                  "threads": threading.active_count() - threads}}))
+"""
+
+AIOHTTP = PRELUDE + """
+import asyncio
+from aiohttp import web
+
+async def main():
+    async def home(request):
+        return web.Response(text="I'm alive!")
+    app = web.Application()
+    app.router.add_get("/", home)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", {port}).start()
+    assert await asyncio.to_thread(get, "http://127.0.0.1:{port}/") == 200
+    result = {{"ms": (time.perf_counter() - start) * 1e3, "rss": rss() - base,
+               "threads": threading.active_count() - threads - 1}}  # minus to_thread's worker
+    await runner.cleanup()
+    return result
+
+print(json.dumps(asyncio.run(main())))
+"""
+
+
+def sample(child, port):
+    out = subprocess.run([sys.executable, "-c", child.format(port=port)],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.splitlines()[-1])
+
+
+def main(runs=7):
+    servers = (("Flask thread", FLASK), ("aiohttp loop", AIOHTTP))
+    if importlib.util.find_spec("flask") is None:
+        print("Flask isn't installed; measuring aiohttp only")
+        servers = servers[1:]
+    for label, child in servers:
+        results = [sample(child, 18080 + i) for i in range(runs)]
+        ms = statistics.median(r["ms"] for r in results)
+        rss = statistics.median(r["rss"] for r in results)
+        print(f"{label}: {ms:6.1f} ms to first 200, +{rss / 2**20:5.2f} MiB RSS, "
+              f"+{results[0]['threads']} thread(s)")
+
+
+if __name__ == "__main__":
+    main()
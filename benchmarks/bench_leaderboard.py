@@ -0,0 +1,75 @@
+"""Daily leaderboard cost on a busy day: sorted list vs Leaderboard.
+
+Replays N solves, each followed by one /leaderboard call from a random
+solver.  The list version does what the bot used to: sort on every solve,
+sort again plus a linear rank scan and a fresh top-10 render on every
+/leaderboard.  Rendering uses the bot's own format.
+
+Run from the repo root:  python -m benchmarks.bench_leaderboard
+"""
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from src.leaderboard import Leaderboard
+
+
+def render(entries):
+    return "\n".join(
+        f"{i}. **{e['username']}** — {e['attempts']} tries ({e['completion_time'].strftime('%H:%M EDT')})"
+        for i, e in enumerate(entries, 1)
+    )
+
+
+def solves(n, seed=0):
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        {"user_id": i, "username": f"trainer{i}", "attempts": rng.randint(1, 9),
+         "completion_time": start + timedelta(seconds=i * 86400 / n)}
+        for i in range(n)
+    ]
+
+
+def run_list(entries, lookups):
+    board = []
+    for entry, user_id in zip(entries, lookups):
+        board.append(entry)
+        board.sort(key=lambda x: (x["attempts"], x["completion_time"]))
+        # /leaderboard
+        board.sort(key=lambda x: (x["attempts"], x["completion_time"]))
+        render(board[:10])
+        next(i for i, e in enumerate(board, 1) if e["user_id"] == user_id)
+    return board
+
+
+def run_leaderboard(entries, lookups):
+    board = Leaderboard()
+    for entry, user_id in zip(entries, lookups):
+        board.add(entry)
+        board.top_payload(render)
+        board.rank(user_id)
+    return board
+
+
+def main(sizes=(1_000, 5_000, 10_000)):
+    for n in sizes:
+        entries = solves(n)
+        rng = random.Random(1)
+        lookups = [rng.randrange(i + 1) for i in range(n)]
+
+        start = time.perf_counter()
+        expected = run_list(entries, lookups)
+        list_s = time.perf_counter() - start
+        start = time.perf_counter()
+        board = run_leaderboard(entries, lookups)
+        board_s = time.perf_counter() - start
+
+        assert list(board) == expected
+        assert all(board.rank(e["user_id"]) == i for i, e in enumerate(expected[:500], 1))
+        print(f"{n:>6,} solvers: list {list_s * 1e6 / n:8.1f} µs/solve, "
+              f"Leaderboard {board_s * 1e6 / n:6.1f} µs/solve ({list_s / board_s:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
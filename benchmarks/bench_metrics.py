@@ -0,0 +1,64 @@
+"""What instrumentation adds to a command, and what a scrape costs.
+
+Times a no-op coroutine with and without instrument_command (the
+difference is the per-command overhead), a bare Histogram.observe and
+Counter.inc, and rendering a registry holding a day's worth of series.
+
+Run from the repo root:  python -m benchmarks.bench_metrics
+"""
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from src import metrics
+from src.metrics import Counter, Histogram, instrument_command
+
+
+class FakeInteraction:
+    command = None
+    created_at = datetime.now(timezone.utc)
+
+
+async def noop(interaction):
+    return None
+
+
+async def timed_calls(func, calls):
+    interaction = FakeInteraction()
+    start = time.perf_counter()
+    for _ in range(calls):
+        await func(interaction)
+    return (time.perf_counter() - start) / calls
+
+
+def main(calls=200_000):
+    plain = asyncio.run(timed_calls(noop, calls))
+    wrapped = asyncio.run(timed_calls(instrument_command(noop), calls))
+    print(f"command call : {plain * 1e6:5.2f} µs bare, {wrapped * 1e6:5.2f} µs instrumented "
+          f"(+{(wrapped - plain) * 1e6:.2f} µs)")
+
+    histogram = Histogram("bench_seconds", "bench", "command")
+    counter = Counter("bench_total", "bench", "result")
+    start = time.perf_counter()
+    for i in range(calls):
+        histogram.observe(i * 1e-7, "guess")
+    observe_s = (time.perf_counter() - start) / calls
+    start = time.perf_counter()
+    for _ in range(calls):
+        counter.inc("hit")
+    inc_s = (time.perf_counter() - start) / calls
+    print(f"observe      : {observe_s * 1e9:5.0f} ns, counter inc {inc_s * 1e9:5.0f} ns")
+
+    for name in ("status", "help", "daily", "start", "quit", "guess", "hint", "solve", "leaderboard",
+                 "timezone", "stats"):
+        metrics.COMMAND_SECONDS.observe(0.01, name)
+        metrics.COMMAND_RESPONSE_SECONDS.observe(0.1, name)
+    start = time.perf_counter()
+    for _ in range(1000):
+        body = metrics.render()
+    render_s = (time.perf_counter() - start) / 1000
+    print(f"scrape       : {render_s * 1e3:5.2f} ms per render, {len(body.splitlines())} lines")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Guesses per second with write-behind SQLite persistence on and off.
+
+Simulated players start personal games and guess, doing the same state
+updates and store calls as /start and /guess, while the store's flush
+loop runs in the background.  Afterwards the SQLite copy is reloaded and
+compared with the in-memory state.
+
+Run from the repo root:  python -m benchmarks.bench_persistence
+"""
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from src.feedback import feedback_code
+from src.game_logic import get_game_data
+from src.sessions import SessionManager
+from src.storage import GameStore, SQLiteGameStore
+
+
+async def play(store, players, guesses_per_player, seed=0):
+    data = get_game_data()
+    rng = random.Random(seed)
+    active_games = SessionManager()
+    flusher = asyncio.create_task(store.run())
+
+    start = time.perf_counter()
+    total = 0
+    for round_no in range(guesses_per_player + 1):
+        for user_id in range(players):
+            if round_no == 0:
+                game = active_games.start(user_id, rng.choice(data.entries)["pokedex"])
+                store.save_personal(user_id, game)
+                continue
+            game = active_games.get(user_id)
+            guess = rng.choice(data.entries)
+            game.add_guess(guess["pokedex"], feedback_code(guess, game.secret))
+            store.save_personal(user_id, game)
+            total += 1
+        await asyncio.sleep(0)  # let the flush loop run between rounds, like real traffic
+    elapsed = time.perf_counter() - start
+
+    flusher.cancel()
+    try:
+        await flusher
+    except asyncio.CancelledError:
+        pass
+    store.flush()
+    return total / elapsed, {user_id: active_games.get(user_id) for user_id in range(players)}
+
+
+def main(players=5000, guesses_per_player=8):
+    rate_off, _ = asyncio.run(play(GameStore(), players, guesses_per_player))
+    print(f"persistence off: {rate_off:10,.0f} guesses/s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteGameStore(Path(tmp) / "bench.db", flush_interval=0.05)
+        rate_on, games = asyncio.run(play(store, players, guesses_per_player))
+        print(f"persistence on : {rate_on:10,.0f} guesses/s ({rate_on / rate_off:.0%} of in-memory)")
+
+        restored = SQLiteGameStore(Path(tmp) / "bench.db").load_personal(get_game_data().index.by_number)
+        for user_id, game in games.items():
+            assert restored[user_id].guess_dex == game.guess_dex, user_id
+            assert restored[user_id].codes == game.codes, user_id
+        print(f"restored {len(restored)} games from SQLite, all match")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Daily secret schedule, and what a command pays to find today's game.
+
+Checks the schedule over many years: the same on every build, no secret
+back within WINDOW days, and the process-wide RNG untouched.  Then times
+a command's lookup of its guild's daily game with the old per-command
+date check against the read left after the rollover task.
+
+Run from the repo root:  python -m benchmarks.bench_schedule
+"""
+import random
+import time
+
+from src.game_logic import get_game_data
+from src.guilds import GuildPartitions
+from src.schedule import EPOCH, WINDOW, DailySchedule
+from src.storage import GameStore
+
+
+def old_lookup(guilds, guild_id):
+    """initialize_daily_game before the rollover task: format the date, compare."""
+    state = guilds.get(guild_id)
+    today = state.today()
+    if state.daily_game["date"] != today:
+        raise AssertionError("no rollover expected")
+    return state.daily_game
+
+
+def main(years=20, lookups=200_000):
+    numbers = [p["pokedex"] for p in get_game_data().entries]
+    days = years * 365
+    rng_state = random.getstate()
+    start = time.perf_counter()
+    schedule = DailySchedule(numbers)
+    dealt = [secret for _, secret in schedule.upcoming(EPOCH.isoformat(), days)]
+    build_s = time.perf_counter() - start
+    assert random.getstate() == rng_state, "schedule touched the global RNG"
+    assert dealt == [s for _, s in DailySchedule(numbers).upcoming(EPOCH.isoformat(), days)]
+    last_seen = {}
+    closest = days
+    for day, secret in enumerate(dealt):
+        if secret in last_seen:
+            closest = min(closest, day - last_seen[secret])
+        last_seen[secret] = day
+    assert closest > WINDOW, closest
+    print(f"{years} years from {EPOCH}: {len(numbers)} Pokémon, built in {build_s * 1e3:.1f} ms, "
+          f"closest repeat {closest} days apart (window {WINDOW})")
+    guilds = GuildPartitions(GameStore())
+    guilds.get(1)
+    start = time.perf_counter()
+    for _ in range(lookups):
+        old_lookup(guilds, 1)
+    old_s = (time.perf_counter() - start) / lookups
+    start = time.perf_counter()
+    for _ in range(lookups):
+        guilds.get(1).daily_game
+    new_s = (time.perf_counter() - start) / lookups
+    print(f"per command: date check {old_s * 1e6:5.2f} µs, read {new_s * 1e6:5.2f} µs ({old_s / new_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
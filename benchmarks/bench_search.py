@@ -0,0 +1,87 @@
+"""/pokedex queries: PokedexSearch vs a linear scan of the Pokédex entries.
+
+Queries mix what players narrow by while guessing: open or closed
+height and weight ranges, a generation range, and zero to two types.
+Both sides must return the same Pokémon in the same order; reports
+p50/p99 per query for each, and for a whole /pokedex page (query plus
+formatting the lines).
+
+Run from the repo root:  python -m benchmarks.bench_search
+"""
+import random
+import time
+
+from src.bot import describe_entry
+from src.game_logic import get_game_data
+from src.pokedex import TYPE_NAMES
+
+HEIGHTS = (None, 0.3, 0.5, 1.0, 1.7, 2.0, 3.5)   # metres
+WEIGHTS = (None, 5.0, 10.0, 50.0, 100.0, 300.0)   # kg
+
+
+def bounds(rng, values):
+    """(low, high) with either side open (None)."""
+    low, high = rng.choice(values), rng.choice(values)
+    if low is not None and high is not None and low >= high:
+        low, high = high, None if low == high else low
+    return low, high
+
+
+def queries(count, seed):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(count):
+        first = rng.randint(1, 9)
+        generations = rng.choice([(None, None), (first, first), (first, min(9, first + 2))])
+        types = tuple(rng.sample(TYPE_NAMES, rng.choice((0, 1, 1, 2))))
+        out.append((bounds(rng, HEIGHTS), bounds(rng, WEIGHTS), generations, types))
+    return out
+
+
+def scan(entries, height, weight, generations, types):
+    """Rows matching a query, checking every entry."""
+    def within(value, limits):
+        low, high = limits
+        return (low is None or value >= low) and (high is None or value <= high)
+    return [
+        row for row, p in enumerate(entries)
+        if within(p["height_m"], height) and within(p["weight_kg"], weight)
+        and within(p["generation"], generations) and all(t in p["types"] for t in types)
+    ]
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2] * 1e6, samples[int(0.99 * (len(samples) - 1))] * 1e6
+
+
+def main(count=5000, seed=0):
+    data = get_game_data()
+    search, entries = data.search, data.entries
+    workload = queries(count, seed)
+    scanned, indexed, paged, matches = [], [], [], []
+    for query in workload:
+        start = time.perf_counter()
+        expected = scan(entries, *query)
+        scanned.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        rows = search.query(*query)
+        indexed.append(time.perf_counter() - start)
+        assert rows.tolist() == expected, query
+        matches.append(len(rows))
+
+        start = time.perf_counter()
+        results, _, _ = search.page(search.query(*query), 1)
+        "\n".join(describe_entry(p) for p in results)
+        paged.append(time.perf_counter() - start)
+
+    print(f"{count:,} /pokedex queries over {len(entries):,} Pokémon "
+          f"(median {sorted(matches)[len(matches) // 2]} matches), identical results both ways")
+    for label, samples in (("linear scan", scanned), ("PokedexSearch", indexed), ("query + one page", paged)):
+        p50, p99 = percentiles(samples)
+        print(f"  {label:<17} p50 {p50:7.1f} µs   p99 {p99:7.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
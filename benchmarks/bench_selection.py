@@ -0,0 +1,101 @@
+"""Filtered, weighted /start secrets: SecretPicker vs filtering on every command.
+
+The baseline is what /start would do without the picker: a list
+comprehension over the Pokédex for the filter, then random.choices
+with the weights.  Requests mix filters the way players would, most of
+them unfiltered or a popular few, with a long tail of rare combinations
+(every generation range x type x tier), so the picker's LRU cache sees
+both hits and misses.  Also reports the memory a full cache holds, and
+checks that draws from one pool follow its weights.
+
+Run from the repo root:  python -m benchmarks.bench_selection
+"""
+import random
+import time
+import tracemalloc
+from collections import Counter
+
+from src.game_logic import get_game_data
+from src.pokedex import TYPE_BITS, TYPE_NAMES
+from src.selection import TIERS, SecretPicker, form_weights, load_difficulty
+
+POPULAR = [((1, 9), 0, None), ((1, 1), 0, None), ((1, 3), TYPE_BITS["fire"], "easy"), ((1, 9), 0, "hard")]
+
+
+def workload(picker, requests, seed):
+    """[(generations, type_mask, tier)]: 80% from POPULAR, the rest any combination."""
+    rng = random.Random(seed)
+    ranges = [(a, b) for a in range(1, picker.highest + 1) for b in range(a, picker.highest + 1)]
+    masks = [0] + [TYPE_BITS[t] for t in TYPE_NAMES]
+    return [rng.choice(POPULAR) if rng.random() < 0.8
+            else (rng.choice(ranges), rng.choice(masks), rng.choice((None, *TIERS)))
+            for _ in range(requests)]
+
+
+def filter_each_time(entries, weights, difficulty, generations, type_mask, tier, rng):
+    first, last = generations
+    matching = [
+        i for i, p in enumerate(entries)
+        if first <= p["generation"] <= last
+        and all(t in p["types"] for t in TYPE_NAMES if type_mask & TYPE_BITS[t])
+        and (tier is None or difficulty[p["pokedex"]][2] == tier)
+    ]
+    if not matching:
+        return None
+    return entries[rng.choices(matching, [weights[i] for i in matching])[0]]["pokedex"]
+
+
+def timed(requests, draw):
+    samples = []
+    for request in requests:
+        start = time.perf_counter()
+        draw(*request)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return sum(samples), samples[len(samples) // 2], samples[int(0.99 * (len(samples) - 1))]
+
+
+def report(label, total, p50, p99, requests):
+    print(f"  {label:<26} {requests / total:>10,.0f} draws/s   p50 {p50 * 1e6:6.1f} µs   p99 {p99 * 1e6:7.1f} µs")
+
+
+def main(requests=10_000, seed=0):
+    data = get_game_data()
+    entries, difficulty = data.entries, load_difficulty()
+    weights = form_weights(entries)
+    rng = random.Random(seed)
+    picker = SecretPicker(data.columns, weights, difficulty)
+    mix = workload(picker, requests, seed)
+    print(f"{requests:,} /start draws over {len(entries):,} Pokémon, {len(set(mix)):,} distinct filters")
+
+    report("filter + random.choices", *timed(mix, lambda g, m, t: filter_each_time(
+        entries, weights, difficulty, g, m, t, rng)), requests)
+    report("SecretPicker", *timed(mix, lambda g, m, t: picker.pick(g, m, t, rng)), requests)
+    info = picker.pool.cache_info()
+    print(f"  cache: {info.hits:,} hits, {info.misses:,} misses, {info.currsize} of {info.maxsize} pools kept")
+    report("SecretPicker, cached pools", *timed([POPULAR[2]] * requests, lambda g, m, t: picker.pick(g, m, t, rng)),
+           requests)
+
+    tracemalloc.start()
+    full = SecretPicker(data.columns, weights, difficulty)
+    before = tracemalloc.get_traced_memory()[0]
+    for request in workload(full, 50_000, seed + 1):
+        full.pick(*request)
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"  full cache ({full.pool.cache_info().currsize} pools): {held / 2**10:,.0f} KiB")
+
+    # Draws from the whole Pokédex should land in proportion to the weights
+    draws = 500_000
+    counts = Counter(picker.pick(rng=rng) for _ in range(draws))
+    total = sum(weights)
+    expected = {p["pokedex"]: draws * w / total for p, w in zip(entries, weights)}
+    chi2 = sum((counts[dex] - e) ** 2 / e for dex, e in expected.items()) / (len(expected) - 1)
+    forms = sum(counts[p["pokedex"]] for p, w in zip(entries, weights) if w < 1) / draws
+    print(f"  {draws:,} unfiltered draws: forms drawn {forms:.2%} of the time "
+          f"(weights say {sum(w for w in weights if w < 1) / total:.2%}); chi-square per degree of freedom "
+          f"{chi2:.2f} (about 1 when draws follow the weights)")
+
+
+if __name__ == "__main__":
+    main()
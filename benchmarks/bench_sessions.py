@@ -0,0 +1,85 @@
+"""Memory per personal game session, and the cost of sweeping them.
+
+Simulates 100k users, each partway through a personal game, in the old
+representation (a dict holding Pokémon dicts, a guess list and a
+candidate bitset) and as PersonalGame sessions in a SessionManager.
+Memory is what tracemalloc sees allocated while building each set.
+
+Run from the repo root:  python -m benchmarks.bench_sessions
+"""
+import random
+import time
+import tracemalloc
+
+from src.feedback import feedback_code
+from src.game_logic import get_game_data
+from src.sessions import SessionManager
+
+
+def plan(users, seed=0):
+    """(secret, guesses) per user, with 0-8 guesses each."""
+    entries = get_game_data().entries
+    rng = random.Random(seed)
+    return [(rng.choice(entries), rng.sample(entries, rng.randrange(9))) for _ in range(users)]
+
+
+def build_dicts(games):
+    candidates = get_game_data().candidates
+    active_games = {}
+    for user_id, (secret, guesses) in enumerate(games):
+        active_games[user_id] = {
+            "secret": secret,
+            "attempts": len(guesses),
+            "max_tries": 9,
+            "finished": False,
+            "guesses": list(guesses),
+            "candidates": candidates.from_guesses(guesses, secret),
+        }
+    return active_games
+
+
+def build_sessions(games):
+    active_games = SessionManager()
+    for user_id, (secret, guesses) in enumerate(games):
+        game = active_games.start(user_id, secret["pokedex"])
+        for guess in guesses:
+            game.add_guess(guess["pokedex"], feedback_code(guess, secret))
+    return active_games
+
+
+def measure(build, games):
+    tracemalloc.start()
+    result = build(games)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def main(users=100_000):
+    games = plan(users)
+    get_game_data().candidates.from_guesses(*reversed(games[0]))  # warm the lazy loads
+
+    _, dict_bytes = measure(build_dicts, games)
+    print(f"dict sessions : {dict_bytes / 2**20:7.1f} MiB, {dict_bytes / users:6.0f} B/session")
+    sessions, slot_bytes = measure(build_sessions, games)
+    print(f"PersonalGame  : {slot_bytes / 2**20:7.1f} MiB, {slot_bytes / users:6.0f} B/session "
+          f"({dict_bytes / slot_bytes:.1f}x smaller)")
+
+    # Finish a tenth of the games and let half of the rest go idle past the TTL
+    now = [0.0]
+    sessions.clock = lambda: now[0]
+    for user_id in range(users):
+        if user_id % 10 == 0:
+            sessions.finish(user_id)
+        elif user_id % 2 == 0:
+            sessions._games[user_id].last_active = -sessions.ttl - 1
+        else:
+            sessions.get(user_id)
+    start = time.perf_counter()
+    evicted = sessions.sweep()
+    elapsed = time.perf_counter() - start
+    print(f"sweep         : evicted {evicted:,} of {users:,} in {elapsed * 1e3:.1f} ms, {len(sessions):,} left")
+
+
+if __name__ == "__main__":
+    main()
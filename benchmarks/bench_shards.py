@@ -0,0 +1,222 @@
+"""Several fake shard processes sharing one database, under concurrent guesses.
+
+Each worker process stands in for a bot process running a range of
+shards: its own write-behind store, guild partitions and personal game
+sessions, all on one SQLite file.  Daily guesses go to the worker whose
+shards own the guild, as Discord routes them; personal guesses go to a
+random worker, as if typed in a random server, and every player's
+guesses are sent to all workers at once.
+
+Every player sends 12 personal guesses that all miss, so exactly 9 must
+be accepted whichever workers they hit, and the stored game must hold
+exactly those.  Daily games are reloaded from the database afterwards
+and checked against what the workers reported.  The same personal
+workload is then run with per-process SessionManagers, the single-process
+setup, to show what sharing buys.
+
+Run from the repo root:  python -m benchmarks.bench_shards
+"""
+import asyncio
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+from src.feedback import SOLVED, feedback_code
+from src.game_logic import get_game_data
+from src.guilds import GuildPartitions
+from src.sessions import MAX_TRIES, SessionManager
+from src.shards import shard_of, shard_ranges
+from src.storage import SQLiteGameStore, SQLiteSessionManager
+
+SHARDS = 8
+PERSONAL_GUESSES = MAX_TRIES + 3
+
+
+def daily_guess(guilds, store, guild_id, user_id, guess):
+    """/guess on the daily game: returns (accepted, solved)."""
+    daily_game = guilds.get(guild_id).daily_game
+    attempts = daily_game["attempts"].setdefault(user_id, [])
+    if user_id in daily_game["completions"] or len(attempts) >= MAX_TRIES:
+        return False, False
+    secret = daily_game["pokemon"]
+    code = feedback_code(guess, secret)
+    attempts.append(guess)
+    daily_game["codes"].setdefault(user_id, []).append(code)
+    store.save_daily_attempts(daily_game, user_id, attempts)
+    if code == SOLVED:
+        entry = {"user_id": user_id, "username": f"trainer{user_id}", "attempts": len(attempts),
+                 "completion_time": datetime.now(timezone.utc)}
+        daily_game["completions"][user_id] = entry["completion_time"]
+        daily_game["leaderboard"].add(entry)
+        store.save_completion(daily_game, entry)
+    return True, code == SOLVED
+
+
+async def personal_guess(sessions, user_id, guess):
+    """/guess on a personal game: returns whether it counted."""
+    game = sessions.get(user_id)
+    if game is None:
+        return False
+    code = feedback_code(guess, game.secret)
+    return await sessions.write(sessions.add_guess, user_id, game, guess["pokedex"], code) is not None
+
+
+async def serve(db, shards, shared, inbox, outbox):
+    store = SQLiteGameStore(db, flush_interval=0.05)
+    guilds = GuildPartitions(store)
+    if shared:
+        sessions = SQLiteSessionManager(store)
+    else:
+        sessions = SessionManager(on_save=store.save_personal, on_evict=store.delete_personal)
+    by_number = get_game_data().index.by_number
+    flusher = asyncio.create_task(store.run())
+    outbox.put(("ready",))
+    while True:
+        command = await asyncio.to_thread(inbox.get)
+        kind = command[0]
+        if kind == "stop":
+            break
+        if kind == "start":
+            _, user_id, secret = command
+            await sessions.write(sessions.start, user_id, secret)
+            outbox.put(("started", user_id))
+        elif kind == "personal":
+            _, user_id, dex = command
+            outbox.put(("personal", user_id, dex, await personal_guess(sessions, user_id, by_number(dex))))
+        elif kind == "daily":
+            _, guild_id, user_id, dex = command
+            assert shard_of(guild_id, SHARDS) in shards, (guild_id, shards)
+            accepted, solved = daily_guess(guilds, store, guild_id, user_id, by_number(dex))
+            outbox.put(("daily", guild_id, user_id, dex, accepted, solved))
+        await asyncio.sleep(0)  # let the flush loop in, like between interactions
+    flusher.cancel()
+    try:
+        await flusher
+    except asyncio.CancelledError:
+        pass
+    store.flush()
+    outbox.put(("stopped",))
+
+
+def worker(db, shards, shared, inbox, outbox):
+    asyncio.run(serve(db, shards, shared, inbox, outbox))
+
+
+def run(db, workers, shared, users, guild_ids, players, seed=0):
+    """Play the workload on `workers` processes; return (replies, seconds)."""
+    rng = random.Random(seed)
+    numbers = [p["pokedex"] for p in get_game_data().entries]
+    context = multiprocessing.get_context("spawn")
+    ranges = shard_ranges(SHARDS, workers)
+    inboxes = [context.Queue() for _ in ranges]
+    outbox = context.Queue()
+    processes = [context.Process(target=worker, args=(db, list(shards), shared, inbox, outbox))
+                 for shards, inbox in zip(ranges, inboxes)]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        assert outbox.get()[0] == "ready"
+
+    def owner(guild_id):
+        return next(i for i, shards in enumerate(ranges) if shard_of(guild_id, SHARDS) in shards)
+
+    # Personal games start wherever the player happens to be
+    secrets = {user_id: rng.choice(numbers) for user_id in range(users)}
+    for user_id, secret in secrets.items():
+        rng.choice(inboxes).put(("start", user_id, secret))
+    for _ in secrets:
+        assert outbox.get()[0] == "started"
+
+    commands = []
+    for user_id, secret in secrets.items():
+        misses = [n for n in rng.sample(numbers, PERSONAL_GUESSES + 1) if n != secret][:PERSONAL_GUESSES]
+        commands += [(rng.randrange(workers), ("personal", user_id, dex)) for dex in misses]
+    daily_secrets = {guild_id: get_game_data().schedule.secret(datetime.now(timezone.utc).strftime("%Y-%m-%d"))
+                     for guild_id in guild_ids}
+    for guild_id in guild_ids:
+        for user_id in range(players):
+            for _ in range(MAX_TRIES):
+                dex = daily_secrets[guild_id] if rng.random() < 0.15 else rng.choice(numbers)
+                commands.append((owner(guild_id), ("daily", guild_id, user_id, dex)))
+    rng.shuffle(commands)
+
+    start = time.perf_counter()
+    for target, command in commands:
+        inboxes[target].put(command)
+    replies = [outbox.get() for _ in commands]
+    elapsed = time.perf_counter() - start
+    for inbox in inboxes:
+        inbox.put(("stop",))
+    for _ in processes:
+        assert outbox.get()[0] == "stopped"
+    for process in processes:
+        process.join()
+    return replies, elapsed
+
+
+def check_personal(db, replies):
+    """Players whose stored game holds exactly MAX_TRIES guesses, the ones accepted."""
+    accepted = {}
+    for kind, user_id, dex, ok in (r for r in replies if r[0] == "personal"):
+        if ok:
+            accepted.setdefault(user_id, Counter())[dex] += 1
+    stored = SQLiteGameStore(db).load_personal(get_game_data().index.by_number)
+    good = 0
+    for user_id, game in stored.items():
+        guesses = Counter(game.guess_numbers.tolist())
+        if game.attempts == MAX_TRIES and game.finished and guesses == accepted.get(user_id):
+            good += 1
+    return good, sum(sum(c.values()) for c in accepted.values())
+
+
+def check_daily(db, replies):
+    """Every guild reloads with the attempts and solvers the workers reported."""
+    attempts, solvers = Counter(), {}
+    for _, guild_id, user_id, dex, ok, solved in (r for r in replies if r[0] == "daily"):
+        if ok:
+            attempts[guild_id, user_id] += 1
+        if solved:
+            solvers.setdefault(guild_id, {})[user_id] = attempts[guild_id, user_id]
+    guilds = GuildPartitions(SQLiteGameStore(db))
+    for guild_id in {g for g, _ in attempts}:
+        game = guilds.get(guild_id).daily_game
+        assert {u: len(a) for u, a in game["attempts"].items()} == \
+            {u: n for (g, u), n in attempts.items() if g == guild_id}, guild_id
+        assert {e["user_id"]: e["attempts"] for e in game["leaderboard"]} == solvers.get(guild_id, {}), guild_id
+        ranked = [(e["attempts"], e["completion_time"]) for e in game["leaderboard"]]
+        assert ranked == sorted(ranked), guild_id
+    return len(solvers)
+
+
+def main(users=500, guild_count=16, players=25, worker_counts=(1, 4)):
+    guild_ids = [(i + 1) << 22 for i in range(guild_count)]  # spread over the shards
+    print(f"{os.cpu_count()} CPU core(s); workers only add throughput with cores to run on")
+    for workers in worker_counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = str(Path(tmp) / "bench.db")
+            SQLiteGameStore(db)  # create the schema once, as the launcher does
+            replies, elapsed = run(db, workers, True, users, guild_ids, players)
+            good, accepted = check_personal(db, replies)
+            assert good == users and accepted == users * MAX_TRIES, (good, accepted)
+            ranked = check_daily(db, replies)
+            print(f"{workers} worker(s), {SHARDS} shards: {len(replies):,} concurrent guesses in {elapsed:.2f} s "
+                  f"({len(replies) / elapsed:,.0f}/s); all {users} personal games exact, "
+                  f"{ranked} guild leaderboards reload as reported")
+
+    workers = max(worker_counts)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = str(Path(tmp) / "bench.db")
+        SQLiteGameStore(db)
+        replies, _ = run(db, workers, False, users, guild_ids, players)
+        good, accepted = check_personal(db, replies)
+        print(f"per-process sessions, {workers} workers: {accepted:,} of {users * MAX_TRIES:,} personal guesses "
+              f"counted, {good} of {users} games stored intact")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Cold-start cost of loading the Pokédex: pokemon.json vs pokemon.bin.
+
+Each sample runs in a fresh interpreter so nothing is warm.  Reports
+the load time and the peak RSS the load added on top of the imports.
+The pokemon.bin time includes hashing pokemon.json to check the binary
+file is current.  Only the time is meant to improve: both paths decode
+into per-process objects, so the binary path's peak RSS is no lower.
+
+Run from the repo root:  python -m benchmarks.bench_startup
+"""
+import json
+import statistics
+import subprocess
+import sys
+
+CHILD = """
+import json, resource, time
+from pathlib import Path
+from src.dataset import BINARY_FILE, load_dataset
+binary = BINARY_FILE if {use_binary} else Path("/nonexistent")
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+entries, columns = load_dataset(binary_path=binary)
+elapsed = time.perf_counter() - start
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"ms": elapsed * 1e3, "rss_kib": after - before, "n": len(entries)}}))
+"""
+
+
+def sample(use_binary):
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD.format(use_binary=use_binary)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out)
+
+
+def main(runs=15):
+    for label, use_binary in (("pokemon.json", False), ("pokemon.bin ", True)):
+        results = [sample(use_binary) for _ in range(runs)]
+        ms = statistics.median(r["ms"] for r in results)
+        rss = statistics.median(r["rss_kib"] for r in results)
+        print(f"{label}: {ms:6.2f} ms median load, +{rss:,.0f} KiB peak RSS ({results[0]['n']} entries)")
+
+
+if __name__ == "__main__":
+    main()
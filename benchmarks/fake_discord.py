@@ -0,0 +1,148 @@
+"""Stand-ins for discord.Interaction and its response objects, and for Discord's REST API.
+
+The interaction side covers what the slash commands touch (user,
+guild_id, command, response.send_message / defer / is_done,
+followup.send), so their callbacks can be called offline.  Messages are
+recorded on the interaction with their embeds serialized, as discord.py
+does before sending, and a second initial response or a followup before
+the first one raises, as Discord would.
+
+FakeDiscordAPI serves POST /channels/<id>/messages through
+httpx.MockTransport with Discord's global and per-channel rate limits
+(429 with Retry-After), optional latency, injected 500s, an outage
+window of 503s, missing channels, and nonce deduplication.
+"""
+import asyncio
+import json
+import random
+import time
+from collections import Counter, deque
+
+import httpx
+
+
+class FakeUser:
+    def __init__(self, user_id, display_name=None):
+        self.id = user_id
+        self.display_name = display_name or f"trainer{user_id}"
+
+
+def _message(content, embed, embeds, ephemeral):
+    embeds = [embed] if embed is not None else embeds or []
+    return {"content": content, "embeds": [e.to_dict() for e in embeds], "ephemeral": ephemeral}
+
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self.done = False
+
+    def is_done(self):
+        return self.done
+
+    def _respond(self):
+        if self.done:
+            raise RuntimeError("this interaction has already been responded to")
+        self.done = True
+
+    async def send_message(self, content=None, *, embed=None, embeds=None, ephemeral=False, **kwargs):
+        self._respond()
+        self.interaction.sent.append(_message(content, embed, embeds, ephemeral))
+
+    async def defer(self, *, ephemeral=False, thinking=False):
+        self._respond()
+
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def send(self, content=None, *, embed=None, embeds=None, ephemeral=False, **kwargs):
+        if not self.interaction.response.done:
+            raise RuntimeError("a followup needs an initial response or defer first")
+        self.interaction.sent.append(_message(content, embed, embeds, ephemeral))
+
+
+class FakeInteraction:
+    def __init__(self, user, guild_id=None, command=None):
+        self.user = user
+        self.guild_id = guild_id
+        self.command = command   # the app_commands.Command, which metrics labels by
+        self.sent = []           # every message, initial response first
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+
+
+async def invoke(command, user, guild_id=None, **options):
+    """Run a slash command's callback the way the tree would; returns the interaction."""
+    interaction = FakeInteraction(user, guild_id, command)
+    await command.callback(interaction, **options)
+    return interaction
+
+
+class FakeDiscordAPI:
+    def __init__(self, global_rate=50, route_limit=5, route_period=5.0, latency=0.0, error_rate=0.0,
+                 missing_channels=(), seed=0):
+        self.global_rate = global_rate      # requests per second
+        self.route_limit = route_limit      # messages per channel...
+        self.route_period = route_period    # ...per this many seconds
+        self.latency = latency
+        self.error_rate = error_rate
+        self.missing_channels = set(missing_channels)
+        self.rng = random.Random(seed)
+        self.down_until = 0.0               # time.monotonic() before which every request gets a 503
+        self.messages = {}                  # channel_id -> [payload]
+        self.statuses = Counter()
+        self.deduplicated = 0               # resends dropped by their nonce
+        self._nonces = set()
+        self._recent = deque()              # request times in the last second
+        self._routes = {}                   # channel_id -> deque of message times
+
+    def transport(self):
+        return httpx.MockTransport(self.handle)
+
+    def _reply(self, status, body=None, headers=None):
+        self.statuses[status] += 1
+        return httpx.Response(status, json=body or {}, headers=headers)
+
+    def _rate_limited(self, retry_after, is_global):
+        return self._reply(
+            429,
+            {"message": "You are being rate limited.", "retry_after": retry_after, "global": is_global},
+            {"Retry-After": f"{retry_after:.3f}", "X-RateLimit-Global": str(is_global).lower(),
+             "X-RateLimit-Scope": "global" if is_global else "user"},
+        )
+
+    async def handle(self, request):
+        if self.latency:
+            await asyncio.sleep(self.latency * (0.5 + self.rng.random()))
+        now = time.monotonic()
+        if now < self.down_until:
+            return self._reply(503, {"message": "Service Unavailable"})
+        recent = self._recent
+        while recent and recent[0] <= now - 1.0:
+            recent.popleft()
+        if len(recent) >= self.global_rate:
+            return self._rate_limited(recent[0] + 1.0 - now, True)
+        recent.append(now)
+
+        channel_id = int(request.url.path.rsplit("/", 2)[-2])   # .../channels/<id>/messages
+        if channel_id in self.missing_channels:
+            return self._reply(404, {"message": "Unknown Channel", "code": 10003})
+        sent = self._routes.setdefault(channel_id, deque())
+        while sent and sent[0] <= now - self.route_period:
+            sent.popleft()
+        if len(sent) >= self.route_limit:
+            return self._rate_limited(sent[0] + self.route_period - now, False)
+        if self.rng.random() < self.error_rate:
+            return self._reply(500, {"message": "Internal Server Error"})
+
+        payload = json.loads(request.content)
+        nonce = (channel_id, payload.get("nonce"))
+        if payload.get("enforce_nonce") and nonce in self._nonces:
+            self.deduplicated += 1
+            return self._reply(200, {"channel_id": str(channel_id)})
+        self._nonces.add(nonce)
+        sent.append(now)
+        self.messages.setdefault(channel_id, []).append(payload)
+        return self._reply(200, {"channel_id": str(channel_id)})
@@ -0,0 +1,78 @@
+"""An in-process stand-in for PokéAPI, served through httpx.MockTransport.
+
+Builds /pokemon, /pokemon/<id>/ and /pokemon-species/<id>/ documents from
+data/pokemon.json, with optional latency and injected 429/503 failures.
+Every document carries an ETag and honours If-None-Match.
+"""
+import asyncio
+import hashlib
+import json
+import random
+from collections import Counter
+
+import httpx
+
+from src.dataset import load_json
+from src.fetch_pokemon import POKEAPI
+
+GENERATIONS = {v: k for k, v in {
+    "generation-i": 1, "generation-ii": 2, "generation-iii": 3,
+    "generation-iv": 4, "generation-v": 5, "generation-vi": 6,
+    "generation-vii": 7, "generation-viii": 8, "generation-ix": 9,
+}.items()}
+
+
+class FakePokeAPI:
+    def __init__(self, entries=None, latency=0.0, flaky_rate=0.0, broken_ids=(), seed=0):
+        self.entries = {p["pokedex"]: p for p in (entries or load_json())}
+        self.latency = latency
+        self.flaky_rate = flaky_rate
+        self.broken_ids = set(broken_ids)
+        self.rng = random.Random(seed)
+        self.requests = Counter()  # path -> hits
+        self.not_modified = 0
+
+    def transport(self):
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request):
+        path = request.url.path
+        self.requests[path] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.rng.random() < self.flaky_rate:
+            if self.rng.random() < 0.5:
+                return httpx.Response(429, headers={"Retry-After": "0.01"})
+            return httpx.Response(503)
+
+        body = self.document(path)
+        if isinstance(body, int):
+            return httpx.Response(body)
+        etag = '"' + hashlib.sha1(json.dumps(body, sort_keys=True).encode()).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, json=body, headers={"ETag": etag})
+
+    def document(self, path):
+        """The JSON body served at `path`, or an HTTP error status."""
+        parts = path.strip("/").split("/")
+        if parts[-1] == "pokemon":
+            return {"results": [
+                {"name": p["name"], "url": f"{POKEAPI}/pokemon/{dex}/"} for dex, p in self.entries.items()
+            ]}
+        dex = int(parts[-1])
+        if dex in self.broken_ids or dex not in self.entries:
+            return 500 if dex in self.broken_ids else 404
+        p = self.entries[dex]
+        if parts[-2] == "pokemon-species":
+            return {"generation": {"name": GENERATIONS[p["generation"]]}}
+        return {
+            "id": dex,
+            "name": p["name"],
+            "is_default": True,
+            "height": round(p["height_m"] * 10),
+            "weight": round(p["weight_kg"] * 10),
+            "types": [{"slot": i + 1, "type": {"name": t}} for i, t in enumerate(p["types"])],
+            "species": {"url": f"{POKEAPI}/pokemon-species/{dex}/"},
+        }
@@ -0,0 +1,77 @@
+import re
+from bisect import bisect_left
+from functools import lru_cache
+
+MAX_CHOICES = 25  # Discord autocomplete limit
+
+# Match tiers, best first
+PREFIX, WORD_PREFIX, SUBSTRING = 0, 1, 2
+
+_SEPARATORS = re.compile(r"[\s_.]+")
+
+
+def _default_choice(name, value):
+    return (name, value)
+
+
+class AutocompleteEngine:
+    """Ranked name search for /guess autocomplete, built once at startup.
+
+    Every suffix of every name goes into one sorted list, so all names
+    containing the query are a single contiguous bisect range.  Hits are
+    ranked by where the match starts: the start of the name, the start of
+    a later word ("iron-" -> "iron-hands" for "hands"), then anywhere.
+    Choices are built once per Pokémon and recent queries sit in an LRU.
+    When nothing contains the query, `fuzzy` (a FuzzyMatcher over the same
+    entries) supplies close spellings instead.
+    """
+
+    def __init__(self, entries, choice=_default_choice, cache_size=4096, starters=10, fuzzy=None):
+        self.fuzzy = fuzzy
+        self.choices = [choice(name=p["name"].title(), value=p["name"]) for p in entries]
+        self.starters = tuple(self.choices[:starters])
+
+        suffixes = []
+        for i, p in enumerate(entries):
+            name = p["name"].lower()
+            for start in range(len(name)):
+                if start == 0:
+                    tier = PREFIX
+                elif name[start - 1] == "-":
+                    tier = WORD_PREFIX
+                else:
+                    tier = SUBSTRING
+                suffixes.append((name[start:], tier, i))
+        suffixes.sort()
+        self._suffixes = [s for s, _, _ in suffixes]
+        self._hits = [(tier, i) for _, tier, i in suffixes]
+
+        self.search = lru_cache(maxsize=cache_size)(self._search)
+
+    @staticmethod
+    def normalize(query):
+        """Lowercase and map spaces/dots to the hyphens used in names."""
+        return _SEPARATORS.sub("-", (query or "").strip().lower()).strip("-")
+
+    def complete(self, current, limit=MAX_CHOICES):
+        """Return up to `limit` ranked choices for what the user has typed."""
+        query = self.normalize(current)
+        if not query:
+            return list(self.starters[:limit])
+        return list(self.search(query)[:limit])
+
+    def _search(self, query):
+        lo = bisect_left(self._suffixes, query)
+        hi = bisect_left(self._suffixes, query + "\uffff", lo)
+
+        if lo == hi:
+            if self.fuzzy is None:
+                return ()
+            return tuple(self.choices[i] for i in self.fuzzy.suggest_indices(query, limit=MAX_CHOICES))
+
+        best = {}
+        for tier, i in self._hits[lo:hi]:
+            if tier < best.get(i, SUBSTRING + 1):
+                best[i] = tier
+        ranked = sorted(best, key=lambda i: (best[i], i))
+        return tuple(self.choices[i] for i in ranked[:MAX_CHOICES])
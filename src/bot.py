@@ -1,145 +1,364 @@
+import asyncio
 import os
-import random
-from datetime import datetime, timezone
-from flask import Flask
-from threading import Thread
+import sqlite3
+from datetime import datetime, time, timedelta, timezone
+from functools import partial
 
 import discord
+from aiohttp import web
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 # IMPORTANT: relative import because we run with `python -m src.bot`
-from .game_logic import find_pokemon, POKEMON_DATA
+from .game_logic import find_pokemon, suggest_pokemon, get_game_data, reload_game_data, set_choice_factory
+from .storage import DB_FILE, GameStore, SQLiteGameStore, SQLiteSessionManager
+from .sessions import SessionManager
+from .feedback import SOLVED, dex_hint, feedback_code, hint_lines
+from .guilds import GuildPartitions, timezone_names
+from .pokedex import TYPE_NAMES, TYPE_BITS
+from .selection import TIERS, parse_generations
+from .shards import shard_config, shard_of
+from .broadcast import GLOBAL_BURST, GLOBAL_RATE, Broadcaster, make_client
+from .command_sync import sync_if_changed
+from . import metrics
+from .metrics import EVENT_LOOP_LAG, Gauge, instrument_autocomplete, instrument_command
 
 # =========================================================
-# Flask keep-alive (UNCHANGED)
+# Health, readiness and /metrics (aiohttp, on the bot's own loop)
 # =========================================================
-app = Flask('')
+async def home(request):
+    return web.Response(text="I'm alive!")
 
-@app.route('/')
-def home():
-    return "I'm alive!"
+async def ready(request):
+    """200 once the gateway is connected, 503 while starting or reconnecting.
 
-def run():
-    app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 8080)))
-
-def keep_alive():
-    t = Thread(target=run, daemon=True)
-    t.start()
+    With shards, every shard this process runs must be connected: each
+    worker serves its own endpoints, so a stuck shard shows on its worker.
+    """
+    if bot_updating:
+        return web.Response(status=503, text="updating")
+    if not bot.is_ready() or bot.is_closed():
+        return web.Response(status=503, text="starting")
+    shards = getattr(bot, "shards", {})  # only on AutoShardedBot, and only this process's shards
+    down = sorted(shard_id for shard_id, shard in shards.items() if shard.is_closed())
+    if down:
+        return web.Response(status=503, text=f"shards down: {', '.join(map(str, down))}")
+    return web.Response(text=f"ready (shards {', '.join(map(str, sorted(shards)))})" if shards else "ready")
+
+async def metrics_endpoint(request):
+    # Same loop as the commands, so no game state is read mid-update
+    return web.Response(text=metrics.render(), headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+async def keep_alive():
+    """Serve the endpoints on PORT; returns the runner to clean up on shutdown."""
+    app = web.Application()
+    app.router.add_get("/", home)
+    app.router.add_get("/ready", ready)
+    app.router.add_get("/metrics", metrics_endpoint)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "0.0.0.0", int(os.environ.get("PORT", 8080))).start()
+    return runner
 
 # =========================================================
 # Discord Bot Setup
 # =========================================================
-intents = discord.Intents.default()
-bot = commands.Bot(command_prefix="!", intents=intents)
+# Built by create_bot(); the commands read them from here
+bot = None
+store = None
+guilds = None
+active_games = None
+broadcaster = None
+shard_count = None
+shard_ids = None
+multi_process = False  # other processes run the rest of the shards, and can reach the same players
 
-# Daily game state (shared puzzle)
-daily_game = None  # dict initialized each day
-# Personal games per user_id
-active_games: dict[int, dict] = {}
 bot_updating = False
+store_task = None  # background flush loop, started in on_ready
+broadcast_task = None  # posts announcements, started in on_ready
+
+def owns_guild(guild_id):
+    """Whether this process runs the guild's shard (and so announces for it)."""
+    return not multi_process or shard_of(guild_id, shard_count) in shard_ids
+
+
+def rollover_announcement(state, finished):
+    """Message for the guild's announcement channel: yesterday's answer and winners, then today's prompt."""
+    embed = discord.Embed(
+        title="🌅 A new daily Squirdle is here!",
+        description="Use `/daily` to start today's puzzle, then `/guess` your way to the top of `/leaderboard`.",
+        color=discord.Color.gold()
+    )
+    if finished:
+        embed.add_field(name=f"🔍 {finished['date']}'s Pokémon", value=f"**{finished['pokemon']['name'].title()}**",
+                        inline=False)
+        board = finished["leaderboard"]
+        winners = "\n".join(
+            f"{medal} **{entry['username']}** — {entry['attempts']} tries"
+            for medal, entry in zip(("🥇", "🥈", "🥉"), board)
+        )
+        if len(board) > 3:
+            winners += f"\n...and **{len(board) - 3}** more solvers"
+        embed.add_field(name="🏆 Winners", value=winners or "Nobody solved it!", inline=False)
+    embed.set_footer(text=f"💡 New puzzles start at midnight ({state.timezone}).")
+    return {"embeds": [embed.to_dict()]}
+
+
+def announce_rollover(state, finished, user_ids):
+    if user_ids:
+        print(f"📚 Archived {finished['date']} for guild {state.guild_id}: {len(user_ids)} players")
+    print(f"🎮 Daily Squirdle initialized for guild {state.guild_id}: {state.daily_game['pokemon']['name'].title()}")
+    if state.channel_id:
+        broadcaster.post(state.guild_id, state.daily_game["date"], state.channel_id,
+                         rollover_announcement(state, finished))
+
+
+def announcement_failed(guild_id, channel_id, status):
+    print(f"⚠️ Announcement to channel {channel_id} in guild {guild_id} failed ({status})")
+    if status in (403, 404):  # no access, or the channel is gone: stop posting there
+        guilds.set_channel(guild_id, None)
+
+
+# /metrics gauges, read at scrape time
+Gauge("squirdle_personal_games", "Personal games held, including finished ones not yet swept.",
+      lambda: len(active_games))
+Gauge("squirdle_daily_participants", "Players in today's daily game, over loaded guilds.",
+      lambda: sum(len(state.daily_game["attempts"]) for state in guilds if state.daily_game))
+Gauge("squirdle_leaderboard_entries", "Solvers on today's leaderboards, over loaded guilds.",
+      lambda: sum(len(state.daily_game["leaderboard"]) for state in guilds if state.daily_game))
+Gauge("squirdle_loaded_guilds", "Guild partitions in memory.", lambda: len(guilds))
+Gauge("squirdle_broadcast_pending", "Announcements queued and not yet sent.", lambda: len(broadcaster))
+Gauge("squirdle_gateway_latency_seconds", "Discord gateway heartbeat latency.", lambda: bot.latency)
+
+# Ranked /guess autocomplete, built once per dataset with ready-made Choice objects
+set_choice_factory(app_commands.Choice)
 
 
 # =========================================================
-# Daily Game Initialization
+# Daily Game
 # =========================================================
-def initialize_daily_game():
-    """Initialize or refresh the daily game if the date changed."""
-    global daily_game
-    today_edt = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    if not daily_game or daily_game["date"] != today_edt:
-        random.seed(today_edt)
-        daily_pokemon = random.choice(POKEMON_DATA)
-        daily_game = {
-            "pokemon": daily_pokemon,
-            "date": today_edt,
-            "attempts": {},      # user_id -> [list of guesses (dicts)]
-            "completions": {},   # user_id -> datetime
-            "leaderboard": []    # list of {user_id, username, attempts, completion_time}
-        }
-        print(f"🎮 Daily Squirdle initialized: {daily_pokemon['name'].title()}")
-    return daily_game
+def current_daily_game(guild_id):
+    """The guild's daily game; rollover happens in GuildPartitions, not here."""
+    return guilds.get(guild_id).daily_game
+
+
+def restore_state():
+    """Reload saved personal games and unsent announcements; guild daily state loads on first use."""
+    guilds.load_announcing(owns_guild)
+    pending = [message for message in store.load_outbox() if owns_guild(message[0])]
+    broadcaster.resume(pending)
+    if pending:
+        print(f"📣 Resuming {len(pending)} unsent announcements")
+    if multi_process:
+        return  # personal games are read from the database as they're used
+    games = store.load_personal(get_game_data().index.by_number)
+    active_games.restore(games)
+    print(f"💾 Restored {len(games)} personal games")
 
 
 # =========================================================
 # Events
 # =========================================================
-@bot.event
 async def on_ready():
-    global bot_updating
+    global bot_updating, store_task, broadcast_task
     bot_updating = False
     print(f"✅ Logged in as {bot.user}")
-    await bot.tree.sync()
-    print("🌐 Slash commands synced!")
-    initialize_daily_game()
+    if store_task is None:
+        restore_state()
+        store_task = asyncio.create_task(store.run())
+        broadcast_task = asyncio.create_task(run_broadcaster())
+    # Loops first, so a failed sync below can't keep them from starting
+    for loop in (watch_dataset, sweep_sessions, sweep_guilds, rollover_daily, measure_loop_lag):
+        if not loop.is_running():
+            loop.start()
+    if not multi_process or 0 in shard_ids:  # one sync is enough
+        dev_guild = os.getenv("SQUIRDLE_DEV_GUILD")
+        scope = f"to guild {dev_guild}" if dev_guild else "globally"
+        try:
+            synced, seconds = await sync_if_changed(bot.tree, discord.Object(int(dev_guild)) if dev_guild else None)
+        except Exception as e:   # 429 / 5xx / network: commands stay as last synced
+            print(f"⚠️ Slash command sync {scope} failed, retrying on the next reconnect: {e!r}")
+        else:
+            if synced:
+                print(f"🌐 Slash commands synced {scope} in {seconds * 1e3:.0f} ms")
+            else:
+                print(f"🌐 Slash commands unchanged, skipped sync {scope} ({seconds * 1e3:.1f} ms)")
 
-@bot.event
 async def on_disconnect():
     global bot_updating
     bot_updating = True
     print("🔄 Bot is updating - please wait a moment...")
 
-@bot.event
 async def on_resumed():
     global bot_updating
     bot_updating = False
     print("✅ Bot reconnected and ready!")
 
 
+async def run_broadcaster():
+    async with make_client(os.getenv("DISCORD_TOKEN")) as client:
+        await broadcaster.run(client)
+
+
 # =========================================================
-# Helpers
+# Dataset hot reload
 # =========================================================
-async def send_not_found(interaction):
-    await interaction.response.send_message("❌ Pokémon not found! Try again.")
+@tasks.loop(seconds=60)
+async def watch_dataset():
+    """Pick up a refreshed pokemon.bin / pokemon.json without restarting.
+
+    Personal games and candidate bitsets are keyed by Pokédex number and the
+    daily game keeps the Pokémon dictionaries it already holds, so nothing
+    is dropped.
+    """
+    try:
+        if await asyncio.to_thread(reload_game_data):
+            print(f"📦 Pokédex reloaded: {len(get_game_data().entries)} Pokémon")
+    except Exception as e:
+        print(f"⚠️ Pokédex reload failed, keeping the current data: {e}")
+
+
+@tasks.loop(minutes=5)
+async def sweep_sessions():
+    """Drop finished personal games and ones nobody has touched in a day."""
+    try:
+        evicted = await active_games.write(active_games.sweep)
+    except sqlite3.OperationalError as e:
+        print(f"⚠️ Personal game sweep failed, will retry: {e}")
+        return
+    if evicted:
+        print(f"🧹 Evicted {evicted} personal games ({len(active_games)} left)")
 
 
-def compare_and_build_message(guess, secret):
-    """Return list of hint strings comparing guess vs secret."""
-    results = []
+LAG_PROBE = 0.1  # seconds
 
-    # Generation
-    if guess["generation"] == secret["generation"]:
-        results.append("Generation: ✅ same generation")
-    elif guess["generation"] > secret["generation"]:
-        results.append("Generation: 🔽 earlier gen")
-    else:
-        results.append("Generation: 🔼 later gen")
 
-    # Types
-    type_overlap = set(guess["types"]) & set(secret["types"])
-    if type_overlap:
-        results.append(f"Type: ✅ shared {', '.join(type_overlap)}")
-    else:
-        results.append("Type: ❌ no shared types")
+@tasks.loop(seconds=5)
+async def measure_loop_lag():
+    """Sleep a known time and record how much later than that the loop woke us."""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await asyncio.sleep(LAG_PROBE)
+    EVENT_LOOP_LAG.set(loop.time() - start - LAG_PROBE)
+
+
+# Every timezone's midnight falls on a UTC quarter hour
+ROLLOVER_TIMES = [time(hour, minute, tzinfo=timezone.utc) for hour in range(24) for minute in (0, 15, 30, 45)]
+ROLLOVER_WINDOW = timedelta(minutes=15)
+
+
+@tasks.loop(time=ROLLOVER_TIMES)
+async def rollover_daily():
+    """Start each loaded guild's new daily puzzle as its midnight passes.
+
+    Guilds with an announcement channel are loaded to roll over too, which
+    queues their recap; other guilds roll over when they next load.
+    """
+    try:
+        rolled = guilds.rollover(window=ROLLOVER_WINDOW)
+    except Exception as e:
+        print(f"⚠️ Rollover failed, retrying at the next quarter hour: {e!r}")
+        return
+    if rolled:
+        print(f"🌅 Rolled over {rolled} guilds")
+
+
+@tasks.loop(minutes=5)
+async def sweep_guilds():
+    """Drop idle guilds' daily state from memory; it reloads from the store."""
+    evicted = guilds.sweep()
+    if evicted:
+        print(f"🧹 Unloaded {evicted} idle guilds ({len(guilds)} loaded)")
 
-    # Height
-    if guess["height_m"] > secret["height_m"]:
-        results.append("Height: 🔽 secret is shorter")
-    elif guess["height_m"] < secret["height_m"]:
-        results.append("Height: 🔼 secret is taller")
-    else:
-        results.append("Height: ✅ same height")
 
-    # Weight
-    if guess["weight_kg"] > secret["weight_kg"]:
-        results.append("Weight: 🔽 secret is lighter")
-    elif guess["weight_kg"] < secret["weight_kg"]:
-        results.append("Weight: 🔼 secret is heavier")
+# =========================================================
+# Helpers
+# =========================================================
+async def send_not_found(interaction, name):
+    """Reject an unknown guess, offering close spellings when there are any."""
+    suggestions = suggest_pokemon(name)
+    if suggestions:
+        names = ", ".join(f"**{p['name'].title()}**" for p in suggestions)
+        await interaction.response.send_message(f"❌ Pokémon not found! Did you mean {names}?", ephemeral=True)
     else:
-        results.append("Weight: ✅ same weight")
+        await interaction.response.send_message("❌ Pokémon not found!", ephemeral=True)
+
+
+async def write_personal(interaction, method, *args):
+    """Apply an active_games change (start, add_guess, ...) and return its result.
+
+    With several processes it's a database write and may find the file
+    locked for too long; then the player is told to try again and the
+    error is raised on, so the command stops there.
+    """
+    try:
+        return await active_games.write(method, *args)
+    except sqlite3.OperationalError as e:
+        print(f"⚠️ Saving a personal game failed: {e}")
+        await interaction.response.send_message(
+            "⏳ Couldn't save your personal game just now, please try that again in a moment.", ephemeral=True
+        )
+        raise
+
+
+# A hot reload can drop a personal game's secret from the Pokédex; such a
+# game can't be played on, and /guess, /quit or /start end it
+POKEDEX_UPDATED = ("🔄 The Pokédex was updated and your personal game's Pokémon isn't in it any more, "
+                   "so that game has ended. Use `/start` to begin a new one!")
+
 
+def current_candidates(user_id, daily_game):
+    """Return ("personal" | "daily", candidate bitset) for the game /guess would play.
+
+    The bitset is None when the user's daily game is already over, or
+    their personal game's secret is gone from the Pokédex.
+    """
+    game = active_games.get(user_id)
+    if game:
+        return "personal", None if game.secret is None else game.candidates
+    if user_id in daily_game["completions"] or len(daily_game["attempts"].get(user_id, [])) >= 9:
+        return "daily", None
+    return "daily", daily_game["candidates"].get(user_id, get_game_data().candidates.all)
+
+
+def no_candidates_message(mode):
+    """What /hint and /solve say when current_candidates returns no bitset."""
+    if mode == "personal":
+        return POKEDEX_UPDATED
+    return "ℹ️ Your daily game is over! Use `/start` for a personal game."
+
+
+def guess_feedback(guess, secret, code, attempts_left):
+    """Hint lines for a guess just made, ending with the solved / tries-left line."""
+    results = hint_lines(code, guess["types"])
+    if code == SOLVED:
+        results.append("🎉 Correct Pokémon!")
+        return results
+    results.append(dex_hint(code))
+    if attempts_left <= 0:
+        results.append(f"❌ Out of tries! It was **{secret['name'].title()}**.")
+    else:
+        results.append(f"🕹️ {attempts_left} tries left.")
     return results
 
 
+def last_guess_summary(label, guess, code):
+    """The /stats block for a stored guess, rendered from its code."""
+    return "\n\n🔍 **Last {} Guess Summary**\n• Pokémon: **{}**\n• {}".format(
+        label, guess["name"].title(), "\n• ".join(hint_lines(code, guess["types"], dex=True))
+    )
+
+
 # =========================================================
 # Commands
 # =========================================================
 
-@bot.tree.command(name="status", description="Check if the bot is working and your current game status!")
+@app_commands.command(name="status", description="Check if the bot is working and your current game status!")
+@instrument_command
 async def status(interaction: discord.Interaction):
-    global bot_updating, daily_game, active_games
+    global bot_updating
     user_id = interaction.user.id
-    initialize_daily_game()
+    daily_game = current_daily_game(interaction.guild_id)
 
     if bot_updating:
         embed = discord.Embed(
@@ -152,12 +371,12 @@ async def status(interaction: discord.Interaction):
 
     personal_status = "❌ No active personal game"
     last_personal_guess = None
-    if user_id in active_games and not active_games[user_id]["finished"]:
-        game = active_games[user_id]
-        remaining = game["max_tries"] - game["attempts"]
-        personal_status = f"🎮 Active — {remaining} tries left"
-        if game.get("guesses"):
-            last_personal_guess = game["guesses"][-1]
+    game = active_games.get(user_id)
+    if game and game.secret is None:
+        personal_status = POKEDEX_UPDATED
+    elif game:
+        personal_status = f"🎮 Active — {game.remaining} tries left"
+        last_personal_guess = game.last_guess and game.last_guess[0]
 
     user_attempts = len(daily_game["attempts"].get(user_id, []))
     daily_remaining = 9 - user_attempts
@@ -191,7 +410,8 @@ async def status(interaction: discord.Interaction):
 
 # -------------------- HELP --------------------
 
-@bot.tree.command(name="help", description="Learn how to play Squirdle!")
+@app_commands.command(name="help", description="Learn how to play Squirdle!")
+@instrument_command
 async def help_command(interaction: discord.Interaction):
     """Displays game rules and command guide in compact, styled embeds."""
     # --- Embed 1: Overview + Commands ---
@@ -207,12 +427,17 @@ async def help_command(interaction: discord.Interaction):
     embed1.add_field(
         name="🧩 Commands",
         value=(
-            "• `/start` — Begin a new **personal game** (private to you)\n"
+            "• `/start` — Begin a new **personal game** (private to you), optionally by generation, type or difficulty\n"
             "• `/daily` — Play today’s **shared daily puzzle**\n"
             "• `/guess` — Make a guess in your active game\n"
+            "• `/hint` — See how many Pokémon still fit your hints\n"
+            "• `/solve` — Get the best next guess for your game\n"
+            "• `/pokedex` — Search Pokémon by height, weight, generation and type\n"
             "• `/stats` — View detailed progress and last hints\n"
             "• `/status` — Check your ongoing games\n"
-            "• `/leaderboard` — See today’s top solvers\n"
+            "• `/leaderboard` — See today’s, this week’s or all-time top solvers\n"
+            "• `/timezone` — Set when the server’s daily puzzle rolls over (admins)\n"
+            "• `/announce` — Post each day's answer and winners in a channel (admins)\n"
             "• `/quit` — End your personal game early\n"
             "• `/help` — Show this guide"
         ),
@@ -222,7 +447,7 @@ async def help_command(interaction: discord.Interaction):
     embed1.add_field(
         name="📅 Game Modes",
         value=(
-            "🟢 **Daily Mode** — Same Pokémon for everyone, resets at midnight (EDT).\n"
+            "🟢 **Daily Mode** — Same Pokémon for everyone in the server, resets at the server's midnight.\n"
             "🔵 **Personal Mode** — Private challenge unique to you."
         ),
         inline=False
@@ -261,7 +486,7 @@ async def help_command(interaction: discord.Interaction):
             "• Use autocomplete when guessing.\n"
             "• Track clues logically to narrow your guesses.\n"
             "• Play both modes — they don’t interfere!\n"
-            "• Daily Pokémon resets every midnight (EDT)."
+            "• Daily Pokémon resets every midnight in the server's timezone (`/timezone`)."
         ),
         inline=False
     )
@@ -274,27 +499,28 @@ async def help_command(interaction: discord.Interaction):
 
 
 # -------------------- DAILY --------------------
-@bot.tree.command(name="daily", description="Start today's Squirdle - same for everyone!")
+@app_commands.command(name="daily", description="Start today's Squirdle - same for everyone!")
+@instrument_command
 async def daily(interaction: discord.Interaction):
-    global daily_game
     user_id = interaction.user.id
-    initialize_daily_game()
+    daily_game = current_daily_game(interaction.guild_id)
+    state = guilds.get(interaction.guild_id)
 
     user_attempts = daily_game["attempts"].get(user_id, [])
     message = ""
 
     # --- Determine the correct message for the user's state ---
     if user_id in daily_game["completions"]:
-        t = daily_game["completions"][user_id].strftime("%H:%M EDT")
+        t = state.local_time(daily_game["completions"][user_id])
         message = (
             f"🎉 You already solved today's Squirdle at {t}.\n"
-            f"🕐 New puzzle available at midnight EDT!"
+            f"🕐 New puzzle available at midnight ({state.timezone})!"
         )
 
     elif len(user_attempts) >= 9:
         message = (
             f"❌ You've used all 9 attempts for today's Squirdle!\n"
-            f"🕐 New puzzle available at midnight EDT!"
+            f"🕐 New puzzle available at midnight ({state.timezone})!"
         )
 
     elif user_attempts:
@@ -318,39 +544,121 @@ async def daily(interaction: discord.Interaction):
 
 
 # -------------------- START --------------------
-@bot.tree.command(name="start", description="Start a new personal Squirdle game!")
-async def start(interaction: discord.Interaction):
+@app_commands.command(name="start", description="Start a new personal Squirdle game!")
+@app_commands.describe(
+    generation="Only Pokémon from these generations, e.g. 3 or 1-3",
+    type="Only Pokémon of this type",
+    difficulty="Only Pokémon this hard to find",
+)
+@app_commands.choices(
+    type=[app_commands.Choice(name=t.title(), value=t) for t in TYPE_NAMES],
+    difficulty=[app_commands.Choice(name=tier, value=tier) for tier in TIERS],
+)
+@instrument_command
+async def start(interaction: discord.Interaction, generation: str = None, type: str = None,
+                difficulty: str = None):
     user_id = interaction.user.id
-    if user_id in active_games and not active_games[user_id]["finished"]:
-        secret_name = active_games[user_id]["secret"]["name"].title()
+    game = active_games.get(user_id)
+    if game and game.secret is not None:  # one whose secret is gone just gets replaced
+        secret_name = game.secret["name"].title()
         await interaction.response.send_message(
             f"⚠️ You already have a personal game!\n🕹️ Pokémon (hidden): **{secret_name}**\nUse `/quit` to end it first.",
             ephemeral=True
         )
         return
 
-    secret = random.choice(POKEMON_DATA)
-    active_games[user_id] = {
-        "secret": secret,
-        "attempts": 0,
-        "max_tries": 9,
-        "finished": False,
-        "guesses": []  # ✅ added
-    }
+    picker = get_game_data().picker
+    try:
+        secret_dex = picker.pick(parse_generations(generation, picker.highest),
+                                 TYPE_BITS[type] if type else 0, difficulty)
+    except ValueError as e:
+        await interaction.response.send_message(f"⚠️ {e}", ephemeral=True)
+        return
+    if secret_dex is None:
+        await interaction.response.send_message(
+            "🔍 No Pokémon match all of those filters. Try a wider generation range or another type.",
+            ephemeral=True
+        )
+        return
+    await write_personal(interaction, active_games.start, user_id, secret_dex)
 
+    filters = [f"Gen {generation.replace(' ', '')}" if generation else None,
+               type.title() if type else None, difficulty]
+    chosen = ", ".join(f for f in filters if f)
     await interaction.response.send_message(
-        f"🎮 New personal game started!\nYou have 9 tries to guess the Pokémon.\nUse `/guess` to make your first guess.\n🛑 `/quit` ends and reveals it.",
+        f"🎮 New personal game started{f' ({chosen})' if chosen else ''}!\nYou have 9 tries to guess the Pokémon.\nUse `/guess` to make your first guess.\n🛑 `/quit` ends and reveals it.",
         ephemeral=True
     )
 
 
+# -------------------- POKEDEX --------------------
+def describe_entry(p):
+    """One /pokedex result line: number, name, generation, types, height and weight."""
+    types = " / ".join(t.title() for t in p["types"])
+    return (f"`#{p['pokedex']:04}` **{p['name'].title()}** — Gen {p['generation']} · {types} · "
+            f"{p['height_m']:g} m · {p['weight_kg']:g} kg")
+
+
+@app_commands.command(name="pokedex", description="Search the Pokédex by height, weight, generation and type")
+@app_commands.describe(
+    min_height="At least this tall, in metres",
+    max_height="At most this tall, in metres",
+    min_weight="At least this heavy, in kg",
+    max_weight="At most this heavy, in kg",
+    generation="Only these generations, e.g. 3 or 1-3",
+    type="Has this type",
+    second_type="Also has this type",
+    page="Page of results to show",
+)
+@app_commands.choices(
+    type=[app_commands.Choice(name=t.title(), value=t) for t in TYPE_NAMES],
+    second_type=[app_commands.Choice(name=t.title(), value=t) for t in TYPE_NAMES],
+)
+@instrument_command
+async def pokedex(interaction: discord.Interaction, min_height: float = None, max_height: float = None,
+                  min_weight: float = None, max_weight: float = None, generation: str = None,
+                  type: str = None, second_type: str = None, page: int = 1):
+    data = get_game_data()
+    try:
+        generations = parse_generations(generation, data.picker.highest) if generation else (None, None)
+    except ValueError as e:
+        await interaction.response.send_message(f"⚠️ {e}", ephemeral=True)
+        return
+    for low, high, what in ((min_height, max_height, "height"), (min_weight, max_weight, "weight")):
+        if low is not None and high is not None and low > high:
+            await interaction.response.send_message(
+                f"⚠️ The minimum {what} is above the maximum {what}.", ephemeral=True
+            )
+            return
+
+    types = tuple(dict.fromkeys(t for t in (type, second_type) if t))
+    rows = data.search.query((min_height, max_height), (min_weight, max_weight), generations, types)
+    if not len(rows):
+        await interaction.response.send_message("🔍 No Pokémon match all of those filters.", ephemeral=True)
+        return
+
+    results, page, pages = data.search.page(rows, page)
+    embed = discord.Embed(
+        title=f"📖 Pokédex search — {len(rows)} match{'es' if len(rows) != 1 else ''}",
+        description="\n".join(describe_entry(p) for p in results),
+        color=discord.Color.red()
+    )
+    embed.set_footer(text=f"Page {page} of {pages}" + (" · use page: for more" if pages > 1 else ""))
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
 # -------------------- QUIT --------------------
-@bot.tree.command(name="quit", description="Quit your current personal Squirdle game")
+@app_commands.command(name="quit", description="Quit your current personal Squirdle game")
+@instrument_command
 async def quit_personal(interaction: discord.Interaction):
     user_id = interaction.user.id
-    if user_id in active_games and not active_games[user_id]["finished"]:
-        secret_name = active_games[user_id]["secret"]["name"].title()
-        del active_games[user_id]
+    game = active_games.get(user_id)
+    if game and game.secret is None:
+        await write_personal(interaction, active_games.remove, user_id)
+        await interaction.response.send_message(POKEDEX_UPDATED, ephemeral=True)
+    elif game:
+        secret_name = game.secret["name"].title()
+        await write_personal(interaction, active_games.remove, user_id)
         await interaction.response.send_message(
             f"🛑 You ended your personal game.\nThe secret Pokémon was **{secret_name}**! 🔍",
             ephemeral=True
@@ -363,68 +671,48 @@ async def quit_personal(interaction: discord.Interaction):
 
 
 # -------------------- AUTOCOMPLETE --------------------
+@instrument_autocomplete
 async def pokemon_autocomplete(
     interaction: discord.Interaction,
     current: str,
 ) -> list[app_commands.Choice[str]]:
     """Return up to 25 Pokémon names matching the current input (for /guess autocomplete)."""
-    query = (current or "").strip().lower()
-    matches: list[app_commands.Choice[str]] = []
-
-    # If user typed nothing, suggest a few starters
-    if not query:
-        for p in POKEMON_DATA[:10]:
-            matches.append(app_commands.Choice(name=p["name"].title(), value=p["name"]))
-        return matches
-
-    # Search all Pokémon
-    for p in POKEMON_DATA:
-        name = p["name"]
-        if query in name.lower():
-            matches.append(app_commands.Choice(name=name.title(), value=name))
-            if len(matches) >= 25:  # Discord autocomplete limit
-                break
-
-    return matches
+    # Empty input suggests a few starters; otherwise prefix > word > substring hits
+    return get_game_data().autocomplete.complete(current)
 
 # -------------------- GUESS --------------------
-@bot.tree.command(name="guess", description="Make a guess in your current Squirdle game!")
+@app_commands.command(name="guess", description="Make a guess in your current Squirdle game!")
 @app_commands.describe(name="The Pokémon you want to guess")
 @app_commands.autocomplete(name=pokemon_autocomplete)
+@instrument_command
 async def guess(interaction: discord.Interaction, name: str):
-    global daily_game
     user_id = interaction.user.id
-    initialize_daily_game()
+    daily_game = current_daily_game(interaction.guild_id)
 
     # PERSONAL FIRST
-    if user_id in active_games and not active_games[user_id]["finished"]:
-        game = active_games[user_id]
+    game = active_games.get(user_id)
+    if game and game.secret is None:
+        await write_personal(interaction, active_games.remove, user_id)
+        await interaction.response.send_message(POKEDEX_UPDATED, ephemeral=True)
+        return
+    if game:
         guess_data = find_pokemon(name)
         if not guess_data:
-            await interaction.response.send_message("❌ Pokémon not found!", ephemeral=True)
+            await send_not_found(interaction, name)
             return
 
-        game["guesses"].append(guess_data)
-        game["attempts"] += 1
-        attempts_left = game["max_tries"] - game["attempts"]
-        secret = game["secret"]
+        secret = game.secret
+        code = feedback_code(guess_data, secret)
+        game = await write_personal(interaction, active_games.add_guess, user_id, game, guess_data["pokedex"], code)
+        if game is None:  # ended from another server in the meantime
+            await interaction.response.send_message(
+                "ℹ️ That personal game already ended. Use `/start` to begin a new one!", ephemeral=True
+            )
+            return
 
-        results = compare_and_build_message(guess_data, secret)
-        if guess_data["pokedex"] == secret["pokedex"]:
-            results.append("🎉 Correct Pokémon!")
-            game["finished"] = True
-            msg = "\n".join(results) + f"\n🎊 Solved in {game['attempts']} tries!"
-        else:
-            if guess_data["pokedex"] > secret["pokedex"]:
-                results.append("Pokédex: 🔽 lower number")
-            else:
-                results.append("Pokédex: 🔼 higher number")
-            if attempts_left <= 0:
-                results.append(f"❌ Out of tries! It was **{secret['name'].title()}**.")
-                game["finished"] = True
-            else:
-                results.append(f"🕹️ {attempts_left} tries left.")
-            msg = "\n".join(results)
+        msg = "\n".join(guess_feedback(guess_data, secret, code, game.remaining))
+        if code == SOLVED:
+            msg += f"\n🎊 Solved in {game.attempts} tries!"
 
         embed = discord.Embed(title="🎮 Personal Guess Result", description=msg, color=discord.Color.blurple())
         await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -432,87 +720,222 @@ async def guess(interaction: discord.Interaction, name: str):
 
     # DAILY GAME
     user_attempts = daily_game["attempts"].get(user_id, [])
+    if user_id in daily_game["completions"]:
+        await interaction.response.send_message(
+            "🎉 You already solved today's Squirdle! Wait until midnight, or use `/start` for a personal game.",
+            ephemeral=True
+        )
+        return
     if len(user_attempts) >= 9:
         await interaction.response.send_message("❌ All 9 attempts used! Wait until midnight.", ephemeral=True)
         return
 
     guess_data = find_pokemon(name)
     if not guess_data:
-        await interaction.response.send_message("❌ Pokémon not found!", ephemeral=True)
+        await send_not_found(interaction, name)
         return
 
     user_attempts.append(guess_data)
     daily_game["attempts"][user_id] = user_attempts
     secret = daily_game["pokemon"]
-    results = compare_and_build_message(guess_data, secret)
+    code = feedback_code(guess_data, secret)
+    daily_game["codes"].setdefault(user_id, []).append(code)
+    candidates = get_game_data().candidates
+    daily_game["candidates"][user_id] = candidates.narrow_code(
+        daily_game["candidates"].get(user_id, candidates.all), guess_data["pokedex"], code
+    )
+    store.save_daily_attempts(daily_game, user_id, user_attempts)
 
-    if guess_data["pokedex"] == secret["pokedex"]:
-        results.append("🎉 Correct Pokémon!")
+    msg = "\n".join(guess_feedback(guess_data, secret, code, 9 - len(user_attempts)))
+    if code == SOLVED:
         completion_time = datetime.now(timezone.utc)
         daily_game["completions"][user_id] = completion_time
-        daily_game["leaderboard"].append({
+        entry = {
             "user_id": user_id,
             "username": interaction.user.display_name,
             "attempts": len(user_attempts),
             "completion_time": completion_time
-        })
-        daily_game["leaderboard"].sort(key=lambda x: (x["attempts"], x["completion_time"]))
-        msg = "\n".join(results) + f"\n🎊 Solved today's Squirdle in {len(user_attempts)} tries!"
-    else:
-        if guess_data["pokedex"] > secret["pokedex"]:
-            results.append("Pokédex: 🔽 lower number")
-        else:
-            results.append("Pokédex: 🔼 higher number")
-        if len(user_attempts) >= 9:
-            results.append(f"❌ Out of tries! It was **{secret['name'].title()}**.")
-        else:
-            remaining = 9 - len(user_attempts)
-            results.append(f"🕹️ {remaining} tries left.")
-        msg = "\n".join(results)
+        }
+        daily_game["leaderboard"].add(entry)
+        store.save_completion(daily_game, entry)
+        msg += f"\n🎊 Solved today's Squirdle in {len(user_attempts)} tries!"
 
     embed = discord.Embed(title="📅 Daily Guess Result", description=msg, color=discord.Color.blurple())
     await interaction.response.send_message(embed=embed, ephemeral=True)
 
 
-# -------------------- LEADERBOARD --------------------
-@bot.tree.command(name="leaderboard", description="See today's fastest Squirdle solvers!")
-async def leaderboard(interaction: discord.Interaction):
-    global daily_game
-    initialize_daily_game()
+# -------------------- HINT --------------------
+@app_commands.command(name="hint", description="See how many Pokémon are still possible in your current game!")
+@instrument_command
+async def hint(interaction: discord.Interaction):
     user_id = interaction.user.id
+    daily_game = current_daily_game(interaction.guild_id)
 
-    # --- If no one has solved yet ---
-    if not daily_game["leaderboard"]:
-        embed = discord.Embed(
-            title="🏆 Today's Squirdle Leaderboard",
-            description="No trainers have solved today's Squirdle yet!\nBe the first to claim the top spot 💪",
-            color=discord.Color.blurple()
-        )
-        embed.set_footer(text="💡 Use /daily to start playing!")
-        await interaction.response.send_message(embed=embed)
+    mode, candidates = current_candidates(user_id, daily_game)
+    if candidates is None:
+        await interaction.response.send_message(no_candidates_message(mode), ephemeral=True)
         return
+    game_title = "🎮 Personal Game Hint" if mode == "personal" else "📅 Daily Game Hint"
+
+    engine = get_game_data().candidates
+    remaining = engine.count(candidates)
+    sample = ", ".join(p["name"].title() for p in engine.sample(candidates, 10))
+    if remaining == 0:
+        msg = "🤔 No Pokémon fit your hints any more (the Pokédex may have been updated)."
+    elif remaining == 1:
+        msg = f"🎯 Only **1** Pokémon fits your hints: {sample}"
+    elif remaining > 10:
+        msg = f"🔍 **{remaining}** Pokémon still fit your hints.\nA few of them: {sample}"
+    else:
+        msg = f"🔍 **{remaining}** Pokémon still fit your hints: {sample}"
+
+    embed = discord.Embed(title=game_title, description=msg, color=discord.Color.teal())
+    await interaction.response.send_message(embed=embed, ephemeral=True)
 
-    # --- Sort leaderboard by attempts and completion time ---
-    daily_game["leaderboard"].sort(key=lambda x: (x["attempts"], x["completion_time"]))
 
-    # --- Build top 10 entries ---
+# -------------------- SOLVE --------------------
+@app_commands.command(name="solve", description="Get the best next guess for your current game!")
+@app_commands.describe(method="entropy: most informative guess · minimax: smallest worst case")
+@app_commands.choices(method=[
+    app_commands.Choice(name="entropy", value="entropy"),
+    app_commands.Choice(name="minimax", value="minimax"),
+])
+@instrument_command
+async def solve(interaction: discord.Interaction, method: str = "entropy"):
+    user_id = interaction.user.id
+    daily_game = current_daily_game(interaction.guild_id)
+
+    mode, candidates = current_candidates(user_id, daily_game)
+    if candidates is None:
+        await interaction.response.send_message(no_candidates_message(mode), ephemeral=True)
+        return
+
+    data = get_game_data()
+    rows = data.candidates.rows(candidates)
+    if not len(rows):
+        msg = "🤔 No Pokémon fit your hints any more (the Pokédex may have been updated), so there's nothing to suggest."
+    elif len(rows) == 1:
+        only = data.entries[int(rows[0])]["name"].title()
+        msg = f"🎯 Only one Pokémon fits your hints: **{only}**"
+    else:
+        # Scoring slices the whole feedback matrix, keep it off the event loop
+        ranking = await asyncio.to_thread(data.solver.rank, rows, method)
+        lines = [
+            f"{i}. **{data.entries[row]['name'].title()}** — ~{expected:.1f} left on average, {worst} at worst"
+            for i, (row, expected, worst) in enumerate(ranking, 1)
+        ]
+        msg = f"🔍 **{len(rows)}** Pokémon still fit your hints. Best next guesses ({method}):\n" + "\n".join(lines)
+
+    game_title = "🎮 Personal Game Solver" if mode == "personal" else "📅 Daily Game Solver"
+    embed = discord.Embed(title=game_title, description=msg, color=discord.Color.teal())
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+# -------------------- LEADERBOARD --------------------
+def render_top_entries(state, entries):
+    """Lines of the public leaderboard embed for the top solvers, in the guild's time."""
     leaderboard_lines = []
-    for i, entry in enumerate(daily_game["leaderboard"][:10], 1):
+    for i, entry in enumerate(entries, 1):
         rank_emoji = (
             "🥇" if i == 1 else
             "🥈" if i == 2 else
             "🥉" if i == 3 else
             f"{i}️⃣"
         )
-        time_str = entry["completion_time"].strftime("%H:%M EDT")
+        time_str = state.local_time(entry["completion_time"])
         leaderboard_lines.append(
             f"{rank_emoji} **{entry['username']}** — {entry['attempts']} tries ({time_str})"
         )
+    return "\n".join(leaderboard_lines)
+
 
-    description = "\n".join(leaderboard_lines)
+def render_rollup_entries(history, rows):
+    """Lines of the weekly / all-time leaderboard embed."""
+    leaderboard_lines = []
+    for i, (user_id, wins, tries) in enumerate(rows, 1):
+        rank_emoji = (
+            "🥇" if i == 1 else
+            "🥈" if i == 2 else
+            "🥉" if i == 3 else
+            f"{i}️⃣"
+        )
+        leaderboard_lines.append(
+            f"{rank_emoji} **{history.username(user_id)}** — {wins} wins, {tries / wins:.2f} avg tries"
+        )
+    return "\n".join(leaderboard_lines)
+
+
+async def send_rollup_leaderboard(interaction, scope):
+    """Weekly or all-time board, read straight from the guild's history rollups."""
+    user_id = interaction.user.id
+    state = guilds.get(interaction.guild_id)
+    board = state.history.board(scope, state.today())
+    title = "🏆 This Week's Squirdle Leaderboard" if scope == "week" else "🏆 All-Time Squirdle Leaderboard"
+
+    if not board.ranked:
+        embed = discord.Embed(
+            title=title,
+            description="No finished days to rank yet!\nResults count once the daily puzzle rolls over at midnight 🌙",
+            color=discord.Color.blurple()
+        )
+        await interaction.response.send_message(embed=embed)
+        return
+
+    description = board.top_payload(partial(render_rollup_entries, state.history))
+    extra = len(board.ranked) - 10
+    if extra > 0:
+        description += f"\n\n...and **{extra}** more trainers on the board!"
+    public_embed = discord.Embed(title=title, description=description, color=discord.Color.gold())
+    public_embed.set_footer(text="💡 Updated at each daily rollover; today's results join at midnight.")
+    await interaction.response.send_message(embed=public_embed)
+
+    user_rank = board.ranks.get(user_id)
+    if user_rank:
+        wins, tries = board.totals[user_id]
+        private_msg = f"You're **#{user_rank}** with **{wins}** wins at **{tries / wins:.2f}** tries on average!"
+        color = discord.Color.green()
+    else:
+        private_msg = "You're not on this board yet!\nSolve a daily Squirdle to get ranked 🕹️"
+        color = discord.Color.orange()
+    private_embed = discord.Embed(title="🔒 Your Personal Leaderboard Summary", description=private_msg, color=color)
+    private_embed.set_footer(text="This message is private to you.")
+    await interaction.followup.send(embed=private_embed, ephemeral=True)
+
+
+@app_commands.command(name="leaderboard", description="See the fastest Squirdle solvers!")
+@app_commands.describe(scope="today (default), this week, or all time")
+@app_commands.choices(scope=[
+    app_commands.Choice(name="today", value="today"),
+    app_commands.Choice(name="week", value="week"),
+    app_commands.Choice(name="all time", value="all"),
+])
+@instrument_command
+async def leaderboard(interaction: discord.Interaction, scope: str = "today"):
+    daily_game = current_daily_game(interaction.guild_id)
+    user_id = interaction.user.id
+
+    if scope != "today":
+        await send_rollup_leaderboard(interaction, scope)
+        return
+
+    # --- If no one has solved yet ---
+    if not daily_game["leaderboard"]:
+        embed = discord.Embed(
+            title="🏆 Today's Squirdle Leaderboard",
+            description="No trainers have solved today's Squirdle yet!\nBe the first to claim the top spot 💪",
+            color=discord.Color.blurple()
+        )
+        embed.set_footer(text="💡 Use /daily to start playing!")
+        await interaction.response.send_message(embed=embed)
+        return
+
+    # --- Top 10, rendered again only when it changes ---
+    state = guilds.get(interaction.guild_id)
+    board = daily_game["leaderboard"]
+    description = board.top_payload(partial(render_top_entries, state))
 
     # --- Handle extra solvers beyond top 10 ---
-    extra = len(daily_game["leaderboard"]) - 10
+    extra = len(board) - 10
     if extra > 0:
         description += f"\n\n...and **{extra}** more trainers have completed it!"
 
@@ -522,21 +945,16 @@ async def leaderboard(interaction: discord.Interaction):
         description=description,
         color=discord.Color.gold()
     )
-    public_embed.set_footer(text="💡 The leaderboard resets daily at midnight (EDT).")
+    public_embed.set_footer(text=f"💡 The leaderboard resets daily at midnight ({state.timezone}).")
 
     # --- Send public leaderboard ---
     await interaction.response.send_message(embed=public_embed)
 
     # --- Private user placement summary (ephemeral) ---
-    user_rank = None
-    user_attempts = None
-    for i, entry in enumerate(daily_game["leaderboard"], 1):
-        if entry["user_id"] == user_id:
-            user_rank = i
-            user_attempts = entry["attempts"]
-            break
+    user_rank = board.rank(user_id)
 
     if user_rank:
+        user_attempts = board.get(user_id)["attempts"]
         daily_pokemon_name = daily_game["pokemon"]["name"].title()
         private_msg = (
             f"You're currently **#{user_rank}** with **{user_attempts}** tries!\n"
@@ -559,18 +977,67 @@ async def leaderboard(interaction: discord.Interaction):
         await interaction.followup.send(embed=private_embed, ephemeral=True)
 
 
+# -------------------- TIMEZONE --------------------
+@instrument_autocomplete
+async def timezone_autocomplete(
+    interaction: discord.Interaction,
+    current: str,
+) -> list[app_commands.Choice[str]]:
+    current = current.lower().replace(" ", "_")
+    matches = (tz for tz in timezone_names() if current in tz.lower())
+    return [app_commands.Choice(name=tz, value=tz) for tz, _ in zip(matches, range(25))]
+
+
+@app_commands.command(name="timezone", description="Set the timezone whose midnight starts this server's daily Squirdle")
+@app_commands.describe(name="IANA timezone, e.g. America/New_York or Europe/Berlin")
+@app_commands.autocomplete(name=timezone_autocomplete)
+@app_commands.guild_only()
+@app_commands.default_permissions(manage_guild=True)
+@instrument_command
+async def set_timezone(interaction: discord.Interaction, name: str):
+    try:
+        guilds.set_timezone(interaction.guild_id, name)
+    except ValueError:
+        await interaction.response.send_message(
+            f"❌ Unknown timezone **{name}**. Pick one from the suggestions, like `America/New_York`.",
+            ephemeral=True
+        )
+        return
+    await interaction.response.send_message(
+        f"🕛 This server's daily Squirdle now rolls over at midnight **{name}**.",
+        ephemeral=True
+    )
+
+
+# -------------------- ANNOUNCE --------------------
+@app_commands.command(name="announce", description="Post each day's answer, winners and new puzzle in a channel")
+@app_commands.describe(channel="Channel to post in; leave it out to stop posting")
+@app_commands.guild_only()
+@app_commands.default_permissions(manage_guild=True)
+@instrument_command
+async def announce(interaction: discord.Interaction, channel: discord.TextChannel | None = None):
+    guilds.set_channel(interaction.guild_id, channel.id if channel else None)
+    if channel:
+        message = f"📣 Each new daily Squirdle will be announced in {channel.mention}, with yesterday's winners."
+    else:
+        message = "🔕 Daily Squirdle announcements are off."
+    await interaction.response.send_message(message, ephemeral=True)
+
+
 # -------------------- STATS --------------------
-@bot.tree.command(name="stats", description="View your personal and daily Squirdle statistics!")
+@app_commands.command(name="stats", description="View your personal and daily Squirdle statistics!")
+@instrument_command
 async def stats(interaction: discord.Interaction):
-    global daily_game, active_games
     user_id = interaction.user.id
-    initialize_daily_game()
+    daily_game = current_daily_game(interaction.guild_id)
+    state = guilds.get(interaction.guild_id)
+    history = state.history
 
     attempts = len(daily_game["attempts"].get(user_id, []))
     solved = user_id in daily_game["completions"]
 
     if solved:
-        t = daily_game["completions"][user_id].strftime("%H:%M EDT")
+        t = state.local_time(daily_game["completions"][user_id])
         daily_title = "✅ Daily Game — Solved!"
         daily_details = f"**Attempts:** {attempts}\n**Completed:** {t}"
         color = discord.Color.green()
@@ -588,49 +1055,143 @@ async def stats(interaction: discord.Interaction):
         daily_details = "Use `/daily` to begin!"
         color = discord.Color.blurple()
 
-    # ✅ Recomputed hint summary dynamically
+    # Hint summaries come from the codes stored with each guess
     if attempts > 0:
-        last_guess = daily_game["attempts"][user_id][-1]
-        secret = daily_game["pokemon"]
-        last_msgs = compare_and_build_message(last_guess, secret)
-        if last_guess["pokedex"] > secret["pokedex"]:
-            last_msgs.append("Pokédex: 🔽 lower number")
-        elif last_guess["pokedex"] < secret["pokedex"]:
-            last_msgs.append("Pokédex: 🔼 higher number")
-        else:
-            last_msgs.append("Pokédex: ✅ same number")
-        daily_details += "\n\n🔍 **Last Daily Guess Summary**\n• Pokémon: **{}**\n• {}".format(
-            last_guess["name"].title(), "\n• ".join(last_msgs)
+        daily_details += last_guess_summary(
+            "Daily", daily_game["attempts"][user_id][-1], daily_game["codes"][user_id][-1]
         )
 
-    if user_id in active_games and not active_games[user_id]["finished"]:
-        game = active_games[user_id]
-        personal_details = f"**Attempts:** {game['attempts']}/{game['max_tries']}\n**Remaining:** {game['max_tries'] - game['attempts']}"
-        if game.get("guesses"):
-            last_guess = game["guesses"][-1]
-            secret = game["secret"]
-            last_msgs = compare_and_build_message(last_guess, secret)
-            if last_guess["pokedex"] > secret["pokedex"]:
-                last_msgs.append("Pokédex: 🔽 lower number")
-            elif last_guess["pokedex"] < secret["pokedex"]:
-                last_msgs.append("Pokédex: 🔼 higher number")
-            else:
-                last_msgs.append("Pokédex: ✅ same number")
-            personal_details += "\n\n🔍 **Last Personal Guess Summary**\n• Pokémon: **{}**\n• {}".format(
-                last_guess["name"].title(), "\n• ".join(last_msgs)
-            )
+    game = active_games.get(user_id)
+    if game and game.secret is None:
+        personal_details = POKEDEX_UPDATED
+    elif game:
+        personal_details = f"**Attempts:** {game.attempts}/{game.max_tries}\n**Remaining:** {game.remaining}"
+        if game.last_guess:
+            personal_details += last_guess_summary("Personal", *game.last_guess)
     else:
         personal_details = "No active personal game."
 
+    # All-time daily record in this server, straight from the rollups plus today's result if it's in
+    record = history.stats(user_id)
+    finished_today = solved or attempts >= 9
+    streak = history.current_streak(user_id, daily_game["date"], solved) if solved or not finished_today else 0
+    if record or finished_today:
+        played = (record.played if record else 0) + finished_today
+        wins = (record.wins if record else 0) + solved
+        best = max(record.best_streak if record else 0, streak)
+        distribution = list(record.distribution) if record else [0] * 9
+        if solved:
+            distribution[attempts - 1] += 1
+        widest = max(distribution) or 1
+        bars = "\n".join(
+            f"`{tries}` {'🟩' * max(1, round(8 * count / widest)) if count else '▫️'} {count}"
+            for tries, count in enumerate(distribution, 1)
+        )
+        alltime_details = (
+            f"**Played:** {played} · **Win rate:** {wins / played:.0%}\n"
+            f"**Current streak:** {streak} 🔥 · **Best streak:** {best}\n\n"
+            f"**Guess distribution**\n{bars}"
+        )
+    else:
+        alltime_details = "No finished daily games yet — your record starts with today's puzzle!"
+
     embed = discord.Embed(title="📊 Your Squirdle Stats", color=color)
     embed.add_field(name=daily_title, value=daily_details, inline=False)
+    embed.add_field(name="📚 All-Time Daily Record", value=alltime_details, inline=False)
     embed.add_field(name="🎮 Personal Game", value=personal_details, inline=False)
     embed.set_footer(text="🏆 Use /leaderboard to see today's top solvers!")
     await interaction.response.send_message(embed=embed, ephemeral=True)
 
 
+# =========================================================
+# App factory
+# =========================================================
+COMMANDS = [
+    status, help_command, daily, start, quit_personal, guess, hint, solve, pokedex, leaderboard, set_timezone, announce,
+    stats,
+]
+
+
+def create_bot(db_path=None, shards=None):
+    """Build the bot and its game state without connecting to Discord.
+
+    db_path defaults to SQUIRDLE_DB ("" keeps state in memory only) and
+    shards to the (shard_count, shard_ids) from shard_config().  The state
+    lives in this module, where the commands read it, so building again
+    replaces it.  Importing the module builds nothing.
+    """
+    global bot, store, store_task, broadcast_task, guilds, active_games, broadcaster, shard_count, shard_ids
+    global multi_process, bot_updating
+    intents = discord.Intents.default()
+
+    # SQUIRDLE_SHARD_COUNT turns on sharding; SQUIRDLE_SHARD_IDS picks this process's shards (see shards.py)
+    try:
+        shard_count, shard_ids = shards or shard_config()
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}")
+    if shard_count is None:
+        bot = commands.Bot(command_prefix="!", intents=intents)
+    elif shard_count == "auto":
+        bot = commands.AutoShardedBot(command_prefix="!", intents=intents)
+    else:
+        bot = commands.AutoShardedBot(command_prefix="!", intents=intents, shard_count=shard_count, shard_ids=shard_ids)
+    multi_process = shard_ids is not None
+    bot_updating = False
+
+    # Write-behind SQLite persistence
+    if db_path is None:
+        db_path = os.getenv("SQUIRDLE_DB", str(DB_FILE))
+    store = SQLiteGameStore(db_path) if db_path else GameStore()
+    store_task = broadcast_task = None
+
+    # Rollover announcements, within Discord's rate limits and saved until sent.  The global
+    # limit is per bot token, so each process gets the share of it its shards are of the total
+    share = len(shard_ids) / shard_count if multi_process else 1
+    broadcaster = Broadcaster(store, global_rate=GLOBAL_RATE * share, global_burst=GLOBAL_BURST * share,
+                              on_failed=announcement_failed)
+
+    # Daily puzzle, leaderboard and history per guild, each rolling over at its own midnight
+    guilds = GuildPartitions(store, on_roll=announce_rollover)
+
+    # Personal games per user_id; finished and idle games are swept every few minutes.
+    # Shared with the other processes through the database when there are any
+    if multi_process:
+        if not isinstance(store, SQLiteGameStore):
+            raise SystemExit("❌ Sharded workers share state through SQUIRDLE_DB; it can't be empty")
+        active_games = SQLiteSessionManager(store)
+    else:
+        active_games = SessionManager(on_save=store.save_personal, on_evict=store.delete_personal)
+
+    for event in (on_ready, on_disconnect, on_resumed):
+        bot.event(event)
+    for command in COMMANDS:
+        bot.tree.add_command(command)
+    return bot
+
+
 # =========================================================
 # KEEP-ALIVE + RUN
 # =========================================================
-keep_alive()
-bot.run(os.getenv("DISCORD_TOKEN"))
+async def main():
+    async with bot:
+        runner = await keep_alive() if os.getenv("SQUIRDLE_KEEP_ALIVE", "1") == "1" else None
+        try:
+            await bot.start(os.getenv("DISCORD_TOKEN"))
+        finally:
+            if runner:
+                await runner.cleanup()
+
+
+def run():
+    create_bot()
+    discord.utils.setup_logging()  # what bot.run would do
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.flush()  # don't lose the last write-behind batch
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,249 @@
+"""Post messages to many guild channels without tripping Discord's rate limits.
+
+At rollover the bot posts the day's recap to every guild with an
+announcement channel (see /announce), which can be thousands of channels
+within one quarter hour.  Messages go through a queue drained by
+`concurrency` workers, so there's a bounded number of requests in flight
+and the event loop is never held.  A message whose channel has to wait
+is set aside until it can go rather than holding a worker.  Each request first waits for a token
+from its route's bucket (one per channel: Discord allows 5 messages per
+5 s per channel) and then from the global bucket (50 requests per
+second per bot token, split between the processes of a sharded bot),
+both paced a little under those limits.  A 429 pauses the global or route bucket for its
+Retry-After and is retried.  5xx responses and transport errors are
+retried with exponential backoff; once those retries run out (an outage)
+the message goes back on the queue after a longer backoff, up to
+MAX_REQUEUE_DELAY, and stays in the outbox.  Only a definitive 4xx (no
+access, unknown channel, bad request) drops a message.
+
+Every queued message is saved to the store's outbox and removed once
+Discord has it, so a restart resumes a broadcast where it stopped.  A
+message that was in flight at the crash is sent again, but it carries a
+nonce with enforce_nonce, so Discord drops the copy.
+"""
+import asyncio
+import hashlib
+import os
+import random
+import time
+
+import httpx
+
+from .metrics import BROADCAST_MESSAGES
+
+DISCORD_API = os.getenv("SQUIRDLE_DISCORD_API", "https://discord.com/api/v10")
+
+CONCURRENCY = 8        # requests in flight at once
+# A bucket lets through at most burst + rate * T in any T seconds, which
+# has to stay within Discord's limits: 50 per 1 s, and 5 per 5 s per channel
+GLOBAL_RATE = 45.0     # requests per second...
+GLOBAL_BURST = 5       # ...after a burst of up to 5
+ROUTE_RATE = 0.8       # messages per second per channel...
+ROUTE_BURST = 1
+MAX_RETRIES = 5        # for 5xx and transport errors
+MAX_RATE_LIMITED = 20  # give up on a message after this many 429s
+BACKOFF_BASE = 0.5     # seconds; doubles on each retry
+MAX_REQUEUE_DELAY = 300.0  # seconds; cap on the wait before an undelivered message is tried again
+
+
+def make_client(token, api=DISCORD_API, concurrency=CONCURRENCY, transport=None):
+    """AsyncClient for the Discord REST API, pooled to the concurrency limit."""
+    return httpx.AsyncClient(
+        base_url=api,
+        transport=transport,
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        timeout=httpx.Timeout(30.0, connect=10.0),
+        headers={"Authorization": f"Bot {token}", "User-Agent": "DiscordBot (squirdle, 1.0)"},
+    )
+
+
+def message_nonce(guild_id, key):
+    """The nonce Discord dedupes a message by: 24 hex digits, under its 25 character limit."""
+    return hashlib.blake2b(f"{guild_id}:{key}".encode(), digest_size=12).hexdigest()
+
+
+def _rate_limit(resp):
+    """(seconds to wait, whether it's the global limit) from a 429."""
+    try:
+        body = resp.json()
+    except ValueError:
+        body = {}
+    try:
+        retry_after = float(resp.headers.get("Retry-After") or body["retry_after"])
+    except (ValueError, KeyError, TypeError):
+        retry_after = 1.0
+    is_global = resp.headers.get("X-RateLimit-Global") == "true" or bool(body.get("global"))
+    return retry_after, is_global
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `capacity`.
+
+    take() hands out a token straight away and returns how long to wait
+    before using it, going into debt when the bucket is empty, so callers
+    queue in order without polling.
+    """
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+        self.paused_until = 0.0
+
+    def take(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return max(-self.tokens / self.rate, self.paused_until - now, 0.0)
+
+    def delay(self):
+        """How long until a token is free, without taking one."""
+        now = self.clock()
+        tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        return max((1 - tokens) / self.rate, self.paused_until - now, 0.0)
+
+    def pause(self, seconds):
+        """Hand out nothing usable for `seconds` (a Retry-After)."""
+        self.paused_until = max(self.paused_until, self.clock() + seconds)
+
+    def idle(self):
+        """Full and not paused: forgetting it changes nothing."""
+        now = self.clock()
+        return now >= self.paused_until and self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+class Broadcaster:
+    """Queue of channel messages, drained by run() within Discord's rate limits."""
+
+    def __init__(self, store, concurrency=CONCURRENCY, global_rate=GLOBAL_RATE, global_burst=GLOBAL_BURST,
+                 route_rate=ROUTE_RATE, route_burst=ROUTE_BURST, retries=MAX_RETRIES, backoff=BACKOFF_BASE,
+                 on_failed=None):
+        self.store = store
+        self.concurrency = concurrency
+        self.route_rate = route_rate
+        self.route_burst = route_burst
+        self.retries = retries
+        self.backoff = backoff
+        self.on_failed = on_failed   # called with (guild_id, channel_id, status) for dropped messages
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self._routes = {}   # route -> TokenBucket
+        self._queue = asyncio.Queue()   # messages ready to send
+        self._deferred = 0              # messages off the queue until their channel has a token
+        self._requeued = {}             # (guild_id, key) -> times it came back undelivered
+
+    def __len__(self):
+        return self._queue.qsize() + self._deferred
+
+    def post(self, guild_id, key, channel_id, payload):
+        """Queue a message; (guild_id, key) names it in the outbox, one per guild per key."""
+        payload = {**payload, "nonce": message_nonce(guild_id, key), "enforce_nonce": True}
+        self.store.save_outbox(guild_id, key, channel_id, payload)
+        self._queue.put_nowait((guild_id, key, channel_id, payload))
+
+    def resume(self, messages):
+        """Queue (guild_id, key, channel_id, payload) messages left in the outbox by a previous run."""
+        for message in messages:
+            self._queue.put_nowait(message)
+
+    def _route(self, channel_id):
+        route = f"/channels/{channel_id}/messages"
+        bucket = self._routes.get(route)
+        if bucket is None:
+            bucket = self._routes[route] = TokenBucket(self.route_rate, self.route_burst)
+        return route, bucket
+
+    def _delay(self, attempt):
+        return self.backoff * (2 ** attempt) * (1 + random.random() / 4)
+
+    async def send(self, client, channel_id, payload):
+        """POST one message; returns the final status (None after repeated transport errors).
+
+        A 5xx or None means the retries ran out, and 429 that it was rate
+        limited MAX_RATE_LIMITED times: the caller may try again later.
+        """
+        route, bucket = self._route(channel_id)
+        failures = rate_limited = 0
+        while True:
+            await asyncio.sleep(bucket.take())
+            await asyncio.sleep(self.global_bucket.take())
+            try:
+                resp = await client.post(route, json=payload)
+            except httpx.TransportError:
+                failures += 1
+                if failures > self.retries:
+                    return None
+                await asyncio.sleep(self._delay(failures - 1))
+                continue
+            if resp.status_code == 429:
+                rate_limited += 1
+                BROADCAST_MESSAGES.inc("rate_limited")
+                if rate_limited >= MAX_RATE_LIMITED:
+                    return 429
+                retry_after, is_global = _rate_limit(resp)
+                (self.global_bucket if is_global else bucket).pause(retry_after)
+                continue
+            if resp.status_code >= 500:
+                failures += 1
+                if failures <= self.retries:
+                    await asyncio.sleep(self._delay(failures - 1))
+                    continue
+            return resp.status_code
+
+    def _requeue(self, message):
+        self._deferred -= 1
+        self._queue.put_nowait(message)
+        self._queue.task_done()   # for the get() that deferred it, so drain() never saw it finish
+
+    def _defer(self, message, wait):
+        """Take a message off the queue for `wait` seconds; it still counts as pending."""
+        self._deferred += 1
+        asyncio.get_running_loop().call_later(wait, self._requeue, message)
+
+    async def _worker(self, client):
+        while True:
+            message = await self._queue.get()
+            guild_id, key, channel_id, payload = message
+            # Don't hold a worker waiting on a busy channel; the others may be free
+            wait = self._route(channel_id)[1].delay()
+            if wait > 0:
+                self._defer(message, wait)
+                continue
+            try:
+                status = await self.send(client, channel_id, payload)
+            except BaseException:
+                self._queue.task_done()
+                raise
+            if status is None or status == 429 or status >= 500:
+                # Discord or the network is down: keep it in the outbox and try again later
+                attempts = self._requeued[guild_id, key] = self._requeued.get((guild_id, key), 0) + 1
+                BROADCAST_MESSAGES.inc("requeued")
+                self._defer(message, min(self._delay(attempts + self.retries), MAX_REQUEUE_DELAY))
+                continue
+            self._queue.task_done()
+            self._requeued.pop((guild_id, key), None)
+            # Delivered, or refused for good: a 4xx won't go through on a retry
+            self.store.delete_outbox(guild_id, key)
+            if 200 <= status < 300:
+                BROADCAST_MESSAGES.inc("sent")
+            else:
+                BROADCAST_MESSAGES.inc("failed")
+                if self.on_failed:
+                    self.on_failed(guild_id, channel_id, status)
+            if self._queue.empty():
+                self._routes = {route: b for route, b in self._routes.items() if not b.idle()}
+
+    async def run(self, client):
+        """Send queued messages with `client` (see make_client) until cancelled."""
+        workers = [asyncio.ensure_future(self._worker(client)) for _ in range(self.concurrency)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+
+    async def drain(self):
+        """Wait until every queued message has been sent or dropped."""
+        await self._queue.join()
@@ -0,0 +1,84 @@
+import random
+from functools import lru_cache
+
+import numpy as np
+
+from .feedback import feedback_code
+
+
+class CandidateEngine:
+    """Tracks which Pokémon are still consistent with a game's hints.
+
+    A game's remaining candidates are one int used as a bitset, where bit
+    i is Pokédex number i.  Keying bits by Pokédex number rather than by
+    row keeps a game's bitset meaningful across dataset reloads.  Each
+    guess ANDs in the set of secrets that would have produced the same
+    feedback, so a guess costs one bitset intersection no matter how
+    long the history is.  Feedback rows come from the precomputed matrix
+    when one is given, else from the columns.
+    """
+
+    def __init__(self, entries, columns, matrix=None, cache_size=16384):
+        self.entries = entries
+        self.columns = columns
+        self._dex = columns.pokedex.astype(np.intp)
+        self._width = int(self._dex.max()) + 1
+        self._nbytes = (self._width + 7) // 8
+        # Pokédex number -> row, -1 where the dataset has no such number
+        self._row_of_dex = np.full(self._width, -1, dtype=np.intp)
+        self._row_of_dex[self._dex] = np.arange(len(entries))
+        if matrix is not None:
+            self._codes = matrix.__getitem__
+        else:
+            self._codes = lru_cache(maxsize=None)(columns.compare)
+        self.consistent = lru_cache(maxsize=cache_size)(self._consistent)
+        self.all = self._to_int(np.ones(len(entries), dtype=bool))
+
+    def _to_int(self, row_mask):
+        by_dex = np.zeros(self._width, dtype=bool)
+        by_dex[self._dex] = row_mask
+        return int.from_bytes(np.packbits(by_dex, bitorder="little").tobytes(), "little")
+
+    def _consistent(self, guess_row, code):
+        """Bitset of secrets for which guess_row yields this feedback code."""
+        return self._to_int(self._codes(guess_row) == code)
+
+    def narrow(self, candidates, guess, secret):
+        """Return `candidates` minus everything ruled out by this guess."""
+        return self.narrow_code(candidates, guess["pokedex"], feedback_code(guess, secret))
+
+    def narrow_code(self, candidates, dex, code):
+        """Like narrow, for a guess already reduced to its Pokédex number and code."""
+        return candidates & self.consistent(self.columns.row(dex), code)
+
+    def from_guesses(self, guesses, secret):
+        """Rebuild a game's candidates from its whole guess history."""
+        candidates = self.all
+        for guess in guesses:
+            candidates = self.narrow(candidates, guess, secret)
+        return candidates
+
+    def from_codes(self, guesses):
+        """Rebuild candidates from (Pokédex number, code) pairs, skipping numbers not in the dataset."""
+        candidates = self.all
+        for dex, code in guesses:
+            if dex in self.columns.rows:
+                candidates = self.narrow_code(candidates, dex, code)
+        return candidates
+
+    def rows(self, candidates):
+        """Return the entry indices of the Pokémon in a candidate bitset."""
+        candidates &= self.all  # drop numbers this dataset doesn't have
+        bits = np.frombuffer(candidates.to_bytes(self._nbytes, "little"), dtype=np.uint8)
+        dex = np.flatnonzero(np.unpackbits(bits, bitorder="little"))
+        return self._row_of_dex[dex]
+
+    def count(self, candidates):
+        return (candidates & self.all).bit_count()
+
+    def sample(self, candidates, k=10):
+        """Return up to k remaining Pokémon, in Pokédex order."""
+        rows = self.rows(candidates)
+        if len(rows) > k:
+            rows = sorted(random.sample(list(rows), k))
+        return [self.entries[i] for i in rows]
@@ -0,0 +1,82 @@
+import hashlib
+
+import numpy as np
+
+from .feedback import (
+    DEX_SHIFT, GEN_SHIFT, HEIGHT_SHIFT, HIGHER, LOWER, TYPE_SHIFT, WEIGHT_SHIFT,
+)
+from .pokedex import TYPE_BITS
+
+
+def _direction(guess_value, secret_values):
+    """Vectorized feedback.direction: one guess value vs an array of secrets."""
+    return (secret_values < guess_value) * np.uint16(LOWER) | (secret_values > guess_value) * np.uint16(HIGHER)
+
+
+class PokedexColumns:
+    """Column-per-attribute view of the Pokédex for vectorized comparisons.
+
+    Row i describes entries[i].  Types are a bitmask per Pokémon plus the
+    bits of its first and second type, which is all a comparison needs.
+    """
+
+    def __init__(self, generation, pokedex, height, weight, type_mask, type_slots):
+        self.generation = generation
+        self.pokedex = pokedex
+        self.height = height
+        self.weight = weight
+        self.type_mask = type_mask
+        self.type_slots = type_slots
+        self.rows = {int(dex): row for row, dex in enumerate(pokedex)}
+
+    @classmethod
+    def from_entries(cls, entries):
+        n = len(entries)
+        type_slots = np.zeros((n, 2), dtype=np.uint32)
+        for row, p in enumerate(entries):
+            for slot, t in enumerate(p["types"][:2]):
+                type_slots[row, slot] = TYPE_BITS[t]
+        return cls(
+            generation=np.fromiter((p["generation"] for p in entries), dtype=np.int16, count=n),
+            pokedex=np.fromiter((p["pokedex"] for p in entries), dtype=np.int16, count=n),
+            height=np.fromiter((p["height_m"] for p in entries), dtype=np.float32, count=n),
+            weight=np.fromiter((p["weight_kg"] for p in entries), dtype=np.float32, count=n),
+            type_mask=type_slots[:, 0] | type_slots[:, 1],
+            type_slots=type_slots,
+        )
+
+    def __len__(self):
+        return len(self.pokedex)
+
+    def digest(self):
+        """Hex digest of every value compare() reads, to key data derived from it."""
+        h = hashlib.blake2b(digest_size=16)
+        for column in (self.generation, self.pokedex, self.height, self.weight, self.type_slots):
+            h.update(str(column.shape).encode())
+            h.update(np.ascontiguousarray(column).tobytes())
+        return h.hexdigest()
+
+    def row(self, pokedex):
+        """Return the row of a Pokédex number."""
+        return self.rows[pokedex]
+
+    def compare(self, guess, secrets=None):
+        """Feedback codes for guess row `guess` against many secrets.
+
+        `secrets` is None for every Pokémon, or anything that indexes a
+        numpy array (row indices, a boolean mask, a slice).  Returns a
+        uint16 array of packed codes, one per secret, in that order.
+        """
+        if secrets is None:
+            secrets = slice(None)
+        generation = self.generation[secrets]
+        codes = _direction(self.generation[guess], generation) << GEN_SHIFT
+        secret_types = self.type_mask[secrets]
+        first, second = self.type_slots[guess]
+        codes |= ((secret_types & first) == 0).astype(np.uint16) << TYPE_SHIFT
+        if second:
+            codes |= ((secret_types & second) == 0).astype(np.uint16) << (TYPE_SHIFT + 1)
+        codes |= _direction(self.height[guess], self.height[secrets]) << HEIGHT_SHIFT
+        codes |= _direction(self.weight[guess], self.weight[secrets]) << WEIGHT_SHIFT
+        codes |= _direction(self.pokedex[guess], self.pokedex[secrets]) << DEX_SHIFT
+        return codes
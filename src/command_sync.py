@@ -0,0 +1,61 @@
+"""Sync the slash command tree with Discord only when it has changed.
+
+tree.sync() is slow and tightly rate limited, and on_ready fires again
+after every reconnect and deploy.  The payload Discord would receive
+(names, descriptions, options, choices, autocomplete flags, permissions)
+is hashed instead, and the hash of the last successful sync is kept in
+SYNC_FILE per scope; a matching hash skips the call.
+
+Set SQUIRDLE_DEV_GUILD to a guild ID to sync there instead of globally
+while developing: guild commands update immediately.
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from .storage import DATA_DIR
+
+SYNC_FILE = DATA_DIR / "command_sync.json"
+
+
+def tree_hash(tree, guild=None):
+    """SHA-256 of the commands as they'd be sent for `guild` (None: global)."""
+    payload = sorted((command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+                     key=lambda command: (command.get("type", 1), command["name"]))
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _load(path):
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _save(path, hashes):
+    path = Path(path)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(hashes, indent=2, sort_keys=True))
+    os.replace(tmp, path)  # never leave a half-written file behind
+
+
+async def sync_if_changed(tree, guild=None, path=SYNC_FILE, force=False):
+    """Sync unless the last sync for this scope had the same hash.
+
+    Returns (synced, seconds taken).  For a guild, the global commands are
+    copied into it first, as a development guild wants the whole tree.
+    """
+    start = time.perf_counter()
+    scope = f"guild:{guild.id}" if guild else "global"
+    if guild:
+        tree.copy_global_to(guild=guild)
+    digest = tree_hash(tree, guild)
+    hashes = _load(path)
+    if not force and hashes.get(scope) == digest:
+        return False, time.perf_counter() - start
+    await tree.sync(guild=guild)
+    hashes[scope] = digest
+    _save(path, hashes)
+    return True, time.perf_counter() - start
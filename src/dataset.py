@@ -0,0 +1,212 @@
+"""Loading the Pokédex from data/, preferring the compact binary artifact.
+
+pokemon.bin layout (little-endian):
+
+    header    magic "SQDX", u16 version, u16 reserved,
+              u32 record count, u32 string count, u32 string bytes,
+              16-byte BLAKE2b digest of the pokemon.json it was built from
+    offsets   u32[string count + 1], start of each string in the blob
+    strings   UTF-8 blob: the type names (in TYPE_NAMES order), then
+              every Pokémon name; padded to a 4-byte boundary
+    records   RECORD_DTYPE[record count], one fixed-width row per Pokémon
+
+Height and weight are stored in PokéAPI's integer units (decimetres and
+hectograms), so decoding gives back exactly the floats in pokemon.json.
+
+pokemon.json is the source of truth: the binary file is only read when
+its digest matches the JSON next to it, so a hand-edited JSON is never
+shadowed by a stale pokemon.bin (rebuild it with the command below).
+What the binary file saves is startup time: no JSON to parse.  The
+entries and columns are decoded into each process's own memory, so the
+mapping isn't shared between processes once loading is done, and peak
+RSS is no lower than loading the JSON (see benchmarks/bench_startup.py).
+
+Convert an existing pokemon.json with:  python -m src.dataset
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from .columnar import PokedexColumns
+from .pokedex import TYPE_BITS, TYPE_NAMES
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+JSON_FILE = DATA_DIR / "pokemon.json"
+BINARY_FILE = DATA_DIR / "pokemon.bin"
+
+MAGIC = b"SQDX"
+VERSION = 2
+HEADER = struct.Struct("<4sHHIII16s")
+NO_TYPE = 0xFF
+
+RECORD_DTYPE = np.dtype([
+    ("name", "<u2"),        # string id
+    ("pokedex", "<u2"),
+    ("generation", "u1"),
+    ("type1", "u1"),        # string id, which is also the TYPE_NAMES index
+    ("type2", "u1"),        # NO_TYPE for single-typed Pokémon
+    ("reserved", "u1"),
+    ("height_dm", "<u2"),
+    ("weight_hg", "<u2"),
+])
+
+
+def source_digest(json_path=JSON_FILE):
+    """BLAKE2b digest of pokemon.json's bytes, as recorded in pokemon.bin."""
+    return hashlib.blake2b(json_path.read_bytes(), digest_size=16).digest()
+
+
+def write_binary(entries, path=BINARY_FILE, json_path=JSON_FILE):
+    """Write entries as pokemon.bin, atomically, stamped with json_path's digest.
+
+    json_path must already hold these entries.
+    """
+    strings = list(TYPE_NAMES) + [p["name"] for p in entries]
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype="<u4")
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    blob = b"".join(encoded)
+    blob += b"\0" * (-len(blob) % 4)
+
+    records = np.zeros(len(entries), dtype=RECORD_DTYPE)
+    for i, p in enumerate(entries):
+        types = [TYPE_NAMES.index(t) for t in p["types"]] + [NO_TYPE]
+        records[i] = (
+            len(TYPE_NAMES) + i, p["pokedex"], p["generation"], types[0], types[1], 0,
+            round(p["height_m"] * 10), round(p["weight_kg"] * 10),
+        )
+
+    tmp = path.with_suffix(".tmp")
+    with tmp.open("wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(entries), len(strings), len(blob), source_digest(json_path)))
+        f.write(offsets.tobytes())
+        f.write(blob)
+        f.write(records.tobytes())
+    os.replace(tmp, path)
+
+
+class BinaryDataset:
+    """Read-only, memory-mapped view of pokemon.bin.
+
+    The record array is a zero-copy view of the mapping, which entries()
+    and columns() decode from.  Raises ValueError (or struct.error, for a
+    file shorter than the header) unless the file is a complete v1
+    dataset whose string ids all point into its string table.
+    """
+
+    def __init__(self, path=BINARY_FILE):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count, string_count, blob_size, self.source = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a v{VERSION} Squirdle dataset")
+        size = HEADER.size + 4 * (string_count + 1) + blob_size + RECORD_DTYPE.itemsize * count
+        if len(self._mmap) != size:
+            raise ValueError(f"{path} is {len(self._mmap)} bytes, its header says {size}")
+
+        offset = HEADER.size
+        self._offsets = np.frombuffer(self._mmap, dtype="<u4", count=string_count + 1, offset=offset)
+        offset += self._offsets.nbytes
+        self._blob_start = offset
+        self._blob_size = blob_size
+        offset += blob_size
+        self.records = np.frombuffer(self._mmap, dtype=RECORD_DTYPE, count=count, offset=offset)
+
+        if np.any(np.diff(self._offsets.astype(np.int64)) < 0) or self._offsets[-1] > blob_size:
+            raise ValueError(f"{path} has a corrupt string table")
+        r = self.records
+        types = np.concatenate([r["type1"], r["type2"][r["type2"] != NO_TYPE]])
+        if np.any(r["name"] >= string_count) or np.any(types >= len(TYPE_NAMES)):
+            raise ValueError(f"{path} has records pointing outside its string table")
+
+    def __len__(self):
+        return len(self.records)
+
+    def strings(self):
+        """Decode the whole string table in one go."""
+        blob = self._mmap[self._blob_start:self._blob_start + self._blob_size]
+        offsets = self._offsets.tolist()
+        text = blob.decode("utf-8")
+        if len(text) == len(blob):
+            # ASCII (every PokéAPI slug): byte offsets are character offsets
+            return [text[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+        return [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+    def entries(self):
+        """Decode every record into the dictionaries POKEMON_DATA holds."""
+        strings = self.strings()
+        entries = []
+        for name, pokedex, generation, type1, type2, _, height_dm, weight_hg in self.records.tolist():
+            types = [strings[type1]] if type2 == NO_TYPE else [strings[type1], strings[type2]]
+            entries.append({
+                "name": strings[name],
+                "pokedex": pokedex,
+                "types": types,
+                "height_m": height_dm / 10,
+                "weight_kg": weight_hg / 10,
+                "generation": generation,
+            })
+        return entries
+
+    def columns(self):
+        """Build PokedexColumns straight from the record array."""
+        r = self.records
+        bits = np.zeros(NO_TYPE + 1, dtype=np.uint32)  # NO_TYPE maps to 0
+        bits[:len(TYPE_NAMES)] = [TYPE_BITS[t] for t in TYPE_NAMES]
+        type_slots = np.stack([bits[r["type1"]], bits[r["type2"]]], axis=1)
+        return PokedexColumns(
+            generation=r["generation"].astype(np.int16),
+            pokedex=r["pokedex"].astype(np.int16),
+            height=(r["height_dm"] / 10).astype(np.float32),
+            weight=(r["weight_hg"] / 10).astype(np.float32),
+            type_mask=type_slots[:, 0] | type_slots[:, 1],
+            type_slots=type_slots,
+        )
+
+
+def load_json(path=JSON_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def dataset_signature(binary_path=BINARY_FILE, json_path=JSON_FILE):
+    """Identify the source load_dataset reads, so a refresh can be spotted.
+
+    That's pokemon.json whenever it exists, since pokemon.bin is only
+    used while it matches the JSON.
+    """
+    path = json_path if json_path.exists() else binary_path
+    st = path.stat()
+    return (path.name, st.st_mtime_ns, st.st_size)
+
+
+def load_dataset(binary_path=BINARY_FILE, json_path=JSON_FILE):
+    """Return (entries, columns), from pokemon.bin when it matches pokemon.json, else the JSON."""
+    if binary_path.exists():
+        try:
+            dataset = BinaryDataset(binary_path)
+            if not json_path.exists() or dataset.source == source_digest(json_path):
+                return dataset.entries(), dataset.columns()
+            print(f"⚠️ {binary_path.name} is older than {json_path.name}, loading the JSON "
+                  "(rebuild it with `python -m src.dataset`)")
+        except (ValueError, struct.error) as e:
+            print(f"⚠️ Can't read {binary_path.name} ({e}), falling back to {json_path.name}")
+    entries = load_json(json_path)
+    return entries, PokedexColumns.from_entries(entries)
+
+
+def main():
+    entries = load_json()
+    write_binary(entries)
+    if BinaryDataset().entries() != entries:
+        raise SystemExit(f"❌ {BINARY_FILE.name} doesn't round-trip {JSON_FILE.name}")
+    print(f"Wrote {len(entries)} entries → {BINARY_FILE} ({BINARY_FILE.stat().st_size / 1024:.1f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""How hard each Pokémon is as the secret, from playing every possible game.
+
+The reference player opens with any Pokémon, then always guesses the
+remaining candidate whose feedback splits the remaining candidates best
+(the /solve entropy ranking, restricted to guesses that can still win).
+Every opener is played against every secret, the whole N x N space of
+games, using the feedback matrix, which encodes the same rules as the
+/guess hints.  Each secret gets the expected number of guesses over all
+openers, the worst case, the share of openers that need more than
+MAX_TRIES, and a tier (easy / medium / hard, by thirds of expected
+guesses).
+
+After the opener, a game only depends on which candidates are left, and
+the strategy only looks at those.  So every group of secrets an opener
+leaves is solved once as a tree, and subtrees are memoized.  Openers are
+spread over a process pool.
+
+    python -m src.difficulty [--workers N] [--full]
+
+writes DIFFICULTY_FILE next to pokemon.json, which selection reads.  The guess count of every
+game is kept in GAMES_FILE with the attributes it was computed from.  On
+a rerun, a group whose members and their attributes are unchanged is
+copied instead of replayed, so a dataset refresh only replays the
+groups that a new or changed Pokémon fell into.
+"""
+import argparse
+import contextlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .columnar import PokedexColumns
+from .dataset import DATA_DIR, load_dataset
+from .feedback import NUM_CODES
+from .feedback_matrix import MATRIX_FILE, load_feedback_matrix
+from .selection import DIFFICULTY_FILE, TIERS
+from .sessions import MAX_TRIES
+
+GAMES_FILE = DATA_DIR / "difficulty_games.npz"
+STRATEGY = "entropy-over-candidates/1"   # bump when the reference player changes
+
+
+def attributes(columns):
+    """Everything a comparison reads, one row per Pokémon, to tell which ones changed."""
+    return np.column_stack([
+        columns.pokedex, columns.generation, columns.type_slots[:, 0], columns.type_slots[:, 1],
+        columns.height, columns.weight,
+    ]).astype(np.float64)
+
+
+def _columns(attrs):
+    """PokedexColumns rebuilt from attributes(), to replay an older dataset's feedback."""
+    slots = attrs[:, 2:4].astype(np.uint32)
+    return PokedexColumns(
+        generation=attrs[:, 1].astype(np.int16), pokedex=attrs[:, 0].astype(np.int16),
+        height=attrs[:, 4].astype(np.float32), weight=attrs[:, 5].astype(np.float32),
+        type_mask=slots[:, 0] | slots[:, 1], type_slots=slots,
+    )
+
+
+def groups(codes, guess):
+    """Indices of the secrets each code leaves, in order, skipping index `guess` (it's solved)."""
+    left = np.flatnonzero(np.arange(len(codes)) != guess)
+    order = left[np.argsort(codes[left], kind="stable")]
+    bounds = [0, *(np.flatnonzero(np.diff(codes[order])) + 1), len(order)]
+    return [order[start:stop] for start, stop in zip(bounds, bounds[1:])]
+
+
+class Player:
+    """The reference strategy, with its solved subtrees memoized."""
+
+    def __init__(self, matrix):
+        self.matrix = matrix
+        self._subtrees = {}   # candidate rows (bytes) -> guesses each one takes from here
+
+    def best_guess(self, rows):
+        """The candidate /solve's entropy ranking would pick among `rows`, lowest row on ties.
+
+        Maximizing the entropy of the split is minimizing sum(n log n) over
+        its group sizes n, which only needs the groups that occur, not a
+        NUM_CODES-wide histogram per guess like Solver.histograms.
+        """
+        k = len(rows)
+        block = self.matrix[np.ix_(rows, rows)].astype(np.int64)
+        block += (np.arange(k, dtype=np.int64) * NUM_CODES)[:, None]
+        groups, sizes = np.unique(block, return_counts=True)
+        spread = np.bincount(groups // NUM_CODES, weights=sizes * np.log2(sizes), minlength=k)
+        return rows[np.argmin(spread.round(9))]
+
+    def subtree(self, rows):
+        """Guesses needed for each secret in `rows` (sorted), none made yet."""
+        key = rows.tobytes()
+        cached = self._subtrees.get(key)
+        if cached is not None:
+            return cached
+        if len(rows) <= 2:
+            counts = np.arange(1, len(rows) + 1, dtype=np.uint8)   # guess the first, then the other
+        else:
+            guess = self.best_guess(rows)
+            counts = np.ones(len(rows), dtype=np.uint8)
+            for members in groups(self.matrix[guess, rows], np.searchsorted(rows, guess)):
+                counts[members] += self.subtree(rows[members])
+        self._subtrees[key] = counts
+        return counts
+
+
+_worker = {}
+
+
+def _init_worker(matrix_path, previous):
+    _worker["player"] = Player(np.load(matrix_path))   # 2 MiB: faster to index in memory than mapped
+    _worker["previous"] = previous and {**previous, "columns": _columns(previous["attrs"])}
+
+
+def _play_openers(openers):
+    """(first opener, guess counts for every secret per opener, groups replayed)."""
+    player, previous = _worker["player"], _worker["previous"]
+    rows = np.arange(len(player.matrix))
+    block = np.empty((len(openers), len(rows)), dtype=np.uint8)
+    replayed = 0
+    for i, opener in enumerate(openers):
+        codes = np.asarray(player.matrix[opener])
+        old_codes = None
+        if previous is not None and previous["unchanged"][opener]:
+            old_opener = previous["old_row"][opener]
+            old_codes = previous["columns"].compare(old_opener)
+            old_codes[old_opener] = 0xFFFF   # not a secret left to find
+        counts = np.ones(len(rows), dtype=np.uint8)
+        for members in groups(codes, opener):
+            # Same members with the same attributes, in the same order, as last run: same games
+            if old_codes is not None and previous["unchanged"][members].all():
+                old_members = previous["old_row"][members]
+                if np.array_equal(np.flatnonzero(old_codes == codes[members[0]]), old_members):
+                    counts[members] = previous["games"][old_opener, old_members]
+                    continue
+            counts[members] += player.subtree(members)
+            replayed += 1
+        block[i] = counts
+    return openers[0], block, replayed
+
+
+def play_all(matrix_path, n, previous=None, workers=None, chunk=32):
+    """The N x N guess counts, games[opener, secret], and how many groups were replayed."""
+    games = np.empty((n, n), dtype=np.uint8)
+    chunks = [np.arange(start, min(start + chunk, n)) for start in range(0, n, chunk)]
+    replayed = 0
+    with contextlib.ExitStack() as stack:
+        if workers == 1:   # in this process, e.g. to profile it
+            _init_worker(matrix_path, previous)
+            results = map(_play_openers, chunks)
+        else:
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                           initargs=(matrix_path, previous)))
+            results = pool.map(_play_openers, chunks)
+        for start, block, count in results:
+            games[start:start + len(block)] = block
+            replayed += count
+    return games, replayed
+
+
+def load_previous(attrs, path=GAMES_FILE):
+    """What the last run left in GAMES_FILE, lined up with the current rows, or None."""
+    try:
+        saved = np.load(path)
+        if str(saved["strategy"]) != STRATEGY:
+            return None
+        old_attrs, games = saved["attrs"], saved["games"]
+    except (OSError, KeyError, ValueError):
+        return None
+    old_row_of_dex = {int(dex): row for row, dex in enumerate(old_attrs[:, 0])}
+    old_row = np.array([old_row_of_dex.get(int(dex), -1) for dex in attrs[:, 0]], dtype=np.intp)
+    unchanged = (old_row >= 0) & (old_attrs[old_row] == attrs).all(axis=1)
+    return {"attrs": old_attrs, "games": games, "old_row": old_row, "unchanged": unchanged}
+
+
+def difficulty_table(entries, games):
+    """Rows of [Pokédex number, expected guesses, worst case, share over MAX_TRIES, tier]."""
+    expected = games.mean(axis=0)
+    worst = games.max(axis=0)
+    failing = (games > MAX_TRIES).mean(axis=0)
+    # Tiers by thirds of expected guesses, ties broken by the worst case
+    order = np.lexsort((worst, expected))
+    tiers = np.empty(len(entries), dtype=np.intp)
+    tiers[order] = np.arange(len(entries)) * len(TIERS) // len(entries)
+    return [
+        [p["pokedex"], round(float(expected[i]), 3), int(worst[i]), round(float(failing[i]), 4), TIERS[tiers[i]]]
+        for i, p in enumerate(entries)
+    ]
+
+
+def _save(path, write):
+    tmp = path.with_name(f"{path.stem}.tmp{path.suffix}")
+    write(tmp)
+    os.replace(tmp, path)   # never leave a half-written file behind
+
+
+def save(entries, attrs, games, path=DIFFICULTY_FILE, games_path=GAMES_FILE):
+    table = {
+        "strategy": STRATEGY,
+        "max_tries": MAX_TRIES,
+        "columns": ["pokedex", "expected", "worst", "over_max_tries", "tier"],
+        "rows": difficulty_table(entries, games),
+    }
+    _save(path, lambda tmp: tmp.write_text(json.dumps(table, separators=(",", ":"))))
+    _save(games_path, lambda tmp: np.savez_compressed(tmp, strategy=STRATEGY, attrs=attrs, games=games))
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: all cores)")
+    parser.add_argument("--full", action="store_true", help="replay every game, ignoring the last run")
+    args = parser.parse_args()
+
+    entries, columns = load_dataset()
+    load_feedback_matrix(columns)   # rebuilt first if missing or stale
+    attrs = attributes(columns)
+    previous = None if args.full else load_previous(attrs)
+    start = time.perf_counter()
+    games, replayed = play_all(MATRIX_FILE, len(entries), previous, workers=args.workers)
+    table = save(entries, attrs, games)
+    elapsed = time.perf_counter() - start
+
+    rows = table["rows"]
+    hardest = sorted(rows, key=lambda row: (-row[1], -row[2]))[:5]
+    print(f"Played {len(entries) ** 2:,} games in {elapsed:.2f}s ({replayed:,} opener groups replayed, "
+          f"{'none reused' if previous is None else 'the rest reused'}) → {DIFFICULTY_FILE}")
+    print(f"Expected guesses {min(r[1] for r in rows):.2f}–{max(r[1] for r in rows):.2f}; hardest: "
+          + ", ".join(f"{entries[columns.row(dex)]['name'].title()} ({e:.2f}, worst {w})" for dex, e, w, _, _ in hardest))
+
+
+if __name__ == "__main__":
+    main()
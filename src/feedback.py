@@ -0,0 +1,96 @@
+"""Packed feedback codes for one (guess, secret) comparison.
+
+A code is a small int holding the five hints shown for a guess:
+
+    bits 0-1  generation   SAME / LOWER / HIGHER
+    bits 2-3  types        bit 2: guess's 1st type is missing from the secret
+                           bit 3: guess's 2nd type is missing from the secret
+    bits 4-5  height       SAME / LOWER / HIGHER
+    bits 6-7  weight       SAME / LOWER / HIGHER
+    bits 8-9  pokedex      SAME / LOWER / HIGHER
+
+LOWER / HIGHER say where the *secret* sits relative to the guess, so a
+correct guess is exactly SOLVED (0).
+"""
+
+SAME, LOWER, HIGHER = 0, 1, 2
+
+GEN_SHIFT = 0
+TYPE_SHIFT = 2
+HEIGHT_SHIFT = 4
+WEIGHT_SHIFT = 6
+DEX_SHIFT = 8
+
+CODE_BITS = 10
+NUM_CODES = 1 << CODE_BITS
+SOLVED = 0
+
+
+def direction(guess_value, secret_value):
+    """Return SAME, LOWER or HIGHER for where the secret sits."""
+    if secret_value < guess_value:
+        return LOWER
+    if secret_value > guess_value:
+        return HIGHER
+    return SAME
+
+
+def feedback_code(guess, secret):
+    """Return the packed feedback code for two Pokémon dictionaries."""
+    code = direction(guess["generation"], secret["generation"]) << GEN_SHIFT
+    for slot, t in enumerate(guess["types"][:2]):
+        if t not in secret["types"]:
+            code |= 1 << (TYPE_SHIFT + slot)
+    code |= direction(guess["height_m"], secret["height_m"]) << HEIGHT_SHIFT
+    code |= direction(guess["weight_kg"], secret["weight_kg"]) << WEIGHT_SHIFT
+    code |= direction(guess["pokedex"], secret["pokedex"]) << DEX_SHIFT
+    return code
+
+
+def unpack(code):
+    """Split a code into (generation, missing-type bits, height, weight, pokedex)."""
+    return (
+        (code >> GEN_SHIFT) & 3,
+        (code >> TYPE_SHIFT) & 3,
+        (code >> HEIGHT_SHIFT) & 3,
+        (code >> WEIGHT_SHIFT) & 3,
+        (code >> DEX_SHIFT) & 3,
+    )
+
+
+# ---------- hint text ----------
+# Hint lines by direction (SAME, LOWER, HIGHER), as the bot words them
+GENERATION_HINTS = ("Generation: ✅ same generation", "Generation: 🔽 earlier gen", "Generation: 🔼 later gen")
+HEIGHT_HINTS = ("Height: ✅ same height", "Height: 🔽 secret is shorter", "Height: 🔼 secret is taller")
+WEIGHT_HINTS = ("Weight: ✅ same weight", "Weight: 🔽 secret is lighter", "Weight: 🔼 secret is heavier")
+DEX_HINTS = ("Pokédex: ✅ same number", "Pokédex: 🔽 lower number", "Pokédex: 🔼 higher number")
+# Type line by missing-type bits; {0} and {1} are the guess's types.  A
+# guess with one type renders with bit 3 set, as if its 2nd type were missing
+TYPE_HINTS = ("Type: ✅ shared {0}, {1}", "Type: ✅ shared {1}", "Type: ✅ shared {0}", "Type: ❌ no shared types")
+SINGLE_TYPE = 1 << (TYPE_SHIFT + 1)
+
+
+def _hint_templates(code):
+    gen, types, height, weight, dex = unpack(code)
+    if 3 in (gen, height, weight, dex):
+        return None  # no comparison produces this code
+    return (GENERATION_HINTS[gen], TYPE_HINTS[types], HEIGHT_HINTS[height], WEIGHT_HINTS[weight], DEX_HINTS[dex])
+
+
+# Every code's lines, rendered once at import
+HINT_TABLE = tuple(_hint_templates(code) for code in range(NUM_CODES))
+
+
+def hint_lines(code, guess_types, dex=False):
+    """Hint lines for a code; the Pokédex line only when dex is true."""
+    if len(guess_types) < 2:
+        code |= SINGLE_TYPE
+    gen, types, height, weight, dex_line = HINT_TABLE[code]
+    lines = [gen, types.format(*guess_types), height, weight]
+    if dex:
+        lines.append(dex_line)
+    return lines
+
+
+def dex_hint(code):
+    return DEX_HINTS[(code >> DEX_SHIFT) & 3]
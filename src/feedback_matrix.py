@@ -0,0 +1,105 @@
+"""Precomputed guess x secret feedback matrix.
+
+matrix[g, s] is the packed feedback code (see feedback.py) for guessing
+row g when the secret is row s.  Build it offline with
+
+    python -m src.feedback_matrix [--workers N]
+
+and the bot memory-maps the .npy at startup.  The digest of the columns
+it was built from (PokedexColumns.digest) is written next to it, so any
+change to the dataset, even one attribute of one Pokémon, rebuilds it.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .dataset import DATA_DIR, load_dataset
+
+MATRIX_FILE = DATA_DIR / "feedback_matrix.npy"
+
+
+def _digest_path(path):
+    return path.with_name(path.name + ".digest")
+
+_worker_columns = None
+
+
+def _init_worker(columns):
+    global _worker_columns
+    _worker_columns = columns
+
+
+def _compute_rows(bounds):
+    start, stop = bounds
+    return start, np.stack([_worker_columns.compare(g) for g in range(start, stop)])
+
+
+def build_matrix(columns, workers=None, chunk=64):
+    """Compute the full N x N uint16 matrix, fanning rows out to a process pool."""
+    n = len(columns)
+    matrix = np.empty((n, n), dtype=np.uint16)
+    chunks = [(start, min(start + chunk, n)) for start in range(0, n, chunk)]
+
+    if workers == 1:
+        _init_worker(columns)
+        for start, rows in map(_compute_rows, chunks):
+            matrix[start:start + len(rows)] = rows
+        return matrix
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(columns,)) as pool:
+        for start, rows in pool.map(_compute_rows, chunks):
+            matrix[start:start + len(rows)] = rows
+    return matrix
+
+
+def save_matrix(matrix, columns, path=MATRIX_FILE):
+    """Write the matrix atomically so a running bot never maps a partial file, then its digest."""
+    tmp = path.with_suffix(".tmp.npy")
+    np.save(tmp, matrix)
+    os.replace(tmp, path)
+    # Written after the matrix: a crash in between leaves a digest that no longer matches
+    _digest_path(path).write_text(columns.digest())
+
+
+def _is_current(matrix, columns, path):
+    try:
+        digest = _digest_path(path).read_text().strip()
+    except OSError:
+        return False
+    return matrix.shape == (len(columns), len(columns)) and digest == columns.digest()
+
+
+def load_feedback_matrix(columns, path=MATRIX_FILE):
+    """Memory-map the matrix, rebuilding it first if it is missing or stale."""
+    if path.exists():
+        matrix = np.load(path, mmap_mode="r")
+        if _is_current(matrix, columns, path):
+            return matrix
+        print(f"⚠️ {path.name} doesn't match the dataset, rebuilding")
+    else:
+        print(f"⚠️ {path.name} not found, building it")
+
+    # Single process here: this runs inside the bot, not the offline build
+    save_matrix(build_matrix(columns, workers=1), columns, path)
+    return np.load(path, mmap_mode="r")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: all cores)")
+    args = parser.parse_args()
+
+    _, columns = load_dataset()
+    start = time.perf_counter()
+    matrix = build_matrix(columns, workers=args.workers)
+    save_matrix(matrix, columns)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {matrix.shape[0]}x{matrix.shape[1]} feedback matrix "
+          f"({matrix.nbytes / 1024:.0f} KiB) in {elapsed:.2f}s → {MATRIX_FILE}")
+
+
+if __name__ == "__main__":
+    main()
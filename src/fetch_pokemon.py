@@ -1,12 +1,20 @@
+import argparse
 import asyncio
+import hashlib
 import json
+import os
+import random
+import sys
 from pathlib import Path
 import httpx
 from tqdm import tqdm
 
+from .dataset import BINARY_FILE, write_binary
+
 DATA_DIR = Path(__file__).resolve().parents[1] / "data"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 OUTFILE = DATA_DIR / "pokemon.json"
+CACHE_DIR = DATA_DIR / ".http_cache"
 
 POKEAPI = "https://pokeapi.co/api/v2"
 
@@ -16,26 +24,148 @@ GEN_MAP = {
     "generation-vii": 7, "generation-viii": 8, "generation-ix": 9
 }
 
+CONCURRENCY = 32     # requests in flight at once
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5   # seconds; doubles on each retry
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
 def dm_to_m(dm):
     return round(float(dm) / 10.0, 2)
 
 def hg_to_kg(hg):
     return round(float(hg) / 10.0, 1)
 
-async def get_json(client, url):
-    resp = await client.get(url, timeout=30.0)
-    resp.raise_for_status()
-    return resp.json()
+def pokemon_id(url):
+    """Return the numeric ID at the end of a /pokemon/<id>/ URL."""
+    return int(url.rstrip("/").rsplit("/", 1)[-1])
+
+class HttpCache:
+    """On-disk cache of JSON responses and their ETag / Last-Modified validators.
+
+    One small file per URL, written atomically, so an interrupted refresh
+    never leaves a torn entry behind.
+    """
+
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, url):
+        return self.directory / (hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url):
+        try:
+            with self._path(url).open("r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, url, resp):
+        validators = {
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+        }
+        if not any(validators.values()):
+            return  # nothing to revalidate with, not worth keeping
+        path = self._path(url)
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({"url": url, **validators, "body": resp.json()}, f)
+        os.replace(tmp, path)
+
+def make_client(concurrency=CONCURRENCY, transport=None):
+    """AsyncClient with a keep-alive pool sized to the concurrency limit."""
+    return httpx.AsyncClient(
+        transport=transport,
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        timeout=httpx.Timeout(30.0, connect=10.0),
+        headers={"User-Agent": "squirdle-discord-bot (dataset refresh)"},
+    )
+
+class Fetcher:
+    """Bounded-concurrency, retrying PokéAPI reader.
+
+    At most `concurrency` requests are in flight.  429 and 5xx responses
+    and transport errors are retried with exponential backoff (honouring
+    Retry-After).  Species documents are shared by every form of a
+    species, so each one is fetched once and the in-flight task reused.
+    With a `cache`, requests are conditional and a 304 is served from disk.
+    """
+
+    def __init__(self, client, concurrency=CONCURRENCY, retries=MAX_RETRIES, backoff=BACKOFF_BASE, cache=None):
+        self.client = client
+        self.cache = cache
+        self.retries = retries
+        self.backoff = backoff
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._species = {}  # url -> Task
+
+    def _delay(self, attempt, resp=None):
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.backoff * (2 ** attempt) * (1 + random.random() / 4)
+
+    async def get(self, url):
+        """Return (body, changed); changed is False when the cache was still valid."""
+        cached = self.cache.get(url) if self.cache else None
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                async with self._semaphore:
+                    resp = await self.client.get(url, headers=headers)
+            except httpx.TransportError:
+                if last:
+                    raise
+                await asyncio.sleep(self._delay(attempt))
+                continue
+            if resp.status_code in RETRY_STATUSES and not last:
+                await asyncio.sleep(self._delay(attempt, resp))
+                continue
+            if resp.status_code == 304 and cached:
+                return cached["body"], False
+            resp.raise_for_status()
+            if self.cache:
+                self.cache.put(url, resp)
+            return resp.json(), True
+
+    async def get_json(self, url):
+        body, _ = await self.get(url)
+        return body
 
-async def fetch_all_basic_list(client):
+    async def species(self, url):
+        task = self._species.get(url)
+        if task is None:
+            task = self._species[url] = asyncio.ensure_future(self.get_json(url))
+        return await task
+
+async def fetch_all_basic_list(fetcher):
     url = f"{POKEAPI}/pokemon?limit=20000"
-    data = await get_json(client, url)
+    data = await fetcher.get_json(url)
     return data["results"]
 
-async def fetch_pokemon_entry(client, url):
-    p = await get_json(client, url)
+async def fetch_pokemon_entry(fetcher, url, previous=None):
+    """Build one dataset entry, or None for non-default forms.
+
+    If the Pokémon document is unchanged since the last refresh and
+    `previous` (Pokédex number -> entry) has it, that entry is reused
+    without touching the species endpoint.
+    """
+    p, changed = await fetcher.get(url)
     if not p.get("is_default", True):
         return None
+    if not changed and previous and p["id"] in previous:
+        return previous[p["id"]]
 
     name = p["name"]
     pokedex = p["id"]
@@ -43,7 +173,7 @@ async def fetch_pokemon_entry(client, url):
     height_m = dm_to_m(p["height"])
     weight_kg = hg_to_kg(p["weight"])
 
-    species = await get_json(client, p["species"]["url"])
+    species = await fetcher.species(p["species"]["url"])
     gen_name = species["generation"]["name"]
     generation = GEN_MAP.get(gen_name, None)
 
@@ -56,27 +186,93 @@ async def fetch_pokemon_entry(client, url):
         "generation": generation
     }
 
-async def main():
-    async with httpx.AsyncClient() as client:
-        raw_list = await fetch_all_basic_list(client)
-        entries = []
-        pbar = tqdm(raw_list, desc="Fetching Pokémon", unit="poke")
+async def fetch_dataset(fetcher, previous=None, progress=True):
+    """Fetch every default-form Pokémon.
 
-        for item in pbar:
-            try:
-                entry = await fetch_pokemon_entry(client, item["url"])
-                if entry:
-                    entries.append(entry)
-            except Exception:
-                continue
+    Returns (entries sorted by Pokédex number, sorted list of failed IDs).
+    """
+    raw_list = await fetch_all_basic_list(fetcher)
+
+    async def fetch_one(item):
+        try:
+            return item, await fetch_pokemon_entry(fetcher, item["url"], previous), None
+        except (httpx.HTTPError, KeyError, ValueError) as e:
+            return item, None, e
+
+    entries = []
+    failed = []
+    tasks = [asyncio.ensure_future(fetch_one(item)) for item in raw_list]
+    pbar = tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Fetching Pokémon", unit="poke", disable=not progress)
+    for next_done in pbar:
+        item, entry, error = await next_done
+        if error is not None:
+            failed.append(pokemon_id(item["url"]))
+        elif entry:
+            entries.append(entry)
+
+    entries = [e for e in entries if e.get("generation")]
+    entries.sort(key=lambda x: x["pokedex"])
+    return entries, sorted(failed)
+
+def describe_delta(previous, entries):
+    """One-line summary of what a refresh changed."""
+    current = {e["pokedex"]: e for e in entries}
+    added = current.keys() - previous.keys()
+    removed = previous.keys() - current.keys()
+    changed = [dex for dex in current.keys() & previous.keys() if current[dex] != previous[dex]]
+    return f"{len(added)} new, {len(changed)} changed, {len(removed)} removed"
+
+def write_dataset(entries):
+    # Write-then-rename: the bot never sees a half-written file, and the
+    # pokemon.json rename is what its hot reload picks up (until pokemon.bin
+    # is rewritten to match, the bot reads the JSON)
+    tmp = OUTFILE.with_suffix(".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(entries, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, OUTFILE)
+
+    print(f"Wrote {len(entries)} entries → {OUTFILE}")
+
+    # Compact artifact the bot memory-maps at startup
+    write_binary(entries, BINARY_FILE, OUTFILE)
+    print(f"Wrote {len(entries)} entries → {BINARY_FILE}")
+
+async def main(argv=None, transport=None):
+    parser = argparse.ArgumentParser(description="Refresh data/pokemon.json from PokéAPI")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--retries", type=int, default=MAX_RETRIES)
+    parser.add_argument("--allow-partial", action="store_true",
+                        help="write the dataset even if some Pokémon failed to fetch")
+    parser.add_argument("--delta", action="store_true",
+                        help="reuse entries from the current dataset that PokéAPI reports unchanged")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"don't read or write the HTTP cache in {CACHE_DIR}")
+    args = parser.parse_args(argv)
+
+    previous = {}
+    if args.delta and OUTFILE.exists():
+        with OUTFILE.open("r", encoding="utf-8") as f:
+            previous = {e["pokedex"]: e for e in json.load(f)}
+
+    cache = None if args.no_cache else HttpCache()
+    async with make_client(args.concurrency, transport) as client:
+        fetcher = Fetcher(client, concurrency=args.concurrency, retries=args.retries, cache=cache)
+        entries, failed = await fetch_dataset(fetcher, previous)
 
-        entries = [e for e in entries if e.get("generation")]
-        entries.sort(key=lambda x: x["pokedex"])
+    if failed:
+        print(f"⚠️ {len(failed)} Pokémon failed after retries: {', '.join(map(str, failed))}")
+        if not args.allow_partial:
+            print("Dataset not written; rerun, or pass --allow-partial to keep what was fetched.")
+            return 1
 
-        with OUTFILE.open("w", encoding="utf-8") as f:
-            json.dump(entries, f, ensure_ascii=False, indent=2)
+    if previous:
+        print(f"Δ {describe_delta(previous, entries)}")
+        if entries == sorted(previous.values(), key=lambda x: x["pokedex"]):
+            print("Dataset unchanged, nothing written.")
+            return 0
 
-        print(f"Wrote {len(entries)} entries → {OUTFILE}")
+    write_dataset(entries)
+    return 0
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,111 @@
+import heapq
+
+from .pokedex import normalize_name
+
+
+def _trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_levenshtein(a, b, max_distance):
+    """Edit distance between a and b, or max_distance + 1 if it is larger.
+
+    Only the diagonal band of width 2 * max_distance + 1 is filled in,
+    since any cell outside it already costs more than max_distance.
+    """
+    over = max_distance + 1
+    if abs(len(a) - len(b)) > max_distance:
+        return over
+    n = len(b)
+    previous = list(range(n + 1))
+    for i in range(1, len(a) + 1):
+        ca = a[i - 1]
+        lo = max(1, i - max_distance)
+        hi = min(n, i + max_distance)
+        current = [over] * (n + 1)
+        if lo == 1:
+            current[0] = i
+        row_min = current[lo - 1]
+        for j in range(lo, hi + 1):
+            cost = previous[j - 1] + (ca != b[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost
+            if cost < row_min:
+                row_min = cost
+        if row_min > max_distance:
+            return over
+        previous = current
+    return min(previous[n], over)
+
+
+def default_max_distance(key):
+    """How many typos to forgive, scaled by how much was typed."""
+    if len(key) <= 4:
+        return 1
+    if len(key) <= 8:
+        return 2
+    return 3
+
+
+class FuzzyMatcher:
+    """"Did you mean" suggestions for misspelled Pokémon names.
+
+    A trigram inverted index shortlists names that share the most
+    trigrams with the query; only that shortlist pays for an exact,
+    bounded edit-distance check.
+    """
+
+    def __init__(self, entries, index=None, shortlist=30):
+        self.entries = entries
+        self.shortlist = shortlist
+        self.keys = []  # (lookup key, entry index); aliases included
+        self.postings = {}
+
+        position = {id(p): i for i, p in enumerate(entries)}
+        if index is not None:
+            pairs = [(key, position[id(p)]) for key, p in index.by_key.items()]
+        else:
+            pairs = [(normalize_name(p["name"]), i) for i, p in enumerate(entries)]
+
+        for key_id, (key, i) in enumerate(pairs):
+            self.keys.append((key, i))
+            for gram in _trigrams(key):
+                self.postings.setdefault(gram, []).append(key_id)
+
+    def suggest_indices(self, name, limit=3, max_distance=None):
+        """Return entry indices of the closest names, best first."""
+        key = normalize_name(name)
+        if not key:
+            return []
+        if max_distance is None:
+            max_distance = default_max_distance(key)
+
+        grams = _trigrams(key)
+        counts = {}
+        for gram in grams:
+            for key_id in self.postings.get(gram, ()):
+                counts[key_id] = counts.get(key_id, 0) + 1
+
+        # q-gram lemma: each edit destroys at most 3 trigrams
+        min_shared = len(grams) - 3 * max_distance
+        candidates = [key_id for key_id, n in counts.items() if n >= min_shared]
+        if len(candidates) > self.shortlist:
+            candidates = heapq.nlargest(self.shortlist, candidates, key=counts.get)
+
+        best = {}
+        for key_id in candidates:
+            candidate, i = self.keys[key_id]
+            if abs(len(candidate) - len(key)) > max_distance:
+                continue
+            distance = bounded_levenshtein(key, candidate, max_distance)
+            if distance <= max_distance and distance < best.get(i, max_distance + 1):
+                best[i] = distance
+        return sorted(best, key=lambda i: (best[i], i))[:limit]
+
+    def suggest(self, name, limit=3, max_distance=None):
+        """Return the closest Pokémon dictionaries, best first."""
+        return [self.entries[i] for i in self.suggest_indices(name, limit, max_distance)]
@@ -1,66 +1,124 @@
-import json
-import random
-
-# Load Pokémon data
-with open("data/pokemon.json", "r", encoding="utf-8") as f:
-    POKEMON_DATA = json.load(f)
+from .autocomplete import AutocompleteEngine
+from .candidates import CandidateEngine
+from .dataset import dataset_signature, load_dataset
+from .feedback import feedback_code, hint_lines
+from .feedback_matrix import load_feedback_matrix
+from .fuzzy import FuzzyMatcher
+from .metrics import POKEMON_LOOKUPS
+from .pokedex import PokedexIndex
+from .schedule import DailySchedule
+from .search import PokedexSearch
+from .selection import SecretPicker, form_weights, load_difficulty
+from .solver import Solver
+
+
+class GameData:
+    """The Pokédex plus every index derived from it, built together.
+
+    An instance is never mutated after construction; a dataset refresh
+    builds a new one and swaps it in (see reload_game_data).
+    """
+
+    def __init__(self, entries, columns, signature=None, choice=None):
+        self.entries = entries
+        self.signature = signature
+        # Name/alias and Pokédex-number lookups
+        self.index = PokedexIndex(entries)
+        # Typo-tolerant suggestions for names the index doesn't know
+        self.fuzzy = FuzzyMatcher(entries, self.index)
+        # Ranked /guess autocomplete
+        if choice is None:
+            self.autocomplete = AutocompleteEngine(entries, fuzzy=self.fuzzy)
+        else:
+            self.autocomplete = AutocompleteEngine(entries, choice=choice, fuzzy=self.fuzzy)
+        # NumPy columns for batch comparisons (solvers, analytics)
+        self.columns = columns
+        # Memory-mapped guess x secret feedback codes (built on first run)
+        self.matrix = load_feedback_matrix(columns)
+        # Remaining-candidate bitsets for /hint, and the /solve recommender
+        self.candidates = CandidateEngine(entries, columns, self.matrix)
+        self.solver = Solver(entries, self.matrix)
+        # Which Pokémon is the daily secret on each date
+        self.schedule = DailySchedule(p["pokedex"] for p in entries)
+        # Range and type queries for /pokedex
+        self.search = PokedexSearch(entries)
+        # Filtered, weighted personal-game secrets
+        self.picker = SecretPicker(columns, form_weights(entries), load_difficulty())
+
+    @classmethod
+    def load(cls, choice=None):
+        signature = dataset_signature()
+        entries, columns = load_dataset()
+        return cls(entries, columns, signature=signature, choice=choice)
+
+
+_game_data = None
+_choice_factory = None
+
+def set_choice_factory(choice):
+    """Have autocomplete build its results with `choice` (e.g. app_commands.Choice)."""
+    global _choice_factory
+    _choice_factory = choice
+
+def get_game_data():
+    """Load the Pokédex on first use (pokemon.bin, else pokemon.json)."""
+    global _game_data
+    if _game_data is None:
+        _game_data = GameData.load(_choice_factory)
+    return _game_data
+
+def reload_game_data(force=False):
+    """Swap in a freshly loaded Pokédex if the dataset file changed.
+
+    The new GameData is fully built before a single reference assignment
+    publishes it, so callers see either the old snapshot or the new one.
+    Games keep the Pokémon dictionaries they already hold.  Returns True
+    when a reload happened.
+    """
+    global _game_data
+    current = _game_data
+    if not force and current is not None and current.signature == dataset_signature():
+        return False
+    _game_data = GameData.load(_choice_factory)
+    return True
+
+# Old module-level names, resolved lazily against the current snapshot.
+# Long-lived code should call get_game_data() instead so it sees reloads.
+_LAZY_ATTRS = {
+    "POKEMON_DATA": "entries",
+    "POKEDEX_INDEX": "index",
+    "FUZZY_MATCHER": "fuzzy",
+    "POKEDEX_COLUMNS": "columns",
+    "FEEDBACK_MATRIX": "matrix",
+    "CANDIDATES": "candidates",
+    "SOLVER": "solver",
+    "SCHEDULE": "schedule",
+    "PICKER": "picker",
+}
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        return getattr(get_game_data(), _LAZY_ATTRS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def find_pokemon(name):
     """Return the Pokémon dictionary that matches the given name."""
-    name = name.lower().strip()
-    for p in POKEMON_DATA:
-        if p["name"] == name:
-            return p
-    return None
+    pokemon = get_game_data().index.find(name)
+    POKEMON_LOOKUPS.inc("hit" if pokemon else "miss")
+    return pokemon
+
+def suggest_pokemon(name, limit=3):
+    """Return up to `limit` Pokémon whose names are close to a misspelling."""
+    return get_game_data().fuzzy.suggest(name, limit=limit)
 
 def compare_pokemon(guess, secret):
     """Compare two Pokémon and return hint strings."""
-    results = []
-
-    # Generation
-    if guess["generation"] == secret["generation"]:
-        results.append("Generation: ✅ same generation")
-    elif guess["generation"] > secret["generation"]:
-        results.append("Generation: 🔽 secret Pokémon is from an earlier gen")
-    else:
-        results.append("Generation: 🔼 secret Pokémon is from a later gen")
-
-    # Type match
-    type_overlap = set(guess["types"]) & set(secret["types"])
-    if type_overlap:
-        results.append(f"Type: ✅ shared type(s): {', '.join(type_overlap)}")
-    else:
-        results.append("Type: ❌ no shared types")
-
-    # Height comparison
-    if guess["height_m"] == secret["height_m"]:
-        results.append("Height: ✅ same height")
-    elif guess["height_m"] > secret["height_m"]:
-        results.append("Height: 🔽 secret Pokémon is shorter")
-    else:
-        results.append("Height: 🔼 secret Pokémon is taller")
-
-    # Weight comparison
-    if guess["weight_kg"] == secret["weight_kg"]:
-        results.append("Weight: ✅ same weight")
-    elif guess["weight_kg"] > secret["weight_kg"]:
-        results.append("Weight: 🔽 secret Pokémon is lighter")
-    else:
-        results.append("Weight: 🔼 secret Pokémon is heavier")
-
-    # Pokédex number comparison
-    if guess["pokedex"] == secret["pokedex"]:
-        results.append("Pokédex: 🎯 correct Pokémon!")
-    elif guess["pokedex"] > secret["pokedex"]:
-        results.append("Pokédex: 🔽 secret Pokémon has a lower number")
-    else:
-        results.append("Pokédex: 🔼 secret Pokémon has a higher number")
-
-    return results
+    return hint_lines(feedback_code(guess, secret), guess["types"], dex=True)
 
 def main():
     # Choose a random secret Pokémon
-    secret = random.choice(POKEMON_DATA)
+    data = get_game_data()
+    secret = data.index.by_number(data.picker.pick())
     print("A secret Pokémon has been chosen! You have 9 tries to guess it.\n")
 
     max_tries = 9
@@ -76,7 +134,12 @@ def main():
 
         guess = find_pokemon(guess_name)
         if not guess:
-            print("❌ Pokémon not found. Try again.\n")
+            suggestions = suggest_pokemon(guess_name)
+            if suggestions:
+                names = ", ".join(p["name"].title() for p in suggestions)
+                print(f"❌ Pokémon not found. Did you mean: {names}?\n")
+            else:
+                print("❌ Pokémon not found. Try again.\n")
             continue
 
         attempts += 1
@@ -0,0 +1,249 @@
+"""Daily state partitioned by guild.
+
+Each guild gets its own daily puzzle, leaderboard, history rollups and
+timezone; DMs share GLOBAL_GUILD.  A partition is created on the first
+command from its guild, loaded from the store if the guild has played
+before, and dropped from memory after `idle` seconds without one.
+
+A guild's day rolls over from the bot's rollover task at its midnight
+(see rollover), and otherwise, as a backstop, on its next command, so
+commands only ever read the current daily game.  Guilds with an announcement channel
+are loaded at their midnight to roll over even if nobody plays, so the
+recap gets posted.
+Everything in a partition is already persisted by the write-behind store
+(idle is far longer than its flush interval), so dropping costs nothing
+and the next command simply loads it again.  Without a persistent store
+nothing is ever dropped.  Memory follows the guilds
+that are active, not every guild the bot is in.
+"""
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, available_timezones
+
+from .feedback import feedback_code
+from .game_logic import get_game_data
+from .leaderboard import Leaderboard
+from .storage import GLOBAL_GUILD
+
+DEFAULT_TIMEZONE = "UTC"
+GUILD_IDLE = 30 * 60   # seconds before an idle guild is dropped from memory
+
+
+@lru_cache(maxsize=None)
+def known_timezones():
+    return frozenset(available_timezones())
+
+
+@lru_cache(maxsize=None)
+def timezone_names():
+    """Every IANA timezone name, sorted (for /timezone autocomplete)."""
+    return sorted(known_timezones())
+
+
+def new_daily_game(guild_id, day, pokemon):
+    return {
+        "guild_id": guild_id,
+        "pokemon": pokemon,
+        "date": day,
+        "attempts": {},      # user_id -> [list of guesses (dicts)]
+        "completions": {},   # user_id -> datetime
+        "leaderboard": Leaderboard(),   # {user_id, username, attempts, completion_time} by rank
+        "codes": {},         # user_id -> [feedback code of each guess]
+        "candidates": {},    # user_id -> bitset of Pokémon still possible
+    }
+
+
+class GuildState:
+    __slots__ = ("guild_id", "timezone", "daily_game", "history", "channel_id", "last_active", "rolls_at")
+
+    def __init__(self, guild_id, timezone, daily_game, history, channel_id=None, last_active=0.0):
+        self.guild_id = guild_id
+        self.timezone = timezone
+        self.daily_game = daily_game   # None until the first daily command
+        self.history = history
+        self.channel_id = channel_id   # where rollovers are announced, if anywhere
+        self.last_active = last_active
+        self.rolls_at = 0.0            # Unix time the daily game's date ends here; 0 until rolled
+
+    @property
+    def tzinfo(self):
+        return ZoneInfo(self.timezone)  # ZoneInfo caches instances by key
+
+    def today(self, moment=None):
+        """The guild's date now (or at `moment`), which decides its daily puzzle."""
+        local = datetime.now(self.tzinfo) if moment is None else moment.astimezone(self.tzinfo)
+        return local.strftime("%Y-%m-%d")
+
+    def day_end(self, day):
+        """Unix time of the local midnight that ends the ISO date `day`."""
+        following = date.fromisoformat(day) + timedelta(days=1)
+        return datetime.combine(following, datetime.min.time(), self.tzinfo).timestamp()
+
+    def local_time(self, moment):
+        return moment.astimezone(self.tzinfo).strftime("%H:%M %Z")
+
+
+class GuildPartitions:
+    """GuildState by guild ID, in least- to most-recently-used order."""
+
+    def __init__(self, store, idle=GUILD_IDLE, default_timezone=DEFAULT_TIMEZONE, on_roll=None,
+                 clock=time.monotonic):
+        self.store = store
+        self.on_roll = on_roll   # called with (state, archived game or None, user IDs archived)
+        self.idle = idle
+        self.default_timezone = default_timezone
+        self.clock = clock
+        self.announcing = {}   # guild_id -> timezone, for guilds with an announcement channel, loaded or not
+        self._guilds = OrderedDict()
+
+    def __len__(self):
+        return len(self._guilds)
+
+    def __contains__(self, guild_id):
+        return (guild_id or GLOBAL_GUILD) in self._guilds
+
+    def __iter__(self):
+        """The loaded GuildStates."""
+        return iter(list(self._guilds.values()))
+
+    def get(self, guild_id):
+        """Return the guild's partition (None means DMs), loading it if needed."""
+        guild_id = guild_id or GLOBAL_GUILD
+        state = self._guilds.get(guild_id)
+        if state is None:
+            state = self._guilds[guild_id] = self._load(guild_id)
+        if time.time() >= state.rolls_at:   # a backstop: the rollover task normally got there first
+            self.roll(state)
+        state.last_active = self.clock()
+        self._guilds.move_to_end(guild_id)
+        return state
+
+    def _load(self, guild_id):
+        data = get_game_data()
+        daily_game = self.store.load_daily(guild_id, data.index.by_number)
+        if daily_game:
+            secret = daily_game["pokemon"]
+            daily_game["codes"] = {}
+            daily_game["candidates"] = {}
+            for user_id, guesses in daily_game["attempts"].items():
+                codes = daily_game["codes"][user_id] = [feedback_code(guess, secret) for guess in guesses]
+                daily_game["candidates"][user_id] = data.candidates.from_codes(
+                    zip((guess["pokedex"] for guess in guesses), codes)
+                )
+        return GuildState(
+            guild_id,
+            self.store.load_timezone(guild_id) or self.default_timezone,
+            daily_game,
+            self.store.load_history(guild_id),
+            self.store.load_channel(guild_id),
+        )
+
+    def load_announcing(self, owns=None):
+        """Read which guilds announce rollovers, keeping those `owns(guild_id)` accepts."""
+        self.announcing = {
+            guild_id: timezone or self.default_timezone
+            for guild_id, timezone in self.store.load_announcing().items()
+            if owns is None or owns(guild_id)
+        }
+
+    def roll(self, state, moment=None):
+        """Start the guild's puzzle for its current date unless it already has.
+
+        The day being replaced is archived into the guild's history first.
+        A day is never rolled back, e.g. after moving to a timezone that's
+        still on yesterday.  Returns True when a new day started.
+        """
+        today = state.today(moment)
+        game = state.daily_game
+        if game and game["date"] >= today:
+            state.rolls_at = state.day_end(game["date"])
+            return False
+        user_ids = state.history.archive_day(game) if game else []
+        if user_ids:
+            self.store.save_history(state.history, game, user_ids)
+        data = get_game_data()
+        pokemon = data.index.by_number(data.schedule.secret(today))
+        state.daily_game = new_daily_game(state.guild_id, today, pokemon)
+        state.rolls_at = state.day_end(today)
+        self.store.save_daily(state.daily_game)
+        if self.on_roll:
+            self.on_roll(state, game, user_ids)
+        return True
+
+    def rollover(self, moment=None, window=None):
+        """Roll over every loaded guild whose midnight has passed; return how many did.
+
+        Announcing guilds that aren't loaded are loaded, which rolls them,
+        when their midnight fell within `window` (a timedelta) before `moment`.
+        """
+        rolled = 0
+        for state in self:
+            rolled += self._try(self.roll, state, moment)
+        if window is None:
+            return rolled
+        moment = moment or datetime.now(dt_timezone.utc)
+        for guild_id, timezone in list(self.announcing.items()):
+            rolled += self._try(self._roll_announcing, guild_id, timezone, moment, window)
+        return rolled
+
+    def _roll_announcing(self, guild_id, timezone, moment, window):
+        tzinfo = ZoneInfo(timezone)
+        if guild_id in self or moment.astimezone(tzinfo).date() == (moment - window).astimezone(tzinfo).date():
+            return False
+        state = self._guilds[guild_id] = self._load(guild_id)
+        state.last_active = self.clock()
+        return self.roll(state, moment)
+
+    @staticmethod
+    def _try(roll, *args):
+        """One guild's rollover; a failure (a bad timezone row, a store error) doesn't stop the others."""
+        try:
+            return roll(*args)
+        except Exception as e:
+            print(f"⚠️ Rollover failed for guild {getattr(args[0], 'guild_id', args[0])}: {e!r}")
+            return False
+
+    def set_timezone(self, guild_id, timezone):
+        """Change a guild's rollover timezone; raises ValueError for unknown names."""
+        if timezone not in known_timezones():
+            raise ValueError(f"unknown timezone {timezone!r}")
+        state = self.get(guild_id)
+        state.timezone = timezone
+        self.store.save_timezone(state.guild_id, timezone)
+        if state.guild_id in self.announcing:
+            self.announcing[state.guild_id] = timezone
+        self.roll(state)  # the new timezone may already be past midnight
+        if state.daily_game:
+            state.daily_game["leaderboard"].invalidate()  # times are shown in the guild's timezone
+        return state
+
+    def set_channel(self, guild_id, channel_id):
+        """Announce the guild's rollovers in channel_id, or nowhere with None."""
+        state = self.get(guild_id)
+        state.channel_id = channel_id
+        self.store.save_channel(state.guild_id, channel_id)
+        if channel_id is None:
+            self.announcing.pop(state.guild_id, None)
+        else:
+            self.announcing[state.guild_id] = state.timezone
+        return state
+
+    def sweep(self):
+        """Drop partitions idle for longer than `idle`; return how many went.
+
+        Nothing goes when the store doesn't persist (the no-op GameStore):
+        the partition is the only copy of the guild's day.
+        """
+        if not self.store.persistent:
+            return 0
+        cutoff = self.clock() - self.idle
+        evicted = 0
+        while self._guilds:
+            guild_id, state = next(iter(self._guilds.items()))
+            if state.last_active > cutoff:
+                break
+            del self._guilds[guild_id]
+            evicted += 1
+        return evicted
@@ -0,0 +1,153 @@
+"""Finished daily games rolled up into per-user and all-time statistics.
+
+At each rollover the day that just ended is folded into the rollups
+once: per-user totals, guess distribution and streaks, the current
+week's totals, and the ranked weekly and all-time boards.  Reading a
+user's stats or a board is then a dictionary lookup, never a rescan
+of old days.  The raw attempts stay in the store under their date.
+"""
+from datetime import date, timedelta
+from functools import lru_cache
+
+from .sessions import MAX_TRIES
+
+TOP = 10
+
+
+@lru_cache(maxsize=64)
+def previous_day(day):
+    return (date.fromisoformat(day) - timedelta(days=1)).isoformat()
+
+
+def week_of(day):
+    year, week, _ = date.fromisoformat(day).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class UserStats:
+    __slots__ = ("username", "played", "wins", "distribution", "streak", "best_streak", "last_played", "last_win")
+
+    def __init__(self, username=None, played=0, wins=0, distribution=None, streak=0, best_streak=0,
+                 last_played=None, last_win=None):
+        self.username = username
+        self.played = played
+        self.wins = wins
+        self.distribution = distribution or [0] * MAX_TRIES  # wins by number of tries
+        self.streak = streak
+        self.best_streak = best_streak
+        self.last_played = last_played
+        self.last_win = last_win
+
+    @property
+    def win_rate(self):
+        return self.wins / self.played if self.played else 0.0
+
+    def record(self, day, attempts, won, username=None):
+        self.played += 1
+        self.last_played = day
+        if username:
+            self.username = username
+        if won:
+            self.wins += 1
+            self.distribution[attempts - 1] += 1
+            self.streak = self.streak + 1 if self.last_win == previous_day(day) else 1
+            self.best_streak = max(self.best_streak, self.streak)
+            self.last_win = day
+        else:
+            self.streak = 0
+
+
+class Rollup:
+    """Wins and tries per user over some span of days, ranked on demand."""
+
+    def __init__(self, key=None):
+        self.key = key
+        self.totals = {}  # user_id -> [wins, tries spent on wins]
+        self.ranked = []
+        self.ranks = {}
+        self._top_payload = None
+
+    def add(self, user_id, attempts):
+        totals = self.totals.setdefault(user_id, [0, 0])
+        totals[0] += 1
+        totals[1] += attempts
+
+    def rank_all(self):
+        """Order by most wins, then fewest average tries."""
+        order = sorted((-wins, tries / wins, user_id) for user_id, (wins, tries) in self.totals.items() if wins)
+        self.ranked = [user_id for _, _, user_id in order]
+        self.ranks = {user_id: i for i, user_id in enumerate(self.ranked, 1)}
+        self._top_payload = None
+
+    def top(self, k=TOP):
+        return [(user_id, *self.totals[user_id]) for user_id in self.ranked[:k]]
+
+    def top_payload(self, render):
+        """render(top rows), reused until the next rollover."""
+        if self._top_payload is None:
+            self._top_payload = render(self.top())
+        return self._top_payload
+
+
+class History:
+    def __init__(self, users=None, week=None, last_day=None):
+        self.users = users or {}   # user_id -> UserStats
+        self.week = week or Rollup()
+        self.all_time = Rollup()
+        self.last_day = last_day   # most recent day folded in
+        for user_id, stats in self.users.items():
+            for tries, count in enumerate(stats.distribution, 1):
+                if count:
+                    totals = self.all_time.totals.setdefault(user_id, [0, 0])
+                    totals[0] += count
+                    totals[1] += tries * count
+        self.week.rank_all()
+        self.all_time.rank_all()
+
+    def archive_day(self, daily_game):
+        """Fold a finished day into the rollups; return the user IDs touched.
+
+        A day that was already archived is ignored, so this is safe to call
+        again after a restart.
+        """
+        day = daily_game["date"]
+        if self.last_day is not None and day <= self.last_day:
+            return []
+        if self.week.key != week_of(day):
+            self.week = Rollup(week_of(day))
+
+        board = daily_game["leaderboard"]
+        for user_id, guesses in daily_game["attempts"].items():
+            entry = board.get(user_id)
+            won = entry is not None
+            stats = self.users.get(user_id)
+            if stats is None:
+                stats = self.users[user_id] = UserStats()
+            stats.record(day, len(guesses), won, entry["username"] if won else None)
+            if won:
+                self.week.add(user_id, len(guesses))
+                self.all_time.add(user_id, len(guesses))
+
+        self.last_day = day
+        self.week.rank_all()
+        self.all_time.rank_all()
+        return list(daily_game["attempts"])
+
+    def stats(self, user_id):
+        return self.users.get(user_id)
+
+    def current_streak(self, user_id, today, solved_today=False):
+        """Streak as of today, counting today's solve if there is one."""
+        stats = self.users.get(user_id)
+        streak = stats.streak if stats and stats.last_win == previous_day(today) else 0
+        return streak + 1 if solved_today else streak
+
+    def board(self, scope, today):
+        """The weekly or all-time rollup; the weekly one only if it's this week's."""
+        if scope == "all":
+            return self.all_time
+        return self.week if self.week.key == week_of(today) else Rollup(week_of(today))
+
+    def username(self, user_id):
+        stats = self.users.get(user_id)
+        return stats.username if stats and stats.username else f"Trainer {user_id}"
@@ -0,0 +1,95 @@
+"""Daily leaderboard ordered by (attempts, completion_time).
+
+Attempts only range over 1..9, so solvers are kept in one bucket per
+attempt count, each sorted by (completion_time, user_id).  A solver's
+rank is the size of the better buckets plus a bisect into their own, so
+neither inserting nor ranking ever sorts the whole board.  Completions
+arrive in time order, so inserts are appends in practice.
+
+The rendered top of the board is cached and only thrown away when an
+insert lands inside it.
+"""
+from bisect import bisect_left, insort
+
+TOP = 10
+
+
+class Leaderboard:
+    def __init__(self, entries=()):
+        self._entries = {}   # user_id -> entry dict
+        self._buckets = {}   # attempts -> sorted [(completion_time, user_id)]
+        self._top_payload = None
+        for entry in entries:
+            self.add(entry)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, user_id):
+        return user_id in self._entries
+
+    def __bool__(self):
+        return bool(self._entries)
+
+    def get(self, user_id):
+        return self._entries.get(user_id)
+
+    def _position(self, attempts, key):
+        """0-based position of `key` within the whole board."""
+        ahead = sum(len(bucket) for a, bucket in self._buckets.items() if a < attempts)
+        return ahead + bisect_left(self._buckets.get(attempts, ()), key)
+
+    def add(self, entry):
+        """Add a solver's {user_id, username, attempts, completion_time}; return their rank."""
+        user_id = entry["user_id"]
+        if user_id in self._entries:
+            self.remove(user_id)
+        key = (entry["completion_time"], user_id)
+        insort(self._buckets.setdefault(entry["attempts"], []), key)
+        self._entries[user_id] = entry
+        position = self._position(entry["attempts"], key)
+        if position < TOP:
+            self._top_payload = None
+        return position + 1
+
+    def remove(self, user_id):
+        entry = self._entries.pop(user_id)
+        bucket = self._buckets[entry["attempts"]]
+        key = (entry["completion_time"], user_id)
+        position = self._position(entry["attempts"], key)
+        del bucket[bisect_left(bucket, key)]
+        if position < TOP:
+            self._top_payload = None
+
+    def rank(self, user_id):
+        """1-based rank of a solver, or None if they haven't solved."""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        return self._position(entry["attempts"], (entry["completion_time"], user_id)) + 1
+
+    def top(self, k=TOP):
+        """The first k entries, best first."""
+        result = []
+        for attempts in sorted(self._buckets):
+            for _, user_id in self._buckets[attempts][:k - len(result)]:
+                result.append(self._entries[user_id])
+            if len(result) >= k:
+                break
+        return result
+
+    def invalidate(self):
+        """Forget the cached render, e.g. when how entries are shown changes."""
+        self._top_payload = None
+
+    def top_payload(self, render):
+        """render(top entries), reused until the top of the board changes."""
+        if self._top_payload is None:
+            self._top_payload = render(self.top())
+        return self._top_payload
+
+    def __iter__(self):
+        """Every entry, best first."""
+        for attempts in sorted(self._buckets):
+            for _, user_id in self._buckets[attempts]:
+                yield self._entries[user_id]
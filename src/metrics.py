@@ -0,0 +1,169 @@
+"""Prometheus-style metrics, rendered as text for the /metrics endpoint.
+
+Counters and histograms are plain ints and floats updated from the event
+loop, so recording one is a dict lookup and an add: no locks, and no
+allocation once a label has been seen (each label's buckets are
+allocated on first use).  Gauges are read when the endpoint renders,
+from callbacks the bot registers, so they cost nothing in between.
+
+Decorate slash commands with `instrument_command` and autocomplete
+callbacks with `instrument_autocomplete`; both keep the signature
+discord.py inspects.  Commands get two latencies: the handler's own
+time, measured with the monotonic clock from when the callback starts,
+and the end-to-end time from the interaction's creation at Discord (its
+snowflake timestamp), which adds gateway and queueing delay.  The
+latter compares Discord's clock with ours, so it is only as good as the
+host's clock sync and the snowflake's millisecond resolution.
+"""
+import functools
+import math
+import os
+import time
+from bisect import bisect_left
+
+# Seconds; Discord wants a response within 3
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+REGISTRY = []
+
+
+def _number(value):
+    return "NaN" if isinstance(value, float) and math.isnan(value) else value
+
+
+def _labels(label, value):
+    return f'{{{label}="{value}"}}' if label else ""
+
+
+class Counter:
+    def __init__(self, name, help, label=None):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.values = {}   # label value -> count
+        REGISTRY.append(self)
+
+    def inc(self, label_value=None, amount=1):
+        self.values[label_value] = self.values.get(label_value, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(self.label, v)} {n}" for v, n in self.values.items()]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, label=None, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.bounds = tuple(buckets)
+        self.series = {}   # label value -> [count per bucket..., +Inf count, sum]
+        REGISTRY.append(self)
+
+    def observe(self, value, label_value=None):
+        series = self.series.get(label_value)
+        if series is None:
+            series = self.series[label_value] = [0] * (len(self.bounds) + 1) + [0.0]
+        series[bisect_left(self.bounds, value)] += 1
+        series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for value, series in self.series.items():
+            prefix = f'{self.label}="{value}",' if self.label else ""
+            total = 0
+            for bound, count in zip((*self.bounds, "+Inf"), series):
+                total += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {total}')
+            lines.append(f"{self.name}_sum{_labels(self.label, value)} {series[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.label, value)} {total}")
+        return lines
+
+
+class Gauge:
+    """A value set as it changes, or read from `read()` at render time."""
+
+    def __init__(self, name, help, read=None):
+        self.name = name
+        self.help = help
+        self.read = read
+        self.value = float("nan")
+        REGISTRY.append(self)
+
+    def set(self, value):
+        self.value = value
+
+    def render(self):
+        value = self.read() if self.read else self.value
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {_number(value)}"]
+
+
+def render():
+    """Every registered metric in the Prometheus text format."""
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+def process_rss():
+    """Resident set size in bytes (peak RSS where /proc isn't available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, AttributeError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+COMMAND_SECONDS = Histogram(
+    "squirdle_command_seconds", "Slash command handler time, from the callback starting to its response sent.",
+    "command"
+)
+COMMAND_RESPONSE_SECONDS = Histogram(
+    "squirdle_command_response_seconds",
+    "Slash command latency from the interaction's creation at Discord (snowflake time, wall clock) to its "
+    "response sent, including gateway and queueing delay.", "command"
+)
+COMMAND_ERRORS = Counter(
+    "squirdle_command_errors_total", "Slash command and autocomplete callbacks that raised.", "command"
+)
+AUTOCOMPLETE_SECONDS = Histogram(
+    "squirdle_autocomplete_seconds", "Autocomplete latency; the count is the call rate.", "command"
+)
+BROADCAST_MESSAGES = Counter(
+    "squirdle_broadcast_messages_total", "Announcement messages sent, dropped, requeued after an outage, and 429s received.", "result"
+)
+POKEMON_LOOKUPS = Counter("squirdle_pokemon_lookups_total", "find_pokemon calls by result.", "result")
+EVENT_LOOP_LAG = Gauge("squirdle_event_loop_lag_seconds", "How late the last timed wakeup on the event loop ran.")
+PROCESS_RSS = Gauge("squirdle_process_resident_memory_bytes", "Resident memory of this process.", process_rss)
+
+
+def _timed(histogram, func, since_created=None):
+    @functools.wraps(func)
+    async def wrapper(interaction, *args, **kwargs):
+        command = getattr(interaction, "command", None)
+        name = command.qualified_name if command else func.__name__
+        start = time.perf_counter()
+        try:
+            return await func(interaction, *args, **kwargs)
+        except Exception:
+            COMMAND_ERRORS.inc(name)
+            raise
+        finally:
+            histogram.observe(time.perf_counter() - start, name)
+            created_at = getattr(interaction, "created_at", None)
+            if since_created is not None and created_at is not None:
+                # Clamped: a host clock behind Discord's would give negative ages
+                since_created.observe(max(0.0, time.time() - created_at.timestamp()), name)
+    return wrapper
+
+
+def instrument_command(func):
+    """Time a slash command callback (it returns once its response is sent), and the wait since its creation."""
+    return _timed(COMMAND_SECONDS, func, COMMAND_RESPONSE_SECONDS)
+
+
+def instrument_autocomplete(func):
+    return _timed(AUTOCOMPLETE_SECONDS, func)
@@ -0,0 +1,82 @@
+import re
+import unicodedata
+
+# Symbols players type that PokéAPI spells out in the slug
+_SYMBOL_ALIASES = {"♀": "f", "♂": "m"}
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+# PokéAPI type order; a type's position is its bit in a type mask
+TYPE_NAMES = (
+    "normal", "fighting", "flying", "poison", "ground", "rock",
+    "bug", "ghost", "steel", "fire", "water", "grass",
+    "electric", "psychic", "ice", "dragon", "dark", "fairy",
+)
+TYPE_BITS = {name: 1 << i for i, name in enumerate(TYPE_NAMES)}
+
+
+def type_mask(types):
+    """Return the bitmask of a list of type names."""
+    mask = 0
+    for t in types:
+        mask |= TYPE_BITS[t]
+    return mask
+
+
+def normalize_name(name):
+    """Collapse a user-typed Pokémon name to its lookup key.
+
+    Case, accents, whitespace and punctuation are dropped so that
+    "mr-mime", "mr. mime" and "Mr Mime" all map to "mrmime".
+    """
+    name = (name or "").strip().lower()
+    for symbol, replacement in _SYMBOL_ALIASES.items():
+        name = name.replace(symbol, replacement)
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(ch for ch in name if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub("", name)
+
+
+class PokedexIndex:
+    """Hash indexes over the Pokémon list, built once at load time."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.by_name = {}
+        self.by_key = {}
+        self.by_dex = {}
+
+        for p in entries:
+            self.by_name[p["name"]] = p
+            self.by_key[normalize_name(p["name"])] = p
+            self.by_dex[p["pokedex"]] = p
+
+        # Default forms are stored as "giratina-altered", "deoxys-normal"...
+        # Let the bare species name resolve too, unless it is ambiguous
+        # ("tapu-*", "iron-*") or already a Pokémon of its own ("porygon").
+        base_counts = {}
+        for p in entries:
+            if "-" in p["name"]:
+                base = normalize_name(p["name"].split("-", 1)[0])
+                base_counts[base] = base_counts.get(base, 0) + 1
+        for p in entries:
+            if "-" in p["name"]:
+                base = normalize_name(p["name"].split("-", 1)[0])
+                if len(base) >= 3 and base_counts[base] == 1 and base not in self.by_key:
+                    self.by_key[base] = p
+
+    def __len__(self):
+        return len(self.entries)
+
+    def find(self, name):
+        """Return the Pokémon matching a name or alias, or None."""
+        # Autocomplete submits the exact slug, so try that before normalizing
+        p = self.by_name.get(name)
+        if p is None:
+            p = self.by_key.get(normalize_name(name))
+        return p
+
+    def by_number(self, pokedex):
+        """Return the Pokémon with the given Pokédex number, or None."""
+        return self.by_dex.get(pokedex)
+
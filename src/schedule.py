@@ -0,0 +1,58 @@
+"""Which Pokémon is the daily secret on each date.
+
+Days are numbered from EPOCH and dealt out of shuffled cycles of every
+Pokédex number, so a cycle never repeats a secret.  Each cycle is
+shuffled by its own random.Random seeded from (seed, cycle), never the
+process-wide RNG, so the schedule is the same on every restart and
+shard and nothing else can nudge it.  Where one cycle meets the next,
+the first `window` secrets of the new cycle are chosen from numbers the
+old one didn't use in its last `window` days, so no secret comes back
+within `window` days anywhere.
+
+Every guild sees the same secret on the same local date.  The schedule
+follows the dataset it was built from: a refreshed Pokédex deals
+different days from then on, while a day already started keeps its
+saved secret.
+"""
+import os
+import random
+from datetime import date, timedelta
+
+EPOCH = date(2024, 1, 1)
+WINDOW = 365   # days before a secret may come back
+SEED = os.getenv("SQUIRDLE_SCHEDULE_SEED", "squirdle-daily")
+
+
+class DailySchedule:
+    def __init__(self, numbers, seed=SEED, window=WINDOW, epoch=EPOCH):
+        self.numbers = sorted(numbers)
+        self.seed = seed
+        self.window = min(window, len(self.numbers) // 2)
+        self.epoch = epoch
+        self._cycles = []   # cycle -> every number, in the order they're dealt
+
+    def _cycle(self, cycle):
+        while len(self._cycles) <= cycle:
+            order = list(self.numbers)
+            random.Random(f"{self.seed}:{len(self._cycles)}").shuffle(order)
+            if self._cycles and self.window:
+                recent = set(self._cycles[-1][-self.window:])
+                head = [n for n in order if n not in recent][:self.window]
+                dealt = set(head)
+                order = head + [n for n in order if n not in dealt]
+            self._cycles.append(order)
+        return self._cycles[cycle]
+
+    def secret(self, day):
+        """Pokédex number of the secret for an ISO date on or after the epoch."""
+        days = (date.fromisoformat(day) - self.epoch).days
+        if days < 0:
+            raise ValueError(f"{day} is before the schedule starts ({self.epoch})")
+        cycle, position = divmod(days, len(self.numbers))
+        return self._cycle(cycle)[position]
+
+    def upcoming(self, day, days):
+        """[(ISO date, Pokédex number)] for `days` days starting at `day`."""
+        start = date.fromisoformat(day)
+        dates = [(start + timedelta(days=i)).isoformat() for i in range(days)]
+        return [(d, self.secret(d)) for d in dates]
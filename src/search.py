@@ -0,0 +1,75 @@
+"""Range queries over the Pokédex for /pokedex, without scanning it.
+
+Height, weight and generation each get the rows sorted by that value,
+so a range is two bisections (np.searchsorted) into a contiguous slice
+of rows.  Each type has a posting list: the rows of every Pokémon with
+it.  A query starts from its smallest slice or posting list and checks
+the other constraints on just those rows, then returns them in Pokédex
+order.  Values are the floats in the entries, as in pokemon.json, so a
+bound like 1.7 m compares exactly against the stored 1.7.
+"""
+import numpy as np
+
+from .pokedex import TYPE_NAMES
+
+PAGE_SIZE = 15
+
+
+class PokedexSearch:
+    """Sorted columns and type posting lists over one Pokédex snapshot."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.dex = np.array([p["pokedex"] for p in entries], dtype=np.intp)
+        self.values = {
+            "height": np.array([p["height_m"] for p in entries], dtype=np.float64),
+            "weight": np.array([p["weight_kg"] for p in entries], dtype=np.float64),
+            "generation": np.array([p["generation"] for p in entries], dtype=np.float64),
+        }
+        # attribute -> (rows sorted by it, its values in that order)
+        self._sorted = {}
+        for attribute, values in self.values.items():
+            order = np.argsort(values, kind="stable")
+            self._sorted[attribute] = (order, values[order])
+        # type name -> rows that have it, ascending
+        postings = {t: [] for t in TYPE_NAMES}
+        for row, p in enumerate(entries):
+            for t in p["types"]:
+                postings[t].append(row)
+        self.postings = {t: np.array(rows, dtype=np.intp) for t, rows in postings.items()}
+        self._has_type = {t: np.isin(np.arange(len(entries)), rows) for t, rows in self.postings.items()}
+
+    def _range(self, attribute, low, high):
+        """Rows with low <= value <= high (either bound may be None)."""
+        order, values = self._sorted[attribute]
+        start = 0 if low is None else np.searchsorted(values, low, side="left")
+        stop = len(values) if high is None else np.searchsorted(values, high, side="right")
+        return order[start:stop]
+
+    def query(self, height=(None, None), weight=(None, None), generations=(None, None), types=()):
+        """Rows of every Pokémon within the (low, high) ranges and with all of `types`, in Pokédex order."""
+        ranges = {"height": height, "weight": weight, "generation": generations}
+        candidates = [self._range(a, *bounds) for a, bounds in ranges.items() if bounds != (None, None)]
+        candidates += [self.postings[t] for t in types]
+        if not candidates:
+            return np.argsort(self.dex, kind="stable")
+        candidates.sort(key=len)
+        rows = candidates[0]
+        for attribute, (low, high) in ranges.items():
+            if low is None and high is None:
+                continue
+            values = self.values[attribute][rows]
+            if low is not None:
+                rows = rows[values >= low]
+                values = values[values >= low]
+            if high is not None:
+                rows = rows[values <= high]
+        for t in types:
+            rows = rows[self._has_type[t][rows]]
+        return rows[np.argsort(self.dex[rows], kind="stable")]
+
+    def page(self, rows, page, size=PAGE_SIZE):
+        """(entries on 1-based `page`, that page, page count), with `page` clamped into range."""
+        pages = max(1, -(-len(rows) // size))
+        page = min(max(page, 1), pages)
+        return [self.entries[i] for i in rows[(page - 1) * size:page * size]], page, pages
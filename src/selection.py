@@ -0,0 +1,142 @@
+"""Picking personal-game secrets, filtered and weighted, in O(1) per draw.
+
+A filter is a generation range, a type bitmask (the secret has every
+type in it) and a difficulty tier from difficulty.json.  Row masks per
+generation, per type and per tier are built once with the Pokédex, so a
+filter's pool is a few ANDs of them.  Each pool gets an alias table
+(Vose's alias method): one uniform slot and one coin flip per draw, no
+matter how uneven the weights.  Tables are kept in an LRU cache of
+`cache_size` filters, so memory stays bounded however many combinations
+players ask for; the unfiltered pool is built up front.
+
+difficulty.json is written offline by `python -m src.difficulty`; until
+it exists there's no difficulty filter.  Weights default to 1, and
+FORM_WEIGHT for names carrying a form suffix, such as "giratina-altered"
+or "palafin-zero", which are hard to guess by name.
+"""
+import json
+import random
+import re
+from array import array
+from functools import lru_cache
+
+import numpy as np
+
+from .dataset import DATA_DIR
+from .pokedex import TYPE_BITS
+
+DIFFICULTY_FILE = DATA_DIR / "difficulty.json"
+TIERS = ("easy", "medium", "hard")
+FORM_WEIGHT = 0.5
+# What PokéAPI appends to a species' default form ("giratina-altered"), as
+# opposed to names that are hyphenated anyway ("great-tusk", "chi-yu")
+FORM_SUFFIXES = frozenset({
+    "normal", "plant", "altered", "land", "red-striped", "standard", "incarnate", "ordinary", "aria",
+    "male", "shield", "average", "50", "baile", "midday", "solo", "red-meteor", "disguised", "amped",
+    "ice", "full-belly", "single-strike", "family-of-four", "green-plumage", "zero", "curly", "two-segment",
+})
+_RANGE = re.compile(r"^\s*(\d+)\s*(?:-\s*(\d+)\s*)?$")
+
+
+class AliasTable:
+    """Weighted sampler over `values`: draw() is O(1) after O(n) setup."""
+
+    __slots__ = ("values", "alias", "keep")
+
+    def __init__(self, values, weights):
+        n = len(values)
+        total = float(sum(weights))
+        scaled = [w * n / total for w in weights]
+        self.values = array("H", values)
+        self.alias = array("H", values)   # what slot i gives when its coin flip fails
+        self.keep = array("d", [1.0] * n)
+        small = [i for i, w in enumerate(scaled) if w < 1.0]
+        large = [i for i, w in enumerate(scaled) if w >= 1.0]
+        while small and large:
+            s, g = small.pop(), large[-1]
+            self.keep[s] = scaled[s]
+            self.alias[s] = values[g]
+            scaled[g] -= 1.0 - scaled[s]
+            if scaled[g] < 1.0:
+                small.append(large.pop())
+        # Whatever is left is 1 up to rounding, and keeps its slot (keep stays 1.0)
+
+    def __len__(self):
+        return len(self.values)
+
+    def draw(self, rng=random):
+        i = rng.randrange(len(self.values))
+        return self.values[i] if rng.random() < self.keep[i] else self.alias[i]
+
+
+def load_difficulty(path=DIFFICULTY_FILE):
+    """{Pokédex number: (expected guesses, worst case, tier)}, or {} before the first run."""
+    try:
+        table = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    return {dex: (expected, worst, tier) for dex, expected, worst, _, tier in table["rows"]}
+
+
+def parse_generations(text, highest):
+    """(first, last) from "3" or "1-3", within 1..highest; empty means every generation."""
+    if not text:
+        return 1, highest
+    match = _RANGE.match(text)
+    if not match:
+        raise ValueError(f"Generation should look like `3` or `1-3`, not `{text}`.")
+    first = int(match[1])
+    last = int(match[2] or first)
+    if not 1 <= first <= last <= highest:
+        raise ValueError(f"Generations go from 1 to {highest}.")
+    return first, last
+
+
+def form_weights(entries, form_weight=FORM_WEIGHT):
+    """Weight per entry: form_weight for names ending in one of FORM_SUFFIXES, else 1."""
+    return [form_weight if "-" in p["name"] and p["name"].split("-", 1)[1] in FORM_SUFFIXES else 1.0
+            for p in entries]
+
+
+class SecretPicker:
+    """Filtered, weighted secret draws over one Pokédex snapshot."""
+
+    def __init__(self, columns, weights, difficulty=None, cache_size=256):
+        self.dex = columns.pokedex.astype(np.intp)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.highest = int(columns.generation.max())
+        self._generations = {g: columns.generation == g for g in range(1, self.highest + 1)}
+        self._types = {bit: (columns.type_mask & bit) != 0 for bit in TYPE_BITS.values()}
+        self._tiers = None
+        if difficulty:
+            tier_of = [difficulty.get(int(dex), (None, None, None))[2] for dex in self.dex]
+            self._tiers = {tier: np.array([t == tier for t in tier_of]) for tier in TIERS}
+        self.pool = lru_cache(maxsize=cache_size)(self._pool)
+        self.pool(1, self.highest, 0, None)
+
+    def _pool(self, first, last, type_mask, tier):
+        """AliasTable of Pokédex numbers matching a filter, or None when nothing does."""
+        rows = np.zeros(len(self.dex), dtype=bool)
+        for g in range(first, last + 1):
+            rows |= self._generations[g]
+        for bit, has_type in self._types.items():
+            if type_mask & bit:
+                rows &= has_type
+        if tier is not None:
+            rows &= self._tiers[tier]
+        rows = np.flatnonzero(rows)
+        if not len(rows):
+            return None
+        return AliasTable(self.dex[rows].tolist(), self.weights[rows].tolist())
+
+    def pick(self, generations=None, type_mask=0, tier=None, rng=random):
+        """Pokédex number of a secret matching the filters, or None when no Pokémon does.
+
+        `generations` is a (first, last) pair (see parse_generations).
+        Raises ValueError for a difficulty tier when there's no table.
+        """
+        if tier is not None and self._tiers is None:
+            raise ValueError("Difficulty isn't available yet: run `python -m src.difficulty` first.")
+        first, last = generations or (1, self.highest)
+        table = self.pool(first, last, type_mask, tier)
+        return None if table is None else table.draw(rng)
@@ -0,0 +1,191 @@
+"""Personal game sessions with bounded memory.
+
+A PersonalGame keeps only Pokédex numbers: the secret as an int and the
+guesses packed as uint16s into one bytes object, next to each guess's
+feedback code, so a session holds no references into the dataset and
+stays valid across hot reloads.  Hints are rebuilt from the codes on
+demand.  The candidate bitset is replayed from the codes the first time
+/hint or /solve asks for it, then kept and narrowed by each guess, as
+the daily game does; games that never ask don't pay for one.
+
+SessionManager evicts finished games and games idle for longer than
+`ttl`, and drops the least recently used game once `max_sessions` is
+reached.  Started and guessed-in games are passed to `on_save` and
+evicted ones to `on_evict` (the bot saves and deletes them in the store).
+When several processes share the players, storage.SQLiteSessionManager
+takes its place.
+"""
+import time
+from array import array
+from collections import OrderedDict
+
+from .feedback import SOLVED
+from .game_logic import get_game_data
+
+MAX_TRIES = 9
+SESSION_TTL = 24 * 60 * 60   # seconds a personal game may sit idle
+MAX_SESSIONS = 200_000
+
+
+class PersonalGame:
+    __slots__ = ("secret_dex", "guess_dex", "codes", "finished", "last_active", "_candidates")
+
+    max_tries = MAX_TRIES
+
+    def __init__(self, secret_dex, guess_dex=(), codes=(), finished=False, last_active=0.0):
+        self.secret_dex = secret_dex
+        self.guess_dex = array("H", guess_dex).tobytes()
+        self.codes = array("H", codes).tobytes()  # feedback code of each guess
+        self.finished = finished
+        self.last_active = last_active
+        self._candidates = None  # bitset, once something has asked for it
+
+    @property
+    def guess_numbers(self):
+        """The guessed Pokédex numbers, as a read-only uint16 view."""
+        return memoryview(self.guess_dex).cast("H")
+
+    @property
+    def guess_codes(self):
+        return memoryview(self.codes).cast("H")
+
+    @property
+    def attempts(self):
+        return len(self.guess_dex) // 2
+
+    @property
+    def remaining(self):
+        return self.max_tries - self.attempts
+
+    def add_guess(self, dex, code):
+        self.guess_dex += array("H", (dex,)).tobytes()
+        self.codes += array("H", (code,)).tobytes()
+        if self._candidates is not None:
+            self._candidates = get_game_data().candidates.narrow_code(self._candidates, dex, code)
+
+    @property
+    def secret(self):
+        """The secret's entry, or None once a Pokédex reload has dropped it."""
+        return get_game_data().index.by_number(self.secret_dex)
+
+    @property
+    def guesses(self):
+        """Guessed Pokémon as entries, skipping any the dataset no longer has."""
+        by_number = get_game_data().index.by_number
+        found = (by_number(dex) for dex in self.guess_numbers)
+        return [p for p in found if p is not None]
+
+    @property
+    def last_guess(self):
+        """(Pokémon, feedback code) of the latest guess, or None (also when the dataset lost it)."""
+        if not self.guess_dex:
+            return None
+        pokemon = get_game_data().index.by_number(self.guess_numbers[-1])
+        return pokemon and (pokemon, self.guess_codes[-1])
+
+    @property
+    def candidates(self):
+        """Bitset of Pokémon still consistent with this game's hints."""
+        if self._candidates is None:
+            self._candidates = get_game_data().candidates.from_codes(zip(self.guess_numbers, self.guess_codes))
+        return self._candidates
+
+
+class SessionManager:
+    """Personal games by user ID, in least- to most-recently-used order."""
+
+    def __init__(self, ttl=SESSION_TTL, max_sessions=MAX_SESSIONS, on_save=None, on_evict=None,
+                 clock=time.monotonic):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.on_save = on_save
+        self.on_evict = on_evict
+        self.clock = clock
+        self._games = OrderedDict()
+        self._finished = set()
+
+    def __len__(self):
+        return len(self._games)
+
+    def __contains__(self, user_id):
+        return user_id in self._games
+
+    def get(self, user_id):
+        """Return the user's unfinished game, marking it as used, or None."""
+        game = self._games.get(user_id)
+        if game is None or game.finished:
+            return None
+        game.last_active = self.clock()
+        self._games.move_to_end(user_id)
+        return game
+
+    def start(self, user_id, secret_dex):
+        self.end(user_id)
+        game = self._games[user_id] = PersonalGame(secret_dex, last_active=self.clock())
+        while len(self._games) > self.max_sessions:
+            self._evict(next(iter(self._games)))
+        if self.on_save is not None:
+            self.on_save(user_id, game)
+        return game
+
+    def add_guess(self, user_id, game, dex, code):
+        """Record a guess in `game`, finishing it when solved or out of tries.
+
+        Returns the updated game, or None if `game` is no longer the user's
+        unfinished game.
+        """
+        if self._games.get(user_id) is not game or game.finished:
+            return None
+        game.add_guess(dex, code)
+        if code == SOLVED or game.remaining <= 0:
+            self.finish(user_id)
+        if self.on_save is not None:
+            self.on_save(user_id, game)
+        return game
+
+    def finish(self, user_id):
+        """Mark a game over; the next sweep evicts it."""
+        self._games[user_id].finished = True
+        self._finished.add(user_id)
+
+    def end(self, user_id):
+        """Forget a game without calling on_evict (the caller handles storage)."""
+        self._finished.discard(user_id)
+        return self._games.pop(user_id, None)
+
+    def remove(self, user_id):
+        """End a game and delete it from storage (/quit)."""
+        self._evict(user_id)
+
+    async def write(self, method, *args):
+        """Call one of the changing methods; in memory, so right here (see SQLiteSessionManager.write)."""
+        return method(*args)
+
+    def restore(self, games):
+        """Add games loaded from storage; restored games count as just used."""
+        now = self.clock()
+        for user_id, game in games.items():
+            game.last_active = now
+            self._games[user_id] = game
+            if game.finished:
+                self._finished.add(user_id)
+
+    def _evict(self, user_id):
+        game = self.end(user_id)
+        if game is not None and self.on_evict is not None:
+            self.on_evict(user_id)
+
+    def sweep(self):
+        """Evict finished games and games idle past the TTL; return how many went."""
+        evicted = len(self._finished)
+        for user_id in list(self._finished):
+            self._evict(user_id)
+        # Oldest first, so stop at the first game that is still fresh
+        cutoff = self.clock() - self.ttl
+        while self._games:
+            user_id, game = next(iter(self._games.items()))
+            if game.last_active > cutoff:
+                break
+            self._evict(user_id)
+            evicted += 1
+        return evicted
@@ -0,0 +1,107 @@
+"""Run the bot as several processes, each owning a range of shards.
+
+Discord sends each guild's events to shard (guild_id >> 22) % shard_count,
+and DMs to shard 0.  A guild's daily game, leaderboard and history are
+therefore only ever touched by the process running its shard, and stay
+in that process's memory like they do with one process.  The workers
+share one SQLite file (SQUIRDLE_DB): the write-behind store persists
+each guild from its owner, and personal games, which a player can reach
+from any guild, are read and written straight through it (see
+storage.SQLiteSessionManager).
+
+    python -m src.shards --workers 4 --shards 16
+
+starts 4 `python -m src.bot` processes with shards 0-3, 4-7, 8-11 and
+12-15.  Each serves its own /, /ready and /metrics, worker i on PORT + i
+(PORT defaults to 8080), so every worker's shards get checked and
+scraped.  A single process can also shard on its own by setting
+SQUIRDLE_SHARD_COUNT (a number, or "auto" to let Discord choose).
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+from .storage import DB_FILE, SQLiteGameStore
+
+
+def parse_shard_ids(text):
+    """Parse "0-3,8" into [0, 1, 2, 3, 8]; an empty string means all shards (None)."""
+    ids = []
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        first, _, last = part.partition("-")
+        ids.extend(range(int(first), int(last or first) + 1))
+    return ids or None
+
+
+def shard_config(environ=os.environ):
+    """(shard_count, shard_ids) for this process.
+
+    shard_count is None without sharding, or "auto".  shard_ids is None
+    when this process runs every shard, and always is with "auto";
+    asking for both raises ValueError.
+    """
+    count = environ.get("SQUIRDLE_SHARD_COUNT", "").strip()
+    if not count:
+        return None, None
+    ids = parse_shard_ids(environ.get("SQUIRDLE_SHARD_IDS", ""))
+    if count == "auto" and ids is not None:
+        # Which process owns a guild depends on the count, which "auto" only learns after connecting
+        raise ValueError("SQUIRDLE_SHARD_IDS needs a numeric SQUIRDLE_SHARD_COUNT, not \"auto\"")
+    return ("auto" if count == "auto" else int(count)), ids
+
+
+def shard_of(guild_id, shard_count):
+    """The shard Discord routes a guild to (DMs, guild_id None, go to shard 0)."""
+    return (guild_id >> 22) % shard_count if guild_id else 0
+
+
+def shard_ranges(shard_count, workers):
+    """Split shards 0..shard_count-1 into `workers` contiguous ranges."""
+    size, extra = divmod(shard_count, workers)
+    ranges, start = [], 0
+    for worker in range(workers):
+        end = start + size + (worker < extra)
+        ranges.append(range(start, end))
+        start = end
+    return ranges
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Squirdle as several sharded worker processes.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shards", type=int, help="total shards (default: one per worker)")
+    args = parser.parse_args()
+    shard_count = args.shards or args.workers
+    if not 1 <= args.workers <= shard_count:
+        parser.error("need at least one shard per worker")
+
+    # Create or migrate the schema once, before the workers race for it
+    db = os.getenv("SQUIRDLE_DB", str(DB_FILE))
+    if not db:
+        parser.error("workers share state through SQUIRDLE_DB; it can't be empty")
+    SQLiteGameStore(db)
+
+    port = int(os.getenv("PORT", 8080))
+    workers = []
+    for worker, shards in enumerate(shard_ranges(shard_count, args.workers)):
+        env = dict(
+            os.environ,
+            SQUIRDLE_DB=db,
+            SQUIRDLE_SHARD_COUNT=str(shard_count),
+            SQUIRDLE_SHARD_IDS=f"{shards.start}-{shards.stop - 1}",
+            PORT=str(port + worker),  # one port each, as only one process can bind it
+        )
+        print(f"🚀 Worker {worker}: shards {shards.start}-{shards.stop - 1} of {shard_count}, port {port + worker}")
+        workers.append(subprocess.Popen([sys.executable, "-m", "src.bot"], env=env))
+    try:
+        for process in workers:
+            process.wait()
+    finally:
+        for process in workers:
+            if process.poll() is None:
+                process.terminate()
+
+
+if __name__ == "__main__":
+    main()
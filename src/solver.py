@@ -0,0 +1,79 @@
+import numpy as np
+
+from .feedback import NUM_CODES, SOLVED
+
+
+class Solver:
+    """Recommends the guess that splits the remaining candidates best.
+
+    Every candidate guess is scored by slicing its row of the feedback
+    matrix down to the remaining secrets and histogramming the codes, all
+    guesses at once.  "entropy" maximizes the expected information of the
+    split, "minimax" minimizes the largest group left over.
+    """
+
+    METHODS = ("entropy", "minimax")
+
+    def __init__(self, entries, matrix):
+        self.entries = entries
+        self.matrix = matrix
+        self._openings = {}  # method -> ranking with every Pokémon still possible
+
+    def histograms(self, secret_rows, guess_rows=None):
+        """Return a (guesses x NUM_CODES) count of codes over secret_rows."""
+        if guess_rows is None:
+            block = self.matrix[:, secret_rows]
+        else:
+            block = self.matrix[np.ix_(guess_rows, secret_rows)]
+        g = block.shape[0]
+        flat = block.astype(np.int64) + (np.arange(g, dtype=np.int64) * NUM_CODES)[:, None]
+        return np.bincount(flat.ravel(), minlength=g * NUM_CODES).reshape(g, NUM_CODES)
+
+    def rank(self, secret_rows, method="entropy", guess_rows=None, top=3):
+        """Return the best `top` guesses as (row, expected remaining, worst case).
+
+        Empty when no secret is left to tell apart (inconsistent hints, or a
+        reload that dropped every candidate).
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"unknown method {method!r}, expected one of {self.METHODS}")
+        secret_rows = np.asarray(secret_rows)
+        if not len(secret_rows):
+            return []
+        opening = guess_rows is None and len(secret_rows) == len(self.entries)
+        if opening and len(self._openings.get(method, ())) >= top:
+            return self._openings[method][:top]
+        if guess_rows is None:
+            guess_rows = np.arange(len(self.entries))
+        guess_rows = np.asarray(guess_rows)
+        k = len(secret_rows)
+
+        hist = self.histograms(secret_rows, guess_rows)
+        # A guess that might be the answer leaves 0 candidates in that branch
+        solved = hist[:, SOLVED]
+        expected = ((hist * hist).sum(axis=1) - solved) / k
+        worst = hist.max(axis=1)
+
+        if method == "entropy":
+            p = hist / k
+            with np.errstate(divide="ignore", invalid="ignore"):
+                score = np.where(p > 0, p * np.log2(p), 0.0).sum(axis=1)
+            # Lower is better; prefer guesses that could win outright on ties
+            order = np.lexsort((guess_rows, -solved, score))
+        else:
+            order = np.lexsort((guess_rows, -solved, expected, worst))
+
+        ranking = [
+            (int(guess_rows[i]), float(expected[i]), int(worst[i]))
+            for i in order[:top]
+        ]
+        if opening:
+            self._openings[method] = ranking
+        return ranking
+
+    def best_guess(self, secret_rows, method="entropy"):
+        """Return the recommended Pokémon for a set of remaining secret rows, or None if it's empty."""
+        if len(secret_rows) == 1:
+            return self.entries[int(secret_rows[0])]
+        ranking = self.rank(secret_rows, method=method, top=1)
+        return self.entries[ranking[0][0]] if ranking else None
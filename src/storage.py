@@ -0,0 +1,564 @@
+"""Persistence for personal games and each guild's daily state.
+
+The bot talks to a GameStore.  Every save_* call only records the latest
+state of one row in memory; a background task (run) flushes whatever
+has piled up in one SQLite transaction, in a worker thread, so the
+event loop never waits on disk.  Repeated writes to the same row between
+flushes collapse into one.
+
+Pokémon are stored by Pokédex number; daily guesses are resolved again
+on load.  Announcements not yet posted wait in an outbox table (see
+broadcast.py).
+
+Several bot processes may share one database file.  Guild rows are only
+ever written by the process whose shards own the guild, but a player's
+personal game can be reached from any of them, so those processes use
+SQLiteSessionManager, which reads and writes personal games straight
+through instead of caching them, its writes in a worker thread too.
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from .feedback import SOLVED, feedback_code
+from .game_logic import get_game_data
+from .history import History, Rollup, UserStats
+from .leaderboard import Leaderboard
+from .sessions import MAX_TRIES, SESSION_TTL, PersonalGame
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+DB_FILE = DATA_DIR / "squirdle.db"
+
+FLUSH_INTERVAL = 1.0   # seconds between write-behind flushes
+FLUSH_BATCH = 5000     # flush early once this many rows are pending
+SESSION_BUSY_TIMEOUT = 1.0  # seconds a shared personal-game write waits for another process
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS personal_games (
+    user_id    INTEGER PRIMARY KEY,
+    secret     INTEGER NOT NULL,
+    attempts   INTEGER NOT NULL,
+    max_tries  INTEGER NOT NULL,
+    finished   INTEGER NOT NULL,
+    guesses    TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS guild_settings (
+    guild_id INTEGER PRIMARY KEY,
+    timezone TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS announce_channels (
+    guild_id   INTEGER PRIMARY KEY,
+    channel_id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS broadcast_outbox (
+    guild_id   INTEGER NOT NULL,
+    key        TEXT NOT NULL,
+    channel_id INTEGER NOT NULL,
+    payload    TEXT NOT NULL,
+    PRIMARY KEY (guild_id, key)
+);
+CREATE TABLE IF NOT EXISTS daily_games (
+    guild_id INTEGER NOT NULL,
+    date     TEXT NOT NULL,
+    secret   INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, date)
+);
+CREATE TABLE IF NOT EXISTS daily_attempts (
+    guild_id INTEGER NOT NULL,
+    date     TEXT NOT NULL,
+    user_id  INTEGER NOT NULL,
+    guesses  TEXT NOT NULL,
+    PRIMARY KEY (guild_id, date, user_id)
+);
+CREATE TABLE IF NOT EXISTS daily_completions (
+    guild_id        INTEGER NOT NULL,
+    date            TEXT NOT NULL,
+    user_id         INTEGER NOT NULL,
+    username        TEXT NOT NULL,
+    attempts        INTEGER NOT NULL,
+    completion_time TEXT NOT NULL,
+    PRIMARY KEY (guild_id, date, user_id)
+);
+CREATE TABLE IF NOT EXISTS history_days (
+    guild_id INTEGER NOT NULL,
+    date     TEXT NOT NULL,
+    players  INTEGER NOT NULL,
+    solvers  INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, date)
+);
+CREATE TABLE IF NOT EXISTS user_stats (
+    guild_id     INTEGER NOT NULL,
+    user_id      INTEGER NOT NULL,
+    username     TEXT,
+    played       INTEGER NOT NULL,
+    wins         INTEGER NOT NULL,
+    distribution TEXT NOT NULL,
+    streak       INTEGER NOT NULL,
+    best_streak  INTEGER NOT NULL,
+    last_played  TEXT,
+    last_win     TEXT,
+    PRIMARY KEY (guild_id, user_id)
+);
+CREATE TABLE IF NOT EXISTS weekly_stats (
+    guild_id INTEGER NOT NULL,
+    week     TEXT NOT NULL,
+    user_id  INTEGER NOT NULL,
+    wins     INTEGER NOT NULL,
+    tries    INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, week, user_id)
+);
+"""
+
+# Tables that were global before daily state was split per guild; rows
+# from then belong to GLOBAL_GUILD
+GUILD_TABLES = ("daily_games", "daily_attempts", "daily_completions", "history_days", "user_stats", "weekly_stats")
+GLOBAL_GUILD = 0
+
+
+def _dex_list(pokemon):
+    return json.dumps([p["pokedex"] for p in pokemon])
+
+
+def _resolve(dex_json, by_number):
+    found = (by_number(dex) for dex in json.loads(dex_json))
+    return [p for p in found if p is not None]
+
+
+def _personal_game(secret, finished, guesses, by_number):
+    """PersonalGame from a personal_games row, or None if its secret left the dataset."""
+    secret_pokemon = by_number(secret)
+    if secret_pokemon is None:
+        return None
+    guessed = _resolve(guesses, by_number)
+    return PersonalGame(
+        secret,
+        [p["pokedex"] for p in guessed],
+        [feedback_code(p, secret_pokemon) for p in guessed],
+        bool(finished),
+    )
+
+
+class GameStore:
+    """No-op store: state lives in memory only.  Also the interface."""
+
+    persistent = False   # whether state dropped from memory can be loaded back
+
+    def load_personal(self, by_number):
+        """Return {user_id: PersonalGame}, least recently played first."""
+        return {}
+
+    def load_timezone(self, guild_id):
+        return None
+
+    def load_channel(self, guild_id):
+        return None
+
+    def load_announcing(self):
+        """Return {guild_id: timezone or None} for guilds with an announcement channel."""
+        return {}
+
+    def load_outbox(self):
+        """Return [(guild_id, key, channel_id, payload)] for messages not yet sent."""
+        return []
+
+    def load_daily(self, guild_id, by_number):
+        """Return the guild's latest daily_game as the bot keeps it, or None."""
+        return None
+
+    def load_history(self, guild_id):
+        return History()
+
+    def save_personal(self, user_id, game):
+        pass
+
+    def delete_personal(self, user_id):
+        pass
+
+    def save_timezone(self, guild_id, timezone):
+        pass
+
+    def save_channel(self, guild_id, channel_id):
+        """Set the guild's announcement channel; None turns announcements off."""
+        pass
+
+    def save_outbox(self, guild_id, key, channel_id, payload):
+        pass
+
+    def delete_outbox(self, guild_id, key):
+        pass
+
+    def save_daily(self, daily_game):
+        pass
+
+    def save_daily_attempts(self, daily_game, user_id, guesses):
+        pass
+
+    def save_completion(self, daily_game, entry):
+        pass
+
+    def save_history(self, history, daily_game, user_ids):
+        """Save the rollups touched by archiving daily_game."""
+        pass
+
+    async def run(self):
+        """Background write-behind loop; returns immediately when there is nothing to persist."""
+
+    def flush(self):
+        pass
+
+
+class SQLiteGameStore(GameStore):
+    """GameStore backed by one SQLite file in WAL mode."""
+
+    persistent = True
+
+    def __init__(self, path=DB_FILE, flush_interval=FLUSH_INTERVAL, flush_batch=FLUSH_BATCH):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self._pending = {}  # row key -> (sql, params); the latest write wins
+        self._wakeup = asyncio.Event()
+        self._write_lock = threading.Lock()  # the flush loop's thread vs flush()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        # Separate connection for reads: under WAL they never wait on the flusher
+        self._reader = sqlite3.connect(self.path, check_same_thread=False)
+
+    def _migrate(self):
+        """Create the schema, moving rows of pre-guild tables under GLOBAL_GUILD."""
+        for table in GUILD_TABLES:
+            columns = [row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")]
+            if columns and "guild_id" not in columns:
+                self._conn.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+        self._conn.executescript(SCHEMA)
+        # Also picks up a copy that was interrupted last time
+        old = [
+            table for table in GUILD_TABLES
+            if self._conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (f"{table}_old",)).fetchone()
+        ]
+        if not old:
+            return
+        self._conn.execute("BEGIN")
+        for table in old:
+            self._conn.execute(f"INSERT OR IGNORE INTO {table} SELECT ?, * FROM {table}_old", (GLOBAL_GUILD,))
+            self._conn.execute(f"DROP TABLE {table}_old")
+        self._conn.execute("COMMIT")
+        print(f"💾 Moved {', '.join(old)} under guild {GLOBAL_GUILD}")
+
+    # ---------- reads ----------
+    def load_personal(self, by_number):
+        active_games = {}
+        for user_id, secret, finished, guesses in self._reader.execute(
+            "SELECT user_id, secret, finished, guesses FROM personal_games ORDER BY updated_at"
+        ):
+            game = _personal_game(secret, finished, guesses, by_number)
+            if game is not None:
+                active_games[user_id] = game
+        return active_games
+
+    def load_timezone(self, guild_id):
+        row = self._reader.execute("SELECT timezone FROM guild_settings WHERE guild_id = ?", (guild_id,)).fetchone()
+        return row[0] if row else None
+
+    def load_channel(self, guild_id):
+        row = self._reader.execute("SELECT channel_id FROM announce_channels WHERE guild_id = ?", (guild_id,)).fetchone()
+        return row[0] if row else None
+
+    def load_announcing(self):
+        return dict(self._reader.execute(
+            "SELECT guild_id, timezone FROM announce_channels LEFT JOIN guild_settings USING (guild_id)"
+        ))
+
+    def load_outbox(self):
+        return [
+            (guild_id, key, channel_id, json.loads(payload))
+            for guild_id, key, channel_id, payload in self._reader.execute(
+                "SELECT guild_id, key, channel_id, payload FROM broadcast_outbox"
+            )
+        ]
+
+    def load_daily(self, guild_id, by_number):
+        row = self._reader.execute(
+            "SELECT date, secret FROM daily_games WHERE guild_id = ? ORDER BY date DESC LIMIT 1", (guild_id,)
+        ).fetchone()
+        if row is None or by_number(row[1]) is None:
+            return None
+        date, secret = row
+        daily_game = {
+            "guild_id": guild_id,
+            "pokemon": by_number(secret),
+            "date": date,
+            "attempts": {
+                user_id: _resolve(guesses, by_number)
+                for user_id, guesses in self._reader.execute(
+                    "SELECT user_id, guesses FROM daily_attempts WHERE guild_id = ? AND date = ?", (guild_id, date)
+                )
+            },
+            "completions": {},
+            "leaderboard": Leaderboard(),
+        }
+        for user_id, username, attempts, completion_time in self._reader.execute(
+            "SELECT user_id, username, attempts, completion_time FROM daily_completions "
+            "WHERE guild_id = ? AND date = ?", (guild_id, date)
+        ):
+            completion_time = datetime.fromisoformat(completion_time)
+            daily_game["completions"][user_id] = completion_time
+            daily_game["leaderboard"].add({
+                "user_id": user_id,
+                "username": username,
+                "attempts": attempts,
+                "completion_time": completion_time,
+            })
+        return daily_game
+
+    def load_history(self, guild_id):
+        users = {
+            user_id: UserStats(username, played, wins, json.loads(distribution), streak, best_streak,
+                               last_played, last_win)
+            for user_id, username, played, wins, distribution, streak, best_streak, last_played, last_win
+            in self._reader.execute(
+                "SELECT user_id, username, played, wins, distribution, streak, best_streak, last_played, last_win "
+                "FROM user_stats WHERE guild_id = ?", (guild_id,)
+            )
+        }
+        row = self._reader.execute("SELECT MAX(date) FROM history_days WHERE guild_id = ?", (guild_id,)).fetchone()
+        last_day = row[0] if row else None
+        week = Rollup()
+        row = self._reader.execute("SELECT MAX(week) FROM weekly_stats WHERE guild_id = ?", (guild_id,)).fetchone()
+        if row and row[0]:
+            week.key = row[0]
+            for user_id, wins, tries in self._reader.execute(
+                "SELECT user_id, wins, tries FROM weekly_stats WHERE guild_id = ? AND week = ?", (guild_id, week.key)
+            ):
+                week.totals[user_id] = [wins, tries]
+        return History(users, week, last_day)
+
+    # ---------- writes (queued) ----------
+    def _queue(self, key, sql, params):
+        self._pending[key] = (sql, params)
+        if len(self._pending) >= self.flush_batch:
+            self._wakeup.set()
+
+    def save_personal(self, user_id, game):
+        self._queue(
+            ("personal", user_id),
+            "INSERT OR REPLACE INTO personal_games VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (user_id, game.secret_dex, game.attempts, game.max_tries,
+             int(game.finished), json.dumps(game.guess_numbers.tolist()), time.time()),
+        )
+
+    def delete_personal(self, user_id):
+        self._queue(("personal", user_id), "DELETE FROM personal_games WHERE user_id = ?", (user_id,))
+
+    def save_timezone(self, guild_id, timezone):
+        self._queue(("timezone", guild_id), "INSERT OR REPLACE INTO guild_settings VALUES (?, ?)", (guild_id, timezone))
+
+    def save_channel(self, guild_id, channel_id):
+        if channel_id is None:
+            self._queue(("channel", guild_id), "DELETE FROM announce_channels WHERE guild_id = ?", (guild_id,))
+        else:
+            self._queue(("channel", guild_id), "INSERT OR REPLACE INTO announce_channels VALUES (?, ?)",
+                        (guild_id, channel_id))
+
+    def save_outbox(self, guild_id, key, channel_id, payload):
+        self._queue(("outbox", guild_id, key), "INSERT OR REPLACE INTO broadcast_outbox VALUES (?, ?, ?, ?)",
+                    (guild_id, key, channel_id, json.dumps(payload)))
+
+    def delete_outbox(self, guild_id, key):
+        self._queue(("outbox", guild_id, key), "DELETE FROM broadcast_outbox WHERE guild_id = ? AND key = ?",
+                    (guild_id, key))
+
+    def save_daily(self, daily_game):
+        guild_id, date = daily_game["guild_id"], daily_game["date"]
+        self._queue(
+            ("daily", guild_id, date),
+            "INSERT OR REPLACE INTO daily_games VALUES (?, ?, ?)",
+            (guild_id, date, daily_game["pokemon"]["pokedex"]),
+        )
+
+    def save_daily_attempts(self, daily_game, user_id, guesses):
+        guild_id, date = daily_game["guild_id"], daily_game["date"]
+        self._queue(
+            ("attempts", guild_id, date, user_id),
+            "INSERT OR REPLACE INTO daily_attempts VALUES (?, ?, ?, ?)",
+            (guild_id, date, user_id, _dex_list(guesses)),
+        )
+
+    def save_completion(self, daily_game, entry):
+        guild_id, date = daily_game["guild_id"], daily_game["date"]
+        self._queue(
+            ("completion", guild_id, date, entry["user_id"]),
+            "INSERT OR REPLACE INTO daily_completions VALUES (?, ?, ?, ?, ?, ?)",
+            (guild_id, date, entry["user_id"], entry["username"], entry["attempts"],
+             entry["completion_time"].isoformat()),
+        )
+
+    def save_history(self, history, daily_game, user_ids):
+        guild_id, date = daily_game["guild_id"], daily_game["date"]
+        self._queue(
+            ("history", guild_id, date),
+            "INSERT OR REPLACE INTO history_days VALUES (?, ?, ?, ?)",
+            (guild_id, date, len(user_ids), sum(1 for u in user_ids if history.users[u].last_win == date)),
+        )
+        week = history.week
+        for user_id in user_ids:
+            stats = history.users[user_id]
+            self._queue(
+                ("user_stats", guild_id, user_id),
+                "INSERT OR REPLACE INTO user_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (guild_id, user_id, stats.username, stats.played, stats.wins, json.dumps(stats.distribution),
+                 stats.streak, stats.best_streak, stats.last_played, stats.last_win),
+            )
+            if user_id in week.totals:
+                self._queue(
+                    ("weekly", guild_id, week.key, user_id),
+                    "INSERT OR REPLACE INTO weekly_stats VALUES (?, ?, ?, ?, ?)",
+                    (guild_id, week.key, user_id, *week.totals[user_id]),
+                )
+
+    def _take_batch(self):
+        batch, self._pending = self._pending, {}
+        return list(batch.items())
+
+    def _write(self, batch):
+        if not batch:
+            return
+        with self._write_lock:
+            # IMMEDIATE takes the write lock up front, waiting out other processes' flushes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for _, (sql, params) in batch:
+                    self._conn.execute(sql, params)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    async def run(self):
+        """Flush pending writes every flush_interval, or sooner when many pile up."""
+        while True:
+            # asyncio.wait rather than wait_for: on 3.11 wait_for can swallow
+            # a cancel that races with the event being set
+            waiter = asyncio.ensure_future(self._wakeup.wait())
+            try:
+                await asyncio.wait({waiter}, timeout=self.flush_interval)
+            finally:
+                waiter.cancel()
+            self._wakeup.clear()
+            batch = self._take_batch()
+            write = asyncio.ensure_future(asyncio.to_thread(self._write, batch))
+            try:
+                await asyncio.shield(write)
+            except asyncio.CancelledError:
+                # Let a batch already handed to the thread land before we stop,
+                # so a later flush() can't be overtaken by older data
+                await write
+                raise
+            except sqlite3.Error as e:
+                print(f"⚠️ Saving game state failed, will retry: {e}")
+                # Put the batch back unless newer writes replaced those rows
+                for key, op in batch:
+                    self._pending.setdefault(key, op)
+
+    def flush(self):
+        """Write everything pending right now (used on shutdown)."""
+        self._write(self._take_batch())
+
+
+class SQLiteSessionManager:
+    """Personal games kept in the store's database rather than in memory.
+
+    For running as several processes: a player's commands arrive at
+    whichever process owns the guild they're typed in, so no process may
+    keep a copy.  get() reads the row each time, and every change is a
+    single statement, so guesses sent from different processes at once
+    each land exactly once.  Same interface as SessionManager.
+
+    Reads use their own connection: under WAL they never wait for a
+    writer.  Changes can wait for another process's write lock, so the
+    bot runs them through write(), in a worker thread, and a lock held
+    past SESSION_BUSY_TIMEOUT surfaces as sqlite3.OperationalError
+    instead of stalling every command behind it.
+    """
+
+    def __init__(self, store, ttl=SESSION_TTL, clock=time.time, busy_timeout=SESSION_BUSY_TIMEOUT):
+        self.ttl = ttl
+        self.clock = clock
+        self._reader = sqlite3.connect(store.path, check_same_thread=False, isolation_level=None)
+        self._writer = sqlite3.connect(store.path, timeout=busy_timeout, check_same_thread=False,
+                                       isolation_level=None)
+        self._writer.execute("PRAGMA synchronous=NORMAL")  # as the store: WAL, no fsync per guess
+        self._lock = threading.Lock()  # one statement at a time on the writer connection
+
+    def __len__(self):
+        return self._reader.execute("SELECT COUNT(*) FROM personal_games").fetchone()[0]
+
+    def __contains__(self, user_id):
+        return self._reader.execute(
+            "SELECT 1 FROM personal_games WHERE user_id = ?", (user_id,)
+        ).fetchone() is not None
+
+    def _execute(self, sql, params):
+        """Run one change on the writer connection: (first returned row, rows changed)."""
+        with self._lock:
+            cursor = self._writer.execute(sql, params)
+            return cursor.fetchone(), cursor.rowcount
+
+    async def write(self, method, *args):
+        """Call one of the changing methods (start, add_guess, ...) in a worker thread."""
+        return await asyncio.to_thread(method, *args)
+
+    def _game(self, row):
+        return row and _personal_game(*row, get_game_data().index.by_number)
+
+    def get(self, user_id):
+        """Return the user's unfinished game as stored right now, or None."""
+        game = self._game(self._reader.execute(
+            "SELECT secret, finished, guesses FROM personal_games WHERE user_id = ?", (user_id,)
+        ).fetchone())
+        return game if game and not game.finished else None
+
+    def start(self, user_id, secret_dex):
+        self._execute(
+            "INSERT OR REPLACE INTO personal_games VALUES (?, ?, 0, ?, 0, '[]', ?)",
+            (user_id, secret_dex, MAX_TRIES, self.clock()),
+        )
+        return PersonalGame(secret_dex)
+
+    def add_guess(self, user_id, game, dex, code):
+        """Append a guess to the stored game `game` was read from; see SessionManager.add_guess."""
+        # The SET expressions see the row as it was before this update
+        return self._game(self._execute(
+            "UPDATE personal_games SET guesses = json_insert(guesses, '$[#]', ?), attempts = attempts + 1, "
+            "finished = (? OR attempts + 1 >= max_tries), updated_at = ? "
+            "WHERE user_id = ? AND secret = ? AND finished = 0 "
+            "RETURNING secret, finished, guesses",
+            (dex, code == SOLVED, self.clock(), user_id, game.secret_dex),
+        )[0])
+
+    def finish(self, user_id):
+        self._execute("UPDATE personal_games SET finished = 1 WHERE user_id = ?", (user_id,))
+
+    def end(self, user_id):
+        return self._game(self._execute(
+            "DELETE FROM personal_games WHERE user_id = ? RETURNING secret, finished, guesses", (user_id,)
+        )[0])
+
+    def remove(self, user_id):
+        self.end(user_id)
+
+    def restore(self, games):
+        """Nothing to do: games are read from the database as they're used."""
+
+    def sweep(self):
+        """Delete finished games and games idle past the TTL; return how many went."""
+        return self._execute(
+            "DELETE FROM personal_games WHERE finished = 1 OR updated_at < ?", (self.clock() - self.ttl,)
+        )[1]